@@ -21,10 +21,10 @@ def find_template(template_name, template, grayscale, screenshot):
     w, h = template.shape[::-1]
     res = cv2.matchTemplate(grayscale, template, cv2.TM_CCOEFF_NORMED)
     threshold = 0.9
-    loc = np.where(res >= threshold)
+    _, max_val, _, pt = cv2.minMaxLoc(res)
 
-    # If a match is found, draw a rectangle
-    for pt in zip(*loc[::-1]):
+    # If the strongest peak is a match, draw a rectangle around it
+    if max_val >= threshold:
         cv2.rectangle(screenshot, pt, (pt[0] + w, pt[1] + h), (0, 0, 255), 2)
         center_position = (pt[0] + w // 2, pt[1] + h // 2)  # Calculate the center of the rectangle
         if template_name.startswith("Map"):  # Check if it is a minimap template
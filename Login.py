@@ -20,6 +20,8 @@ import win32api
 import win32con
 
 from automation.logging_config import configure_logging
+from perception.regions import DEFAULT_REGIONS
+from perception.template_cache import load_template
 from utils.env_manager import SecureEnvManager
 from utils.log_sanitizer import register_sensitive_values
 
@@ -94,7 +96,10 @@ window = gw.getWindowsWithTitle(title)[0]  # get the first window with this titl
 
 # Prepare templates
 template_dir = 'Login/'  # directory with templates
-templates = {filename: cv2.imread(template_dir + filename, 0) for filename in os.listdir(template_dir)}
+templates = {
+    filename: load_template(template_dir + filename, cv2.IMREAD_GRAYSCALE)
+    for filename in os.listdir(template_dir)
+}
 
 # Create a window for displaying the image
 cv2.namedWindow("Window", cv2.WINDOW_NORMAL)
@@ -140,13 +145,18 @@ while True:
     for template_name, template in templates.items():
         w, h = template.shape[::-1]
 
+        # Only search the part of the window this login widget can appear in
+        region = DEFAULT_REGIONS.lookup(template_name, template_dir)
+        search, (offset_x, offset_y) = region.crop(grayscale, min_size=template.shape)
+
         # Apply template matching
-        res = cv2.matchTemplate(grayscale, template, cv2.TM_CCOEFF_NORMED)
+        res = cv2.matchTemplate(search, template, cv2.TM_CCOEFF_NORMED)
         threshold = 0.8
         loc = np.where(res >= threshold)
 
         # If a match is found, draw a rectangle and break the loop as we've identified the state
         for pt in zip(*loc[::-1]):
+            pt = (pt[0] + offset_x, pt[1] + offset_y)
             cv2.rectangle(screenshot_np, pt, (pt[0] + w, pt[1] + h), (0, 0, 255), 2)
             logger.info("State recognized", extra={"template": template_name})
             state_recognized = True
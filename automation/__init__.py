@@ -1,6 +1,19 @@
 """Automation package exposing controllers and utilities."""
 
+from typing import Any
+
 from .controller import AutomationController, AutomationTask
 from .logging_config import configure_logging
 
-__all__ = ["AutomationController", "AutomationTask", "configure_logging"]
+
+def __getattr__(name: str) -> Any:
+    # Imported on first use so ``import automation`` does not pull in
+    # OpenCV and NumPy.
+    if name == "AsyncAutomationController":
+        from .async_controller import AsyncAutomationController
+
+        return AsyncAutomationController
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["AsyncAutomationController", "AutomationController", "AutomationTask", "configure_logging"]
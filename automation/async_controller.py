@@ -0,0 +1,230 @@
+"""Asyncio-native automation controller sharing one event loop between tasks."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .controller import AutomationController, AutomationTask
+from .cursor import CursorAction, CursorResult, HumanLikeCursor
+from .metrics import MetricsRegistry
+from .templates import FrameScores, TemplateLibrary, TemplateMatch
+
+try:
+    from perception.inventory import InventoryDetection, TemplateInventoryRecognizer
+except Exception:  # pragma: no cover - optional in some runtimes
+    InventoryDetection = Any  # type: ignore[misc,assignment]
+    TemplateInventoryRecognizer = Any  # type: ignore[misc,assignment]
+
+try:
+    from navigation.controller import NavigationController
+except Exception:  # pragma: no cover - optional in some runtimes
+    NavigationController = Any  # type: ignore[misc,assignment]
+
+
+@dataclass
+class _AsyncRun:
+    task: "asyncio.Task[Dict[str, Any]]"
+    stop_event: threading.Event
+
+
+class AsyncAutomationController(AutomationController):
+    """Run many automation tasks as coroutines on a single event loop.
+
+    Tasks are the same :class:`AutomationTask` objects as for the blocking
+    controller, but any hook may be a coroutine. Synchronous hooks are
+    offloaded to the controller's thread pool so they never block the loop.
+    Coroutine steps should use the awaitable helpers: :meth:`capture`,
+    :meth:`match_first`, :meth:`refresh_inventory_async` and
+    :meth:`run_blocking` offload blocking work, and :meth:`click` awaits a
+    cursor action.
+
+    :meth:`start` schedules a task and returns its ``asyncio.Task``.
+    Cancellation is cooperative: :meth:`stop_task` sets the task's
+    ``threading.Event`` (also available as ``context["stop_event"]``), and
+    the controller checks it before each step. Steps are timed under
+    ``task.<name>.step`` like in the blocking controller.
+    """
+
+    def __init__(
+        self,
+        window_api: Any | None = None,
+        input_api: Any | None = None,
+        *,
+        navigation: NavigationController | None = None,
+        inventory_recognizer: TemplateInventoryRecognizer | None = None,
+        cursor: HumanLikeCursor | None = None,
+        executor: Executor | None = None,
+        max_workers: int = 4,
+        logger_instance: logging.Logger | None = None,
+        metrics: MetricsRegistry | None = None,
+    ) -> None:
+        super().__init__(
+            window_api,
+            input_api,
+            navigation=navigation,
+            inventory_recognizer=inventory_recognizer,
+            logger_instance=logger_instance,
+            metrics=metrics,
+        )
+        self.cursor = cursor
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._max_workers = max_workers
+        self._running: Dict[str, _AsyncRun] = {}
+        self._capture_lock = threading.Lock()
+
+    # ----- Lifecycle -----
+    async def run(self, task_name: str, *, stop_event: threading.Event | None = None) -> Dict[str, Any]:
+        """Run ``task_name`` to completion (or until ``stop_event`` is set) and return its context."""
+
+        task = self._require_task(task_name)
+        stop_event = stop_event or threading.Event()
+        context = self._build_context()
+        context["stop_event"] = stop_event
+        context["controller"] = self
+        step_stage = f"task.{task_name}.step"
+
+        self._logger.info("Starting task", extra={"task": task_name})
+        await self._call_hook(task, "on_start", context)
+        try:
+            while not stop_event.is_set():
+                started = time.perf_counter()
+                more = await self._call_hook(task, "perform_step", context)
+                self.metrics.observe(step_stage, time.perf_counter() - started)
+                if not more:
+                    break
+                # Let other tasks on the loop run between steps.
+                await asyncio.sleep(0)
+        finally:
+            self._logger.info("Stopping task", extra={"task": task_name})
+            await self._call_hook(task, "on_stop", context)
+        return context
+
+    def start(self, task_name: str) -> "asyncio.Task[Dict[str, Any]]":
+        """Schedule ``task_name`` on the running loop and return its ``asyncio.Task``."""
+
+        self._require_task(task_name)
+        running = self._running.get(task_name)
+        if running and not running.task.done():
+            raise RuntimeError(f"Task '{task_name}' is already running")
+
+        stop_event = threading.Event()
+        task = asyncio.get_running_loop().create_task(
+            self.run(task_name, stop_event=stop_event), name=f"automation-{task_name}"
+        )
+        run = _AsyncRun(task=task, stop_event=stop_event)
+        self._running[task_name] = run
+
+        def _forget(_: asyncio.Task) -> None:
+            if self._running.get(task_name) is run:
+                del self._running[task_name]
+
+        task.add_done_callback(_forget)
+        return task
+
+    def stop_task(self, task_name: str) -> bool:
+        """Ask a running task to stop before its next step."""
+
+        running = self._running.get(task_name)
+        if running is None:
+            return False
+        running.stop_event.set()
+        return True
+
+    def stop_all(self) -> None:
+        for task_name in list(self._running):
+            self.stop_task(task_name)
+
+    def is_running(self, task_name: str) -> bool:
+        running = self._running.get(task_name)
+        return bool(running and not running.task.done())
+
+    def list_running(self) -> Tuple[str, ...]:
+        return tuple(name for name, run in self._running.items() if not run.task.done())
+
+    async def wait_all(self) -> List[Any]:
+        """Wait for every started task; exceptions are returned rather than raised."""
+
+        tasks = [run.task for run in self._running.values()]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self) -> None:
+        """Stop all tasks and shut down the thread pool if the controller created it."""
+
+        self.stop_all()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    # ----- Awaitable helpers -----
+    async def run_blocking(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``func`` in the controller's thread pool and await its result."""
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+
+    async def capture(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Capture ``(color, grayscale)`` from ``window_api`` without blocking the loop.
+
+        Captures are serialised and the backend's reused buffers are copied,
+        so every task owns the frame it was given.
+        """
+
+        if self.window_api is None:
+            raise RuntimeError("window_api not configured on AsyncAutomationController")
+        return await self.run_blocking(self._capture_copy)
+
+    def _capture_copy(self) -> Tuple[np.ndarray, np.ndarray]:
+        with self._capture_lock:
+            color, grayscale = self.window_api.capture()
+            return color.copy(), grayscale.copy()
+
+    async def match_first(
+        self,
+        library: TemplateLibrary,
+        grayscale: np.ndarray,
+        *,
+        prefixes: Tuple[str, ...],
+        scores: Optional[FrameScores] = None,
+    ) -> Optional[TemplateMatch]:
+        return await self.run_blocking(library.match_first, grayscale, prefixes=prefixes, scores=scores)
+
+    async def refresh_inventory_async(self, image: Any) -> List[InventoryDetection]:
+        return await self.run_blocking(self.refresh_inventory, image)
+
+    async def click(self, action: CursorAction, *, supersede: bool = False) -> CursorResult:
+        """Queue ``action`` on the cursor and await the click."""
+
+        if self.cursor is None:
+            raise RuntimeError("HumanLikeCursor not configured on AsyncAutomationController")
+        return await asyncio.wrap_future(self.cursor.queue_click(action, supersede=supersede))
+
+    # ----- Internals -----
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="automation"
+            )
+        return self._executor
+
+    async def _call_hook(self, task: AutomationTask, hook: str, context: Dict[str, Any]) -> Any:
+        method = getattr(task, hook)
+        if inspect.iscoroutinefunction(method):
+            return await method(context)
+        if getattr(type(task), hook) is getattr(AutomationTask, hook):
+            # The base class hooks are no-ops; skip the round trip to the pool.
+            return method(context)
+        return await self.run_blocking(method, context)
+
+
+__all__ = ["AsyncAutomationController"]
@@ -0,0 +1,226 @@
+"""Screen capture backends that write frames into persistent buffers."""
+
+from __future__ import annotations
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .metrics import MetricsRegistry, get_metrics
+
+try:  # pyautogui fails to import on headless hosts (no display to connect to)
+    import pyautogui
+except Exception:  # pragma: no cover - headless benchmarks and replay
+    pyautogui = None  # type: ignore[assignment]
+
+try:  # Optional dependency; the pyautogui backend is used when unavailable
+    import mss
+except ImportError:  # pragma: no cover - optional in some runtimes
+    mss = None  # type: ignore[assignment]
+
+Region = Tuple[int, int, int, int]
+Frames = Tuple[np.ndarray, np.ndarray]
+
+
+class FrameBuffers:
+    """Colour (BGR) and grayscale buffers reused for every captured frame.
+
+    Colour and grayscale conversion is timed under ``capture.convert``.
+    """
+
+    def __init__(self, metrics: Optional[MetricsRegistry] = None) -> None:
+        self._metrics = metrics or get_metrics()
+        self.color: Optional[np.ndarray] = None
+        self.grayscale: Optional[np.ndarray] = None
+
+    def ensure(self, height: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return buffers of the requested size, reallocating only when it changes."""
+
+        if self.color is None or self.color.shape[:2] != (height, width):
+            self.color = np.empty((height, width, 3), dtype=np.uint8)
+            self.grayscale = np.empty((height, width), dtype=np.uint8)
+        assert self.grayscale is not None
+        return self.color, self.grayscale
+
+    def write(
+        self, source: np.ndarray, conversion: Optional[int], out: Optional[Frames] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Convert ``source`` into the colour buffer, then fill the grayscale buffer.
+
+        ``out`` replaces the persistent buffers with caller-owned arrays of
+        the same size, such as a shared-memory ring slot.
+        """
+
+        if out is None:
+            color, grayscale = self.ensure(source.shape[0], source.shape[1])
+        else:
+            color, grayscale = out
+            if color.shape[:2] != source.shape[:2] or grayscale.shape != source.shape[:2]:
+                raise ValueError(
+                    f"Frame of size {source.shape[:2]} does not fit output buffers of size {color.shape[:2]}"
+                )
+        with self._metrics.timer("capture.convert"):
+            if conversion is None:
+                np.copyto(color, source)
+            else:
+                cv2.cvtColor(source, conversion, dst=color)
+            cv2.cvtColor(color, cv2.COLOR_BGR2GRAY, dst=grayscale)
+        return color, grayscale
+
+
+class CaptureBackend(ABC):
+    """Grabs a screen region into persistent colour and grayscale buffers.
+
+    The arrays returned by :meth:`grab` are overwritten by the next call;
+    copy them if a frame must outlive the following capture. Pass ``out``
+    to have the pixels written straight into arrays you own instead.
+    """
+
+    def __init__(self) -> None:
+        self.buffers = FrameBuffers()
+
+    @abstractmethod
+    def grab(self, region: Region, out: Optional[Frames] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Capture ``(left, top, width, height)`` as BGR colour and grayscale arrays."""
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class PyAutoGuiBackend(CaptureBackend):
+    """Capture through ``pyautogui.screenshot``; allocates a PIL image per frame."""
+
+    def __init__(self) -> None:
+        if pyautogui is None:
+            raise RuntimeError("The 'pyautogui' package is required for PyAutoGuiBackend")
+        super().__init__()
+
+    def grab(self, region: Region, out: Optional[Frames] = None) -> Tuple[np.ndarray, np.ndarray]:
+        screenshot = pyautogui.screenshot(region=region)
+        return self.buffers.write(np.asarray(screenshot), cv2.COLOR_RGB2BGR, out)
+
+
+class MssBackend(CaptureBackend):
+    """Capture through ``mss`` without intermediate image objects.
+
+    The raw BGRA bytes returned by ``mss`` are viewed as a NumPy array
+    without copying and converted straight into the persistent buffers.
+    ``mss`` handles are bound to the thread that created them, so one is
+    opened lazily per capturing thread.
+    """
+
+    def __init__(self) -> None:
+        if mss is None:
+            raise RuntimeError("The 'mss' package is required for MssBackend")
+        super().__init__()
+        self._local = threading.local()
+
+    def grab(self, region: Region, out: Optional[Frames] = None) -> Tuple[np.ndarray, np.ndarray]:
+        left, top, width, height = region
+        shot = self._session().grab({"left": left, "top": top, "width": width, "height": height})
+        bgra = np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return self.buffers.write(bgra, cv2.COLOR_BGRA2BGR, out)
+
+    def close(self) -> None:
+        session = getattr(self._local, "session", None)
+        if session is not None:
+            session.close()
+            self._local.session = None
+
+    def _session(self):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = mss.mss()
+            self._local.session = session
+        return session
+
+
+class ReplayBackend(CaptureBackend):
+    """Replay recorded frames so the pipeline can run without a live client.
+
+    ``source`` may be a directory of images (replayed in name order), a video
+    file readable by ``cv2.VideoCapture``, or a sequence of BGR arrays. The
+    requested region is ignored; frames keep their recorded size.
+    """
+
+    IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp"}
+
+    def __init__(self, source: Path | str | Sequence[np.ndarray], *, loop: bool = True) -> None:
+        super().__init__()
+        self.loop = loop
+        self._frames: List[np.ndarray] = []
+        self._video: Optional[cv2.VideoCapture] = None
+        self._video_path: Optional[str] = None
+        self._index = 0
+        if isinstance(source, (str, os.PathLike)):
+            path = Path(source)
+            if path.is_dir():
+                self._frames = self._load_directory(path)
+            else:
+                self._video_path = str(path)
+                self._video = cv2.VideoCapture(self._video_path)
+                if not self._video.isOpened():
+                    raise RuntimeError(f"Could not open replay source '{path}'")
+        else:
+            self._frames = [np.ascontiguousarray(frame) for frame in source]
+        if self._video is None and not self._frames:
+            raise RuntimeError("Replay source contains no frames")
+
+    @classmethod
+    def _load_directory(cls, directory: Path) -> List[np.ndarray]:
+        frames: List[np.ndarray] = []
+        for path in sorted(directory.iterdir()):
+            if path.suffix.lower() not in cls.IMAGE_SUFFIXES:
+                continue
+            image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            if image is not None:
+                frames.append(image)
+        return frames
+
+    def grab(self, region: Region, out: Optional[Frames] = None) -> Tuple[np.ndarray, np.ndarray]:
+        return self.buffers.write(self._next_frame(), None, out)
+
+    def _next_frame(self) -> np.ndarray:
+        if self._video is not None:
+            ok, frame = self._video.read()
+            if not ok and self.loop:
+                self._video.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = self._video.read()
+            if not ok:
+                raise RuntimeError("Replay source exhausted")
+            return frame
+        if self._index >= len(self._frames):
+            if not self.loop:
+                raise RuntimeError("Replay source exhausted")
+            self._index = 0
+        frame = self._frames[self._index]
+        self._index += 1
+        return frame
+
+    def close(self) -> None:
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+
+
+def default_capture_backend() -> CaptureBackend:
+    """Return the fastest capture backend available in this environment."""
+
+    if mss is not None:
+        return MssBackend()
+    return PyAutoGuiBackend()
+
+
+__all__ = [
+    "CaptureBackend",
+    "FrameBuffers",
+    "MssBackend",
+    "PyAutoGuiBackend",
+    "ReplayBackend",
+    "default_capture_backend",
+]
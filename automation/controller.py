@@ -20,6 +20,8 @@ except Exception:  # pragma: no cover - optional in some runtimes
     InventoryDetection = Any  # type: ignore[misc,assignment]
     TemplateInventoryRecognizer = Any  # type: ignore[misc,assignment]
 
+from .metrics import MetricsRegistry, get_metrics
+
 logger = logging.getLogger(__name__)
 
 
@@ -53,7 +55,11 @@ class AutomationTask:
 
 
 class AutomationController:
-    """Coordinates automation tasks and exposes navigation/perception helpers."""
+    """Coordinates automation tasks and exposes navigation/perception helpers.
+
+    Every task step is timed under ``task.<name>.step`` and inventory
+    refreshes under ``inventory.detect`` in ``metrics``.
+    """
 
     def __init__(
         self,
@@ -63,6 +69,7 @@ class AutomationController:
         navigation: NavigationController | None = None,
         inventory_recognizer: TemplateInventoryRecognizer | None = None,
         logger_instance: logging.Logger | None = None,
+        metrics: MetricsRegistry | None = None,
     ) -> None:
         # I/O deps for GUI/automation tasks
         self.window_api = window_api
@@ -77,6 +84,7 @@ class AutomationController:
 
         # Infra
         self._logger = logger_instance or logger
+        self.metrics = metrics or get_metrics()
         self._tasks: Dict[str, AutomationTask] = {}
 
     # ----- Task registry/lifecycle (preserves master behavior) -----
@@ -90,18 +98,9 @@ class AutomationController:
         return tuple(self._tasks.keys())
 
     def run_task(self, task_name: str) -> Dict[str, Any]:
-        if task_name not in self._tasks:
-            raise KeyError(f"Task '{task_name}' is not registered")
-
-        task = self._tasks[task_name]
-        context: Dict[str, Any] = {
-            "window_api": self.window_api,
-            "input_api": self.input_api,
-            "navigation": self.navigation,
-            "inventory_recognizer": self.inventory_recognizer,
-            "state": self.state,
-            "logger": self._logger,
-        }
+        task = self._require_task(task_name)
+        context = self._build_context()
+        step_stage = f"task.{task_name}.step"
 
         self._logger.info("Starting task", extra={"task": task_name})
         task.on_start(context)
@@ -112,7 +111,9 @@ class AutomationController:
                     "Performing task step", extra={"task": task_name, "step": step_index}
                 )
                 step_index += 1
-                if not task.perform_step(context):
+                with self.metrics.timer(step_stage):
+                    more = task.perform_step(context)
+                if not more:
                     break
         finally:
             self._logger.info("Stopping task", extra={"task": task_name})
@@ -120,6 +121,22 @@ class AutomationController:
 
         return context
 
+    def _require_task(self, task_name: str) -> AutomationTask:
+        if task_name not in self._tasks:
+            raise KeyError(f"Task '{task_name}' is not registered")
+        return self._tasks[task_name]
+
+    def _build_context(self) -> Dict[str, Any]:
+        return {
+            "window_api": self.window_api,
+            "input_api": self.input_api,
+            "navigation": self.navigation,
+            "inventory_recognizer": self.inventory_recognizer,
+            "state": self.state,
+            "logger": self._logger,
+            "metrics": self.metrics,
+        }
+
     # ----- Navigation/perception facade (from codex branch) -----
     def plan_route(self, destination: str) -> List[RouteWaypoint]:
         nav = self._require_navigation()
@@ -137,7 +154,8 @@ class AutomationController:
             self.state.inventory_detections = []
             return []
         rec = self._require_inventory()
-        detections = rec.detect_from_image(image)
+        with self.metrics.timer("inventory.detect"):
+            detections = rec.detect_from_image(image)
         self.state.inventory_detections = list(detections)
         return list(detections)
 
@@ -2,70 +2,511 @@
 
 from __future__ import annotations
 
+import itertools
 import multiprocessing as mp
+import queue
 import random
+import threading
 import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import CancelledError, Future
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
 
-import pyautogui
+try:  # pyautogui fails to import on headless hosts (no display to connect to)
+    import pyautogui
+except Exception:  # pragma: no cover - headless runs use dry_run executors
+    pyautogui = None  # type: ignore[assignment]
+
+from .metrics import MetricsRegistry, get_metrics
+from .trajectory import TrajectoryPlanner, stream
+
+Outcome = Tuple[Any, ...]
 
 
 @dataclass
 class CursorAction:
-    """Represents a cursor action to be executed by the worker."""
+    """Represents a cursor action to be executed by the worker.
+
+    ``post_click_delay`` keeps the worker busy after the click; it defaults
+    to zero because callers can wait on the returned future instead.
+    """
 
     position: Tuple[int, int]
     move_offset: int = 4
     move_delay_range: Tuple[float, float] = (0.1, 0.2)
     click_delay_range: Tuple[float, float] = (0.1, 0.6)
-    post_click_delay: float = 4.0
+    post_click_delay: float = 0.0
     clicks: int = 1
 
 
-class HumanLikeCursor:
-    """Queue based helper that executes cursor actions in a background process."""
+@dataclass
+class CursorResult:
+    """Outcome of a completed :class:`CursorAction`.
+
+    ``position`` is where the click landed after jitter. Timestamps come
+    from ``time.monotonic`` in the worker.
+    """
+
+    action: CursorAction
+    position: Tuple[int, int]
+    started_at: float
+    clicked_at: float
+
+
+class CursorExecutor(ABC):
+    """Runs one :class:`CursorAction` at a time on behalf of a :class:`CursorService`.
+
+    With ``dry_run`` the timing and jitter are simulated but the mouse is
+    never touched, which is useful for headless tests and benchmarks. With
+    a ``planner`` the cursor follows a precomputed
+    :class:`~automation.trajectory.Trajectory` whose duration scales with
+    the distance, instead of jumping after ``move_delay_range``.
+    """
+
+    def __init__(self, *, dry_run: bool = False, planner: Optional[TrajectoryPlanner] = None) -> None:
+        self.dry_run = dry_run
+        self.planner = planner
+
+    def start(self) -> None:
+        """Acquire any resources needed before the first action."""
+
+    def stop(self) -> None:
+        """Release the resources acquired by :meth:`start`."""
+
+    @abstractmethod
+    def run(self, action_id: int, action: CursorAction) -> Outcome:
+        """Perform ``action`` and block until it finishes, fails, or is aborted."""
+
+    @abstractmethod
+    def abort(self) -> None:
+        """Ask the running action to stop before its click."""
+
+    @abstractmethod
+    def reset_abort(self) -> None:
+        """Clear an abort request before the next action starts."""
+
+
+class ThreadCursorExecutor(CursorExecutor):
+    """Move the mouse directly on the service's dispatcher thread.
 
-    def __init__(self) -> None:
-        self._queue: "mp.Queue[Optional[CursorAction]]" = mp.Queue()
+    This is the cheapest option: no extra interpreter is started and
+    actions are not pickled.
+    """
+
+    def __init__(self, *, dry_run: bool = False, planner: Optional[TrajectoryPlanner] = None) -> None:
+        super().__init__(dry_run=dry_run, planner=planner)
+        self._abort = threading.Event()
+        self._position: Optional[Tuple[int, int]] = None
+
+    def run(self, action_id: int, action: CursorAction) -> Outcome:
+        try:
+            outcome = _perform(action_id, action, self._abort, self.dry_run, self.planner, self._position)
+        except Exception as exc:  # pragma: no cover - depends on the desktop session
+            return ("error", action_id, str(exc))
+        if outcome[0] == "done":
+            self._position = outcome[2]
+        return outcome
+
+    def abort(self) -> None:
+        self._abort.set()
+
+    def reset_abort(self) -> None:
+        self._abort.clear()
+
+
+class ProcessCursorExecutor(CursorExecutor):
+    """Move the mouse from a dedicated child process.
+
+    This isolates input automation from the vision process, at the cost of
+    an extra interpreter and of pickling every action across a queue.
+    """
+
+    def __init__(self, *, dry_run: bool = False, planner: Optional[TrajectoryPlanner] = None) -> None:
+        super().__init__(dry_run=dry_run, planner=planner)
+        self._requests: "mp.Queue[Optional[Tuple[int, CursorAction]]]" = mp.Queue()
+        self._results: "mp.Queue[Outcome]" = mp.Queue()
+        self._abort = mp.Event()
         self._process: Optional[mp.Process] = None
+        self._stopping = False
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
 
     def start(self) -> None:
-        if self._process is None or not self._process.is_alive():
-            self._process = mp.Process(target=_cursor_worker, args=(self._queue,))
-            self._process.start()
+        if self.is_alive:
+            return
+        self._stopping = False
+        self._process = mp.Process(
+            target=_cursor_worker,
+            args=(self._requests, self._results, self._abort, self.dry_run, self.planner),
+            name="cursor-worker",
+        )
+        self._process.start()
 
     def stop(self) -> None:
+        self._stopping = True
         if self._process is not None:
-            self._queue.put(None)
+            self._abort.set()
+            self._requests.put(None)
             self._process.join(timeout=1)
             if self._process.is_alive():
                 self._process.terminate()
             self._process = None
 
-    def queue_click(self, action: CursorAction) -> None:
-        """Queue a click action to be executed by the worker."""
+    def run(self, action_id: int, action: CursorAction) -> Outcome:
+        self._requests.put((action_id, action))
+        while True:
+            try:
+                outcome = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if self._stopping:
+                    return ("aborted", action_id)
+                if not self.is_alive:
+                    return ("error", action_id, "cursor worker stopped")
+                continue
+            if outcome[1] == action_id:
+                return outcome
+
+    def abort(self) -> None:
+        self._abort.set()
+
+    def reset_abort(self) -> None:
+        self._abort.clear()
+
+
+@dataclass
+class _PendingAction:
+    action_id: int
+    owner: Hashable
+    action: CursorAction
+    future: "Future[CursorResult]"
+    before: Optional[Callable[[], None]]
+    submitted_at: float
+
+
+class CursorService:
+    """Serialise cursor actions from any number of clients onto one executor.
+
+    Pending actions wait in this process, so they can be cancelled or
+    superseded per owner before the executor sees them. One service can be
+    shared by several :class:`HumanLikeCursor` clients (for example several
+    skills driving the same desktop), so they never move the mouse at the
+    same time. The next action always comes from the owner served least
+    recently, so a busy client cannot starve the others, and each owner's
+    actions stay in order. Time spent queued is recorded under
+    ``cursor.wait`` and each action under ``cursor.action`` in ``metrics``.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[CursorExecutor] = None,
+        *,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.executor = executor or ThreadCursorExecutor()
+        self._metrics = metrics or get_metrics()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._pending: Deque[_PendingAction] = deque()
+        self._in_flight: Optional[Tuple[int, Hashable]] = None
+        self._ids = itertools.count(1)
+        self._turns = itertools.count()
+        self._served: Dict[Hashable, int] = {}
+        self._condition = threading.Condition()
+        self._stopping = False
+
+    @property
+    def is_running(self) -> bool:
+        return self._dispatcher is not None and self._dispatcher.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self.executor.start()
+        self._stopping = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="cursor-dispatch", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self.cancel_pending(abort_current=True)
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=2)
+            self._dispatcher = None
+        self.executor.stop()
+
+    def submit(
+        self,
+        action: CursorAction,
+        *,
+        owner: Hashable = None,
+        supersede: bool = False,
+        before: Optional[Callable[[], None]] = None,
+    ) -> "Future[CursorResult]":
+        """Queue ``action`` for ``owner``; ``supersede`` first cancels that owner's older actions.
+
+        ``before`` runs on the dispatcher thread right before the action,
+        for example to focus the owner's window.
+        """
+
+        future: "Future[CursorResult]" = Future()
+        if supersede:
+            self.cancel_pending(owner, abort_current=True)
+        with self._condition:
+            self._pending.append(
+                _PendingAction(next(self._ids), owner, action, future, before, time.perf_counter())
+            )
+            self._condition.notify_all()
+        return future
+
+    def cancel_pending(self, owner: Hashable = None, *, abort_current: bool = False) -> int:
+        """Cancel queued actions of ``owner`` (every owner when ``None``).
+
+        With ``abort_current`` the action in flight is aborted too when it
+        belongs to ``owner``. Returns the number of queued actions cancelled.
+        """
+
+        with self._condition:
+            cancelled = [entry for entry in self._pending if owner is None or entry.owner == owner]
+            if cancelled:
+                self._pending = deque(
+                    entry for entry in self._pending if not (owner is None or entry.owner == owner)
+                )
+            in_flight = self._in_flight
+            if abort_current and in_flight is not None and (owner is None or in_flight[1] == owner):
+                self.executor.abort()
+        for entry in cancelled:
+            entry.future.cancel()
+        return len(cancelled)
+
+    def pending_count(self, owner: Hashable = None) -> int:
+        with self._condition:
+            count = sum(1 for entry in self._pending if owner is None or entry.owner == owner)
+            if self._in_flight is not None and (owner is None or self._in_flight[1] == owner):
+                count += 1
+            return count
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopping)
+                if self._stopping:
+                    return
+                entry = self._pop_next()
+                if not entry.future.set_running_or_notify_cancel():
+                    continue
+                # Cleared here rather than in the worker so an abort issued
+                # before the executor picks the action up is not lost.
+                self.executor.reset_abort()
+                self._in_flight = (entry.action_id, entry.owner)
+            self._metrics.observe("cursor.wait", time.perf_counter() - entry.submitted_at)
+            with self._metrics.timer("cursor.action"):
+                outcome = self._run(entry)
+            with self._condition:
+                self._in_flight = None
+            _resolve(entry.future, entry.action, outcome)
 
-        self._queue.put(action)
+    def _pop_next(self) -> _PendingAction:
+        # The first entry seen for each owner is that owner's oldest, so a
+        # strict comparison keeps per-owner FIFO order.
+        best_index, best_turn = 0, None
+        for index, entry in enumerate(self._pending):
+            turn = self._served.get(entry.owner, -1)
+            if best_turn is None or turn < best_turn:
+                best_index, best_turn = index, turn
+        entry = self._pending[best_index]
+        del self._pending[best_index]
+        waiting = {pending.owner for pending in self._pending}
+        self._served = {owner: turn for owner, turn in self._served.items() if owner in waiting}
+        self._served[entry.owner] = next(self._turns)
+        return entry
 
+    def _run(self, entry: _PendingAction) -> Outcome:
+        if entry.before is not None:
+            try:
+                entry.before()
+            except Exception as exc:
+                return ("error", entry.action_id, f"cursor preparation failed: {exc}")
+        return self.executor.run(entry.action_id, entry.action)
 
-def _cursor_worker(queue: "mp.Queue[Optional[CursorAction]]") -> None:
+
+class HumanLikeCursor:
+    """Queue human-like clicks and get a future for each one.
+
+    :meth:`queue_click` returns a :class:`~concurrent.futures.Future` that
+    resolves to a :class:`CursorResult` once the move and click finish.
+    Queued actions can be cancelled (``future.cancel()`` or
+    :meth:`cancel_pending`) or superseded by a newer decision
+    (``queue_click(..., supersede=True)``). Superseding also aborts this
+    cursor's action in flight unless its click has already happened; an
+    aborted future raises ``CancelledError``.
+
+    ``executor`` selects how the mouse is driven: ``"thread"`` (default),
+    ``"process"`` for isolation in a child process, or a
+    :class:`CursorExecutor` instance. ``planner`` gives a named executor
+    smooth, distance-timed movement. Pass a shared ``service`` instead to
+    multiplex several cursors onto one executor; the cursor then only
+    cancels its own actions and leaves the service running on :meth:`stop`.
+    ``before_action`` runs right before each of this cursor's actions, for
+    example to focus the window the click is meant for.
+    """
+
+    def __init__(
+        self,
+        *,
+        executor: "CursorExecutor | str" = "thread",
+        service: Optional[CursorService] = None,
+        planner: Optional[TrajectoryPlanner] = None,
+        before_action: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._before_action = before_action
+        if service is None:
+            service = CursorService(_make_executor(executor, planner))
+            self._owns_service = True
+        else:
+            self._owns_service = False
+        self._service = service
+        self._owner = object()
+
+    @property
+    def service(self) -> CursorService:
+        return self._service
+
+    def start(self) -> None:
+        self._service.start()
+
+    def stop(self) -> None:
+        if self._owns_service:
+            self._service.stop()
+        else:
+            self._service.cancel_pending(self._owner, abort_current=True)
+
+    def queue_click(self, action: CursorAction, *, supersede: bool = False) -> "Future[CursorResult]":
+        """Queue ``action`` and return a future for its completion.
+
+        With ``supersede`` every older queued action is cancelled and the
+        one in flight is aborted before its click if possible.
+        """
+
+        return self._service.submit(
+            action, owner=self._owner, supersede=supersede, before=self._before_action
+        )
+
+    def cancel_pending(self, *, abort_current: bool = False) -> int:
+        """Cancel every queued action; optionally abort the one in flight."""
+
+        return self._service.cancel_pending(self._owner, abort_current=abort_current)
+
+    @property
+    def pending_count(self) -> int:
+        return self._service.pending_count(self._owner)
+
+
+def _make_executor(executor: "CursorExecutor | str", planner: Optional[TrajectoryPlanner] = None) -> CursorExecutor:
+    if isinstance(executor, CursorExecutor):
+        return executor
+    if executor == "thread":
+        return ThreadCursorExecutor(planner=planner)
+    if executor == "process":
+        return ProcessCursorExecutor(planner=planner)
+    raise ValueError(f"Unknown cursor executor '{executor}'")
+
+
+def _resolve(future: "Future[CursorResult]", action: CursorAction, outcome: Outcome) -> None:
+    status = outcome[0]
+    if status == "done":
+        _, _, position, started_at, clicked_at = outcome
+        future.set_result(CursorResult(action, position, started_at, clicked_at))
+    elif status == "aborted":
+        future.set_exception(CancelledError("cursor action superseded"))
+    else:
+        future.set_exception(RuntimeError(outcome[2]))
+
+
+def _cursor_worker(
+    requests: "mp.Queue[Optional[Tuple[int, CursorAction]]]",
+    results: "mp.Queue[Outcome]",
+    abort: Any,
+    dry_run: bool,
+    planner: Optional[TrajectoryPlanner] = None,
+) -> None:
+    position: Optional[Tuple[int, int]] = None
     while True:
-        action = queue.get()
-        if action is None:
+        request = requests.get()
+        if request is None:
             break
-        x_offset = random.randint(-action.move_offset, action.move_offset)
-        y_offset = random.randint(-action.move_offset, action.move_offset)
-        move_delay = random.uniform(*action.move_delay_range)
-        click_delay = random.uniform(*action.click_delay_range)
+        action_id, action = request
+        try:
+            outcome = _perform(action_id, action, abort, dry_run, planner, position)
+        except Exception as exc:  # pragma: no cover - depends on the desktop session
+            outcome = ("error", action_id, str(exc))
+        if outcome[0] == "done":
+            position = outcome[2]
+        results.put(outcome)
+
+
+def _perform(
+    action_id: int,
+    action: CursorAction,
+    abort: Any,
+    dry_run: bool = False,
+    planner: Optional[TrajectoryPlanner] = None,
+    origin: Optional[Tuple[int, int]] = None,
+) -> Outcome:
+    if not dry_run and pyautogui is None:
+        raise RuntimeError("The 'pyautogui' package is required to move the cursor")
+    started_at = time.monotonic()
+    x_offset = random.randint(-action.move_offset, action.move_offset)
+    y_offset = random.randint(-action.move_offset, action.move_offset)
+    position = (action.position[0] + x_offset, action.position[1] + y_offset)
 
-        time.sleep(move_delay)
-        pyautogui.moveTo(action.position[0] + x_offset, action.position[1] + y_offset)
+    if planner is None:
+        click_delay = random.uniform(*action.click_delay_range)
+        if abort.wait(random.uniform(*action.move_delay_range)):
+            return ("aborted", action_id)
+        if not dry_run:
+            pyautogui.moveTo(*position)
+    else:
+        click_delay = random.uniform(*(planner.settle_range or action.click_delay_range))
+        if not dry_run:
+            current = pyautogui.position()
+            origin = (int(current[0]), int(current[1]))
+        trajectory = planner.plan(origin or position, position)
+        move = _noop_move if dry_run else _move_now
+        if not stream(trajectory, move, abort=abort):
+            return ("aborted", action_id)
 
-        time.sleep(click_delay)
+    if abort.wait(click_delay):
+        return ("aborted", action_id)
+    if not dry_run:
         for _ in range(action.clicks):
             pyautogui.click()
-        time.sleep(action.post_click_delay)
+    clicked_at = time.monotonic()
+    if action.post_click_delay:
+        abort.wait(action.post_click_delay)
+    return ("done", action_id, position, started_at, clicked_at)
+
+
+def _move_now(x: int, y: int) -> None:
+    # ``_pause=False`` skips pyautogui.PAUSE, which would otherwise sleep
+    # 0.1 s after every point of the trajectory.
+    pyautogui.moveTo(x, y, _pause=False)
+
+
+def _noop_move(x: int, y: int) -> None:
+    return None
 
 
-__all__ = ["CursorAction", "HumanLikeCursor"]
+__all__ = [
+    "CursorAction",
+    "CursorExecutor",
+    "CursorResult",
+    "CursorService",
+    "HumanLikeCursor",
+    "ProcessCursorExecutor",
+    "ThreadCursorExecutor",
+]
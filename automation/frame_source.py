@@ -0,0 +1,203 @@
+"""Background frame capture into a ring of preallocated buffers."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CaptureFunc = Callable[[], Tuple[np.ndarray, np.ndarray]]
+
+# Matches TickScheduler.fast_interval, the fastest any consumer polls.
+DEFAULT_CAPTURE_INTERVAL = 0.05
+
+
+@dataclass
+class _Slot:
+    color: Optional[np.ndarray] = None
+    grayscale: Optional[np.ndarray] = None
+    pins: int = 0
+
+    def store(self, color: np.ndarray, grayscale: np.ndarray) -> None:
+        if self.color is None or self.color.shape != color.shape:
+            self.color = np.empty_like(color)
+        if self.grayscale is None or self.grayscale.shape != grayscale.shape:
+            self.grayscale = np.empty_like(grayscale)
+        np.copyto(self.color, color)
+        np.copyto(self.grayscale, grayscale)
+
+
+@dataclass
+class Frame:
+    """A captured frame held in a :class:`FrameSource` ring slot.
+
+    The slot is pinned until :meth:`release` is called (or the ``with``
+    block exits), so the capture thread never overwrites pixels that are
+    still being read.
+    """
+
+    sequence: int
+    timestamp: float
+    color: np.ndarray
+    grayscale: np.ndarray
+    _release: Optional[Callable[[], None]] = field(default=None, repr=False, compare=False)
+
+    def release(self) -> None:
+        """Unpin the ring slot backing this frame."""
+
+        if self._release is not None:
+            self._release()
+            self._release = None
+
+    def copy(self) -> "Frame":
+        """Return an unpinned copy that stays valid indefinitely."""
+
+        return Frame(self.sequence, self.timestamp, self.color.copy(), self.grayscale.copy())
+
+    def __enter__(self) -> "Frame":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.release()
+
+
+class FrameSource:
+    """Capture frames on a dedicated thread so vision work overlaps capture.
+
+    ``capture`` is any callable returning ``(color, grayscale)`` arrays, such
+    as :meth:`~automation.window.WindowCaptureService.capture`. Each result
+    is copied into one of ``capacity`` preallocated slots and published with
+    a sequence number and timestamp. Consumers call :meth:`latest` (never
+    blocks) or :meth:`wait_for` and release the returned frame when done.
+    When every spare slot is pinned the newest capture is dropped rather
+    than overwriting a frame in use.
+
+    The thread waits ``interval`` seconds between captures; pass the
+    consumer's polling interval, or ``0`` to capture as fast as possible.
+    A failing capture is logged and kept in :attr:`last_error`, and the
+    thread retries after ``error_backoff`` seconds.
+    """
+
+    def __init__(
+        self,
+        capture: CaptureFunc,
+        *,
+        capacity: int = 3,
+        interval: float = DEFAULT_CAPTURE_INTERVAL,
+        error_backoff: float = 1.0,
+        name: str = "frame-source",
+    ) -> None:
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        self._capture = capture
+        self._interval = interval
+        self._error_backoff = error_backoff
+        self._name = name
+        self._slots: List[_Slot] = [_Slot() for _ in range(capacity)]
+        self._condition = threading.Condition()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._latest_index: Optional[int] = None
+        self._latest_sequence = 0
+        self._latest_timestamp = 0.0
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.last_error: Optional[Exception] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def latest(self, after: int = 0) -> Optional[Frame]:
+        """Return the newest frame if its sequence number exceeds ``after``."""
+
+        with self._condition:
+            return self._acquire_latest(after)
+
+    def wait_for(self, after: int = 0, timeout: Optional[float] = None) -> Optional[Frame]:
+        """Block until a frame newer than ``after`` is published or ``timeout`` expires."""
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._latest_sequence > after or self._stop_event.is_set(),
+                timeout=timeout,
+            )
+            return self._acquire_latest(after)
+
+    def _acquire_latest(self, after: int) -> Optional[Frame]:
+        index = self._latest_index
+        if index is None or self._latest_sequence <= after:
+            return None
+        slot = self._slots[index]
+        slot.pins += 1
+        assert slot.color is not None and slot.grayscale is not None
+        return Frame(
+            sequence=self._latest_sequence,
+            timestamp=self._latest_timestamp,
+            color=slot.color,
+            grayscale=slot.grayscale,
+            _release=lambda: self._unpin(index),
+        )
+
+    def _unpin(self, index: int) -> None:
+        with self._condition:
+            self._slots[index].pins -= 1
+
+    def _free_slot(self) -> Optional[int]:
+        with self._condition:
+            for offset in range(1, len(self._slots) + 1):
+                index = ((self._latest_index or 0) + offset) % len(self._slots)
+                if index != self._latest_index and self._slots[index].pins == 0:
+                    return index
+        return None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                color, grayscale = self._capture()
+            except Exception as exc:
+                self.last_error = exc
+                logger.warning("Frame capture failed", extra={"error": str(exc)})
+                self._stop_event.wait(self._error_backoff)
+                continue
+            self.last_error = None
+            timestamp = time.monotonic()
+            index = self._free_slot()
+            if index is None:
+                self.frames_dropped += 1
+            else:
+                # The slot is neither pinned nor published, so it can be
+                # written without holding the lock.
+                self._slots[index].store(color, grayscale)
+                with self._condition:
+                    self._latest_index = index
+                    self._latest_sequence += 1
+                    self._latest_timestamp = timestamp
+                    self.frames_captured += 1
+                    self._condition.notify_all()
+            if self._interval:
+                self._stop_event.wait(self._interval)
+
+
+__all__ = ["DEFAULT_CAPTURE_INTERVAL", "Frame", "FrameSource"]
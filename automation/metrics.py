@@ -0,0 +1,265 @@
+"""Lightweight per-stage latency instrumentation for the automation loop."""
+
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+METRICS_ENV = "RUNELABS_METRICS"
+
+# Upper bounds (seconds) of the cumulative histogram buckets, 0.5 ms .. 10 s.
+DEFAULT_BUCKETS: Sequence[float] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+class LatencyHistogram:
+    """Latency samples for one stage.
+
+    The most recent ``window`` samples are kept in a ring for percentiles,
+    while bucket counts, the sample count, and the running sum accumulate
+    for the lifetime of the process, as Prometheus histograms expect.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: int = 2048,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        budget: Optional[float] = None,
+    ) -> None:
+        self.buckets = tuple(buckets)
+        self.budget = budget
+        self.count = 0
+        self.total = 0.0
+        self.over_budget = 0
+        self._bucket_counts = [0] * (len(self.buckets) + 1)
+        self._recent = [0.0] * window
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._recent[self.count % len(self._recent)] = seconds
+            self.count += 1
+            self.total += seconds
+            self._bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            if self.budget is not None and seconds > self.budget:
+                self.over_budget += 1
+
+    def recent(self) -> np.ndarray:
+        """Return a copy of the samples currently in the rolling window."""
+
+        with self._lock:
+            return np.array(self._recent[: min(self.count, len(self._recent))], dtype=np.float64)
+
+    def cumulative_buckets(self) -> Dict[float, int]:
+        """Return ``{upper_bound: count}`` including ``inf``, cumulative as in Prometheus."""
+
+        with self._lock:
+            counts = list(self._bucket_counts)
+        bounds = list(self.buckets) + [float("inf")]
+        cumulative, running = {}, 0
+        for bound, count in zip(bounds, counts):
+            running += count
+            cumulative[bound] = running
+        return cumulative
+
+    def summary(self) -> Dict[str, Any]:
+        samples = self.recent() * 1000.0
+        summary: Dict[str, Any] = {"count": self.count, "sum_s": round(self.total, 6)}
+        if samples.size:
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            summary.update(
+                p50_ms=round(float(p50), 4),
+                p95_ms=round(float(p95), 4),
+                p99_ms=round(float(p99), 4),
+                max_ms=round(float(samples.max()), 4),
+            )
+        if self.budget is not None:
+            summary["budget_ms"] = self.budget * 1000.0
+            summary["over_budget"] = self.over_budget
+        return summary
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_started")
+
+    def __init__(self, histogram: LatencyHistogram) -> None:
+        self._histogram = histogram
+        self._started = 0.0
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._histogram.observe(time.perf_counter() - self._started)
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class MetricsRegistry:
+    """Named latency histograms with timers that cost almost nothing when disabled.
+
+    ``with metrics.timer("capture"):`` records the block's duration. While
+    the registry is disabled the same call returns a shared no-op context
+    manager, so instrumentation can stay in hot paths. Use :meth:`timed` to
+    decorate whole functions, :meth:`set_budget` to count samples exceeding
+    a stage budget, and :meth:`to_json` / :meth:`to_prometheus` to export.
+    """
+
+    def __init__(self, *, enabled: bool = True, window: int = 2048, prefix: str = "runelabs") -> None:
+        self.enabled = enabled
+        self.window = window
+        self.prefix = prefix
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._budgets: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def histogram(self, stage: str) -> LatencyHistogram:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.get(stage)
+                if histogram is None:
+                    histogram = LatencyHistogram(window=self.window, budget=self._budgets.get(stage))
+                    self._histograms[stage] = histogram
+        return histogram
+
+    def timer(self, stage: str) -> Any:
+        """Return a context manager that records the duration of its block under ``stage``."""
+
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self.histogram(stage))
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if self.enabled:
+            self.histogram(stage).observe(seconds)
+
+    def timed(self, stage: str) -> Callable[[F], F]:
+        """Decorate a function so each call is recorded under ``stage``."""
+
+        def decorator(func: F) -> F:
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self.histogram(stage)):
+                    return func(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+    def set_budget(self, stage: str, seconds: float) -> None:
+        """Count samples of ``stage`` that take longer than ``seconds``."""
+
+        self._budgets[stage] = seconds
+        self.histogram(stage).budget = seconds
+
+    def stages(self) -> Sequence[str]:
+        return tuple(stage for stage, _ in self._sorted_histograms())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-stage counts and rolling-window percentiles."""
+
+        return {stage: histogram.summary() for stage, histogram in self._sorted_histograms()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def to_json(self, path: Optional[Path | str] = None) -> str:
+        text = json.dumps(self.snapshot(), indent=2, sort_keys=True)
+        if path is not None:
+            _atomic_write(Path(path), text)
+        return text
+
+    def to_prometheus(self, path: Optional[Path | str] = None) -> str:
+        """Render the text exposition format, optionally writing it for a textfile collector."""
+
+        name = f"{self.prefix}_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Latency of automation loop stages.",
+            f"# TYPE {name} histogram",
+        ]
+        for stage, histogram in self._sorted_histograms():
+            label = stage.replace("\\", "\\\\").replace('"', '\\"')
+            for bound, count in histogram.cumulative_buckets().items():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{stage="{label}",le="{le}"}} {count}')
+            lines.append(f'{name}_sum{{stage="{label}"}} {histogram.total!r}')
+            lines.append(f'{name}_count{{stage="{label}"}} {histogram.count}')
+        text = "\n".join(lines) + "\n"
+        if path is not None:
+            _atomic_write(Path(path), text)
+        return text
+
+    def _sorted_histograms(self) -> List[Tuple[str, LatencyHistogram]]:
+        # Copied under the lock so concurrent histogram() or reset() calls
+        # cannot change the dictionary while exporting.
+        with self._lock:
+            return sorted(self._histograms.items(), key=lambda item: item[0])
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+_shared_metrics: Optional[MetricsRegistry] = None
+_shared_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Return the process-wide registry used by default throughout the automation loop.
+
+    It is disabled unless ``RUNELABS_METRICS`` is set to a non-empty value
+    other than ``0``; call :meth:`MetricsRegistry.enable` to turn it on later.
+    """
+
+    global _shared_metrics
+    with _shared_lock:
+        if _shared_metrics is None:
+            flag = os.environ.get(METRICS_ENV, "")
+            _shared_metrics = MetricsRegistry(enabled=flag not in ("", "0"))
+        return _shared_metrics
+
+
+__all__ = [
+    "DEFAULT_BUCKETS",
+    "LatencyHistogram",
+    "METRICS_ENV",
+    "MetricsRegistry",
+    "get_metrics",
+]
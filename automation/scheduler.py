@@ -0,0 +1,167 @@
+"""Tick-aware polling schedule for skill loops."""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, Optional
+
+GAME_TICK = 0.6
+
+
+class TickScheduler:
+    """Decide how long a skill loop should wait before its next capture.
+
+    The game advances in ~600 ms ticks, so polling at a fixed rate either
+    wastes captures or reacts late. The scheduler has three modes:
+
+    * **Pending** – after :meth:`action_dispatched` the loop polls every
+      ``fast_interval`` seconds until :meth:`state_advanced` reports the
+      expected next state, or ``action_timeout`` expires. Once a tick
+      boundary has been observed, fast polling is confined to the first
+      ``fast_window`` seconds after each predicted boundary, and the rest of
+      the tick is slept through.
+    * **Ready** – right after a state change the next poll happens
+      immediately so follow-up actions are not delayed.
+    * **Idle** – while nothing is recognised the interval starts at one tick
+      and grows by ``idle_backoff`` per idle poll up to ``max_idle_interval``.
+
+    ``actions``, ``idle_time`` and :attr:`actions_per_hour` summarise the
+    session. ``clock`` and ``sleep`` are injectable for tests.
+    """
+
+    def __init__(
+        self,
+        *,
+        tick: float = GAME_TICK,
+        fast_interval: float = 0.05,
+        fast_window: float = 0.15,
+        idle_backoff: float = 1.5,
+        max_idle_interval: float = 4 * GAME_TICK,
+        action_timeout: float = 10 * GAME_TICK,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.tick = tick
+        self.fast_interval = fast_interval
+        self.fast_window = fast_window
+        self.idle_backoff = idle_backoff
+        self.max_idle_interval = max_idle_interval
+        self.action_timeout = action_timeout
+        self._clock = clock
+        self._sleep = sleep
+        self._started_at: Optional[float] = None
+        self._pending_since: Optional[float] = None
+        self._tick_anchor: Optional[float] = None
+        self._ready = False
+        self._idle_interval = 0.0
+        self.actions = 0
+        self.polls = 0
+        self.timeouts = 0
+        self.idle_time = 0.0
+
+    @property
+    def pending(self) -> bool:
+        """Whether an action is awaiting its expected next state."""
+
+        return self._pending_since is not None
+
+    @property
+    def elapsed(self) -> float:
+        if self._started_at is None:
+            return 0.0
+        return self._clock() - self._started_at
+
+    @property
+    def actions_per_hour(self) -> float:
+        elapsed = self.elapsed
+        return self.actions * 3600.0 / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def idle_fraction(self) -> float:
+        elapsed = self.elapsed
+        return min(1.0, self.idle_time / elapsed) if elapsed > 0 else 0.0
+
+    def action_dispatched(self) -> None:
+        """Record an action and poll fast until its effect is seen."""
+
+        now = self._now()
+        self.actions += 1
+        self._pending_since = now
+        self._ready = False
+        self._idle_interval = 0.0
+
+    def state_advanced(self) -> None:
+        """Record that the expected next state was detected."""
+
+        now = self._now()
+        self._pending_since = None
+        self._tick_anchor = now
+        self._ready = True
+        self._idle_interval = 0.0
+
+    def idle(self) -> bool:
+        """Record a poll that found nothing to do.
+
+        Returns ``True`` once when a pending action times out, so the caller
+        can retry it.
+        """
+
+        now = self._now()
+        self._ready = False
+        if self._pending_since is not None:
+            if now - self._pending_since < self.action_timeout:
+                return False
+            self._pending_since = None
+            self.timeouts += 1
+            self._idle_interval = 0.0
+            return True
+        if self._idle_interval:
+            self._idle_interval = min(self.max_idle_interval, self._idle_interval * self.idle_backoff)
+        else:
+            self._idle_interval = self.tick
+        return False
+
+    def next_delay(self) -> float:
+        """Return how long to wait before the next capture."""
+
+        if self._ready:
+            return 0.0
+        if self._pending_since is not None:
+            if self._tick_anchor is None:
+                return self.fast_interval
+            phase = (self._clock() - self._tick_anchor) % self.tick
+            if phase < self.fast_window or self.tick - phase < 1e-6:
+                return self.fast_interval
+            return self.tick - phase
+        return self._idle_interval or self.tick
+
+    def wait(self) -> float:
+        """Sleep for :meth:`next_delay` and return the time slept."""
+
+        delay = self.next_delay()
+        self.polls += 1
+        if not self.pending and self._idle_interval:
+            self.idle_time += delay
+        if delay > 0:
+            self._sleep(delay)
+        return delay
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "actions": self.actions,
+            "polls": self.polls,
+            "timeouts": self.timeouts,
+            "elapsed_s": round(self.elapsed, 3),
+            "idle_s": round(self.idle_time, 3),
+            "idle_fraction": round(self.idle_fraction, 4),
+            "actions_per_hour": round(self.actions_per_hour, 1),
+        }
+
+    def _now(self) -> float:
+        now = self._clock()
+        if self._started_at is None:
+            self._started_at = now
+        return now
+
+
+__all__ = ["GAME_TICK", "TickScheduler"]
@@ -0,0 +1,324 @@
+"""Frame ring in shared memory so match workers in other processes read frames without copies."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import threading
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from .frame_source import DEFAULT_CAPTURE_INTERVAL, Frame
+
+logger = logging.getLogger(__name__)
+
+# Control words at the start of the block.
+_LATEST_INDEX, _LATEST_SEQUENCE, _CLOSED, _DROPPED = range(4)
+_CONTROL_WORDS = 4
+_ALIGN = 64
+
+FillFunc = Callable[[np.ndarray, np.ndarray], Any]
+
+
+@dataclass
+class SharedFrameRingHandle:
+    """Everything another process needs to :meth:`attach` to a ring.
+
+    The handle holds a ``multiprocessing`` condition, so it can only be
+    passed to a child process as a ``Process`` argument (inherited at
+    start-up), not sent through a queue.
+    """
+
+    name: str
+    height: int
+    width: int
+    capacity: int
+    condition: Any
+
+    def attach(self) -> "SharedFrameRing":
+        return SharedFrameRing(self, create=False)
+
+
+class SharedFrameRing:
+    """Fixed-size ring of colour and grayscale frames in ``multiprocessing.shared_memory``.
+
+    One process creates the ring with :meth:`create` and publishes frames
+    into it. Other processes :meth:`~SharedFrameRingHandle.attach` through
+    a :meth:`handle`. Consumers get :class:`~automation.frame_source.Frame`
+    objects whose arrays are read-only views into the shared block, plus
+    the sequence number and ``time.monotonic`` timestamp of the capture.
+    Pixels never cross the process boundary by copy.
+
+    As with :class:`~automation.frame_source.FrameSource`, a consumer pins
+    a slot until it releases the frame. The writer only fills slots that
+    are neither pinned nor the latest, and drops the new frame when none
+    is free. A consumer that dies while holding a frame leaks that pin, so
+    allow a spare slot in ``capacity`` when workers may crash.
+    """
+
+    def __init__(self, handle: SharedFrameRingHandle, *, create: bool) -> None:
+        self._handle = handle
+        self._owner = create
+        height, width, capacity = handle.height, handle.width, handle.capacity
+        header = _aligned(8 * (_CONTROL_WORDS + 2 * capacity) + 8 * capacity)
+        self._slot_bytes = _aligned(height * width * 4)
+        size = header + capacity * self._slot_bytes
+        if create:
+            self._shm = shared_memory.SharedMemory(name=handle.name or None, create=True, size=size)
+            handle.name = self._shm.name
+        else:
+            self._shm = shared_memory.SharedMemory(name=handle.name)
+        buffer = self._shm.buf
+        self._control = np.ndarray((_CONTROL_WORDS,), dtype=np.int64, buffer=buffer)
+        self._pins = np.ndarray((capacity,), dtype=np.int64, buffer=buffer, offset=8 * _CONTROL_WORDS)
+        self._sequences = np.ndarray(
+            (capacity,), dtype=np.int64, buffer=buffer, offset=8 * (_CONTROL_WORDS + capacity)
+        )
+        self._timestamps = np.ndarray(
+            (capacity,), dtype=np.float64, buffer=buffer, offset=8 * (_CONTROL_WORDS + 2 * capacity)
+        )
+        self._colors: List[np.ndarray] = []
+        self._grays: List[np.ndarray] = []
+        for index in range(capacity):
+            offset = header + index * self._slot_bytes
+            self._colors.append(
+                np.ndarray((height, width, 3), dtype=np.uint8, buffer=buffer, offset=offset)
+            )
+            self._grays.append(
+                np.ndarray((height, width), dtype=np.uint8, buffer=buffer, offset=offset + height * width * 3)
+            )
+        if create:
+            self._control[:] = 0
+            self._control[_LATEST_INDEX] = -1
+            self._pins[:] = 0
+            self._sequences[:] = 0
+            self._timestamps[:] = 0.0
+        self._condition = handle.condition
+        self._closed = False
+
+    @classmethod
+    def create(
+        cls,
+        shape: Tuple[int, int],
+        *,
+        capacity: int = 3,
+        name: Optional[str] = None,
+        context: Any = None,
+    ) -> "SharedFrameRing":
+        """Allocate a ring for frames of ``shape`` ``(height, width)``."""
+
+        if capacity < 2:
+            raise ValueError("capacity must be at least 2")
+        height, width = shape
+        condition = (context or mp).Condition()
+        handle = SharedFrameRingHandle(name or "", int(height), int(width), capacity, condition)
+        return cls(handle, create=True)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self._handle.height, self._handle.width
+
+    @property
+    def capacity(self) -> int:
+        return self._handle.capacity
+
+    @property
+    def latest_sequence(self) -> int:
+        return int(self._control[_LATEST_SEQUENCE])
+
+    @property
+    def frames_dropped(self) -> int:
+        return int(self._control[_DROPPED])
+
+    @property
+    def closed(self) -> bool:
+        return bool(self._control[_CLOSED])
+
+    def handle(self) -> SharedFrameRingHandle:
+        return self._handle
+
+    # ----- Writer side -----
+    def publish(self, color: np.ndarray, grayscale: np.ndarray) -> Optional[int]:
+        """Copy a frame into a free slot; prefer :meth:`publish_with` to skip the copy."""
+
+        def _fill(slot_color: np.ndarray, slot_gray: np.ndarray) -> None:
+            np.copyto(slot_color, color)
+            np.copyto(slot_gray, grayscale)
+
+        return self.publish_with(_fill)
+
+    def publish_with(self, fill: FillFunc) -> Optional[int]:
+        """Let ``fill(color, grayscale)`` write a frame straight into a free slot.
+
+        ``fill`` typically is ``lambda c, g: window.capture(out=(c, g))``,
+        so the capture backend converts pixels directly into shared memory.
+        Returns the new sequence number, or ``None`` when every spare slot
+        is pinned and the frame was dropped.
+        """
+
+        index = self._free_slot()
+        if index is None:
+            with self._condition:
+                self._control[_DROPPED] += 1
+            return None
+        # The slot is neither pinned nor published, so readers cannot pin
+        # it while it is written outside the lock.
+        fill(self._colors[index], self._grays[index])
+        timestamp = time.monotonic()
+        with self._condition:
+            sequence = int(self._control[_LATEST_SEQUENCE]) + 1
+            self._sequences[index] = sequence
+            self._timestamps[index] = timestamp
+            self._control[_LATEST_INDEX] = index
+            self._control[_LATEST_SEQUENCE] = sequence
+            self._condition.notify_all()
+        return sequence
+
+    # ----- Reader side -----
+    def latest(self, after: int = 0) -> Optional[Frame]:
+        """Return the newest frame if its sequence number exceeds ``after``."""
+
+        with self._condition:
+            return self._acquire_latest(after)
+
+    def wait_for(self, after: int = 0, timeout: Optional[float] = None) -> Optional[Frame]:
+        """Block until a frame newer than ``after`` is published, the ring closes, or ``timeout`` expires."""
+
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._control[_LATEST_SEQUENCE] > after or self._control[_CLOSED],
+                timeout=timeout,
+            )
+            return self._acquire_latest(after)
+
+    def close(self) -> None:
+        """Detach from the block; the creating process also wakes readers and unlinks it."""
+
+        if self._closed:
+            return
+        self._closed = True
+        if self._owner:
+            with self._condition:
+                self._control[_CLOSED] = 1
+                self._condition.notify_all()
+        self._control = self._pins = self._sequences = self._timestamps = None  # type: ignore[assignment]
+        self._colors, self._grays = [], []
+        try:
+            self._shm.close()
+        except BufferError:
+            # Frames handed out in this process still reference the block;
+            # it is unmapped once they are garbage collected.
+            logger.debug("Shared frame ring closed with frames still referenced")
+        if self._owner:
+            self._shm.unlink()
+
+    def __enter__(self) -> "SharedFrameRing":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _acquire_latest(self, after: int) -> Optional[Frame]:
+        index = int(self._control[_LATEST_INDEX])
+        sequence = int(self._control[_LATEST_SEQUENCE])
+        if index < 0 or sequence <= after:
+            return None
+        self._pins[index] += 1
+        color = self._colors[index].view()
+        grayscale = self._grays[index].view()
+        color.flags.writeable = False
+        grayscale.flags.writeable = False
+        return Frame(
+            sequence=sequence,
+            timestamp=float(self._timestamps[index]),
+            color=color,
+            grayscale=grayscale,
+            _release=lambda: self._unpin(index),
+        )
+
+    def _unpin(self, index: int) -> None:
+        if self._closed:
+            return
+        with self._condition:
+            self._pins[index] -= 1
+
+    def _free_slot(self) -> Optional[int]:
+        with self._condition:
+            latest = int(self._control[_LATEST_INDEX])
+            for offset in range(1, self.capacity + 1):
+                index = (max(latest, 0) + offset) % self.capacity
+                if index != latest and self._pins[index] == 0:
+                    return index
+        return None
+
+
+class SharedFramePublisher:
+    """Capture into a :class:`SharedFrameRing` on a background thread.
+
+    ``capture`` is called with ``out=(color, grayscale)`` slot views, which
+    :meth:`~automation.window.WindowCaptureService.capture` and every
+    capture backend accept, so each frame is written exactly once.
+    As with :class:`~automation.frame_source.FrameSource`, captures are
+    ``interval`` seconds apart, and a failing capture is kept in
+    :attr:`last_error` and retried after ``error_backoff`` seconds.
+    """
+
+    def __init__(
+        self,
+        capture: Callable[..., Any],
+        ring: SharedFrameRing,
+        *,
+        interval: float = DEFAULT_CAPTURE_INTERVAL,
+        error_backoff: float = 1.0,
+        name: str = "shared-frame-publisher",
+    ) -> None:
+        self._capture = capture
+        self._ring = ring
+        self._interval = interval
+        self._error_backoff = error_backoff
+        self._name = name
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[Exception] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        fill = lambda color, grayscale: self._capture(out=(color, grayscale))  # noqa: E731
+        while not self._stop_event.is_set():
+            try:
+                self._ring.publish_with(fill)
+            except Exception as exc:
+                self.last_error = exc
+                logger.warning("Shared frame capture failed", extra={"error": str(exc)})
+                self._stop_event.wait(self._error_backoff)
+                continue
+            self.last_error = None
+            if self._interval:
+                self._stop_event.wait(self._interval)
+
+
+def _aligned(size: int) -> int:
+    return (size + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+__all__ = ["SharedFramePublisher", "SharedFrameRing", "SharedFrameRingHandle"]
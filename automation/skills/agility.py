@@ -3,79 +3,49 @@
 from __future__ import annotations
 
 import time
-from dataclasses import dataclass
+from concurrent.futures import CancelledError, Future, TimeoutError
 from typing import Optional
 
-import numpy as np
+from perception.change import FrameChangeDetector
+from perception.regions import DEFAULT_REGIONS
 
-from ..cursor import CursorAction, HumanLikeCursor
-from ..templates import TemplateLibrary, TemplateMatch
+from ..cursor import CursorAction, CursorResult, HumanLikeCursor
+from ..frame_source import DEFAULT_CAPTURE_INTERVAL, FrameSource
+from ..metrics import MetricsRegistry, get_metrics
+from ..scheduler import TickScheduler
+from ..templates import TemplateLibrary
+from ..trajectory import TrajectoryPlanner
 from ..window import WindowCaptureService
+from .agility_engine import AgilityDecisionEngine, CourseModel, DecisionOutcome
 from .base import SkillTask
 from . import register_skill
 
 
-@dataclass
-class DecisionOutcome:
-    """Represents the result of a decision made by the agility engine."""
-
-    handled: bool
-    message: Optional[str] = None
-    click_position: Optional[tuple[int, int]] = None
-    post_delay: float = 0.0
-
-
-class AgilityDecisionEngine:
-    """Encapsulates the stateful decision logic for agility courses."""
-
-    def __init__(self, template_library: TemplateLibrary) -> None:
-        self._templates = template_library
-        self.current_map: Optional[str] = None
-        self.clicks_to_spend = 0
-
-    def evaluate(self, grayscale: np.ndarray) -> DecisionOutcome:
-        if self.clicks_to_spend == 0:
-            match = self._templates.match_first(grayscale, prefixes=("Map",))
-            if match:
-                self.current_map = match.name
-                self.clicks_to_spend = 1
-                return DecisionOutcome(True, f"Minimap state recognized: {match.name}")
-
-        if self.clicks_to_spend > 0:
-            mog_match = self._templates.match_first(grayscale, prefixes=("Mog",))
-            if mog_match:
-                self.clicks_to_spend += 1
-                return DecisionOutcome(
-                    True,
-                    f"Mark of grace recognized: {mog_match.name}",
-                    mog_match.center,
-                    post_delay=2.0,
-                )
-
-            click_match = self._templates.match_first(grayscale, prefixes=("Clm", "Clk", "Cl"))
-            if click_match:
-                self.clicks_to_spend = max(0, self.clicks_to_spend - 1)
-                message = self._message_for_click(click_match)
-                return DecisionOutcome(
-                    True,
-                    message,
-                    click_match.center,
-                    post_delay=3.0,
-                )
-
-        return DecisionOutcome(False)
-
-    @staticmethod
-    def _message_for_click(match: TemplateMatch) -> str:
-        if match.name.startswith("Clm"):
-            return f"Click of grace recognized: {match.name}"
-        if match.name.startswith("Clk"):
-            return f"Click point recognized: {match.name}"
-        return f"Click recognized: {match.name}"
+class AgilitySkill(SkillTask):
+    """Implements the agility routine using the shared services.
 
+    With ``threaded_capture`` (or an explicit ``frame_source``) frames are
+    captured on a background thread and :meth:`update` evaluates the newest
+    one, so capture latency overlaps template matching.
 
-class AgilitySkill(SkillTask):
-    """Implements the agility routine using the shared services."""
+    Each :meth:`update` records ``agility.capture``, ``agility.decide``,
+    ``agility.dispatch`` and the whole ``agility.tick`` (excluding the
+    pacing sleeps) in ``metrics``.
+
+    Pacing comes from a :class:`~automation.scheduler.TickScheduler`. It
+    polls quickly after a click until the engine sees the next course
+    state, and backs off while nothing is recognised. Each click supersedes
+    any click still queued, and fast polling starts once the cursor reports
+    that the click has landed. Pass
+    ``adaptive_timing=False`` to restore the fixed ``post_delay`` sleeps.
+
+    The default cursor follows smooth trajectories timed by distance, so
+    short hops between obstacles take less time than long sweeps.
+
+    The default engine infers a :class:`CourseModel` from the template
+    names, so after each minimap state it tries the matching obstacle
+    first instead of every click template.
+    """
 
     def __init__(
         self,
@@ -89,20 +59,68 @@ class AgilitySkill(SkillTask):
         enable_preview: bool = True,
         preview_name: str = "RuneLite Capture",
         manage_window_geometry: bool = True,
+        threaded_capture: bool = False,
+        frame_source: Optional[FrameSource] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        scheduler: Optional[TickScheduler] = None,
+        adaptive_timing: bool = True,
+        click_timeout: float = 5.0,
     ) -> None:
+        self._click_timeout = click_timeout
+        self._last_click: Optional["Future[CursorResult]"] = None
+        self._metrics = metrics or get_metrics()
+        if scheduler is None and adaptive_timing:
+            scheduler = TickScheduler()
+        self._scheduler = scheduler
         self._window_service = window_service or WindowCaptureService(
             window_title, manage_geometry=manage_window_geometry
         )
         self._preview_name = preview_name if enable_preview else None
         self._preview_configured = False
 
-        self._templates = template_library or TemplateLibrary(template_dir)
-        self._cursor = cursor or HumanLikeCursor()
+        self._templates = template_library or TemplateLibrary(
+            template_dir, regions=DEFAULT_REGIONS
+        )
+        self._cursor = cursor or HumanLikeCursor(planner=TrajectoryPlanner())
         self._own_cursor = cursor is None
         self._cursor_started = False
-        self._decision_engine = decision_engine or AgilityDecisionEngine(self._templates)
+        self._decision_engine = decision_engine or AgilityDecisionEngine(
+            self._templates,
+            change_detector=FrameChangeDetector(),
+            wait_for_progress=scheduler is not None,
+            course=CourseModel.from_templates(self._templates.templates),
+        )
+        if frame_source is None and threaded_capture:
+            frame_source = FrameSource(
+                self._window_service.capture,
+                interval=scheduler.fast_interval if scheduler is not None else DEFAULT_CAPTURE_INTERVAL,
+                name="agility-capture",
+            )
+        self._frame_source = frame_source
+        self._frame_source_started = False
+        self._last_sequence = 0
         self._running = False
 
+    @property
+    def skip_ratio(self) -> float:
+        """Fraction of frames the decision engine answered without re-matching."""
+
+        return self._decision_engine.skip_ratio
+
+    @property
+    def scheduler(self) -> Optional[TickScheduler]:
+        return self._scheduler
+
+    @property
+    def actions_per_hour(self) -> float:
+        return self._scheduler.actions_per_hour if self._scheduler is not None else 0.0
+
+    @property
+    def idle_time(self) -> float:
+        """Seconds spent backing off with nothing recognised."""
+
+        return self._scheduler.idle_time if self._scheduler is not None else 0.0
+
     def start(self) -> None:
         if self._preview_name and not self._preview_configured:
             self._window_service.configure_preview(self._preview_name)
@@ -110,10 +128,16 @@ class AgilitySkill(SkillTask):
         if not self._cursor_started:
             self._cursor.start()
             self._cursor_started = True
+        if self._frame_source is not None and not self._frame_source.is_running:
+            self._frame_source.start()
+            self._frame_source_started = True
         self._running = True
 
     def stop(self) -> None:
         self._running = False
+        if self._frame_source_started and self._frame_source is not None:
+            self._frame_source.stop()
+            self._frame_source_started = False
         if self._own_cursor and self._cursor_started:
             self._cursor.stop()
         self._cursor_started = False
@@ -124,27 +148,79 @@ class AgilitySkill(SkillTask):
     def update(self) -> None:
         if not self._running:
             return
-        try:
-            color, grayscale = self._window_service.capture()
-        except RuntimeError as exc:
-            print(f"Window capture failed: {exc}")
-            time.sleep(1)
+        started = time.perf_counter()
+        metrics = self._metrics
+        if self._frame_source is not None:
+            with metrics.timer("agility.capture"):
+                frame = self._frame_source.wait_for(self._last_sequence, timeout=0.1)
+            if frame is None:
+                if self._frame_source.last_error is not None:
+                    print(f"Window capture failed: {self._frame_source.last_error}")
+                return
+            with frame:
+                self._last_sequence = frame.sequence
+                with metrics.timer("agility.decide"):
+                    outcome = self._decision_engine.evaluate(frame.grayscale, frame.sequence)
+        else:
+            try:
+                with metrics.timer("agility.capture"):
+                    color, grayscale = self._window_service.capture()
+            except RuntimeError as exc:
+                print(f"Window capture failed: {exc}")
+                time.sleep(1)
+                return
+            with metrics.timer("agility.decide"):
+                outcome = self._decision_engine.evaluate(grayscale)
+
+        if outcome.click_position and outcome.handled:
+            with metrics.timer("agility.dispatch"):
+                position = self._window_service.to_screen(outcome.click_position)
+                self._last_click = self._cursor.queue_click(CursorAction(position=position), supersede=True)
+        metrics.observe("agility.tick", time.perf_counter() - started)
+
+        if self._scheduler is not None:
+            self._pace(outcome)
             return
-
-        outcome = self._decision_engine.evaluate(grayscale)
         if outcome.handled:
             if outcome.message:
                 print(outcome.message)
-            if outcome.click_position:
-                self._cursor.queue_click(CursorAction(position=outcome.click_position))
             if outcome.post_delay:
                 time.sleep(outcome.post_delay)
         else:
             print("No state recognized: Waiting")
         time.sleep(0.1)
 
+    def _pace(self, outcome: DecisionOutcome) -> None:
+        assert self._scheduler is not None
+        if outcome.handled:
+            if outcome.message:
+                print(outcome.message)
+            if outcome.click_position:
+                self._await_click()
+                self._scheduler.action_dispatched()
+            else:
+                self._scheduler.state_advanced()
+        elif self._scheduler.idle():
+            print("Action timed out: retrying")
+            self._decision_engine.clear_expectation()
+        elif not self._scheduler.pending:
+            print(outcome.message or "No state recognized: Waiting")
+        self._scheduler.wait()
+
+    def _await_click(self) -> None:
+        if self._last_click is None:
+            return
+        try:
+            self._last_click.result(timeout=self._click_timeout)
+        except CancelledError:
+            print("Click superseded")
+        except TimeoutError:
+            print("Click still pending: continuing")
+        except RuntimeError as exc:
+            print(f"Click failed: {exc}")
+
 
 register_skill("agility", AgilitySkill)
 
 
-__all__ = ["AgilitySkill", "AgilityDecisionEngine", "DecisionOutcome"]
+__all__ = ["AgilitySkill", "AgilityDecisionEngine", "CourseModel", "DecisionOutcome"]
@@ -0,0 +1,240 @@
+"""Decision logic for agility courses, independent of capture and input."""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+import numpy as np
+
+from perception.change import FrameChangeDetector
+
+from ..templates import FrameScores, TemplateLibrary, TemplateMatch
+
+# Queried in this order; each query stops at its first match.
+MAP_PREFIXES = ("Map",)
+MOG_PREFIXES = ("Mog",)
+CLICK_PREFIXES = ("Clm", "Clk", "Cl")
+
+_STEP_PATTERN = re.compile(r"^(?:Map|Cl[a-z])(\w+)$")
+
+
+@dataclass
+class CourseModel:
+    """Obstacle templates expected next for each minimap state.
+
+    ``expected`` maps a ``Map*`` template name to the click templates worth
+    trying first while that minimap state is current, for example
+    ``{"Map3.jpg": ("Clk3.jpg",)}`` on Canifis.
+    """
+
+    expected: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def from_templates(cls, names: Iterable[str]) -> "CourseModel":
+        """Pair each ``Map<step>`` template with the ``Cl*<step>`` templates sharing its step.
+
+        The step is the part of the name after the prefix, compared without
+        case or extension, so ``Map6F.png`` expects ``Clk6f.png``.
+        """
+
+        maps: Dict[str, str] = {}
+        clicks: Dict[str, list] = {}
+        for name in sorted(names):
+            step = _template_step(name)
+            if step is None:
+                continue
+            if name.startswith(MAP_PREFIXES):
+                maps[name] = step
+            elif name.startswith(CLICK_PREFIXES):
+                clicks.setdefault(step, []).append(name)
+        return cls({name: tuple(clicks[step]) for name, step in maps.items() if step in clicks})
+
+    def expected_after(self, map_name: Optional[str]) -> Tuple[str, ...]:
+        if map_name is None:
+            return ()
+        return self.expected.get(map_name, ())
+
+
+@dataclass
+class DecisionOutcome:
+    """Represents the result of a decision made by the agility engine.
+
+    ``match_calls`` is the number of template matches the decision cost.
+    """
+
+    handled: bool
+    message: Optional[str] = None
+    click_position: Optional[tuple[int, int]] = None
+    post_delay: float = 0.0
+    match_calls: int = 0
+
+
+class AgilityDecisionEngine:
+    """Encapsulates the stateful decision logic for agility courses.
+
+    With a ``change_detector`` the engine reuses its previous outcome when
+    neither the frame nor the engine state changed since the last
+    evaluation, because matching would reproduce the same result. Handled
+    outcomes always change the state, so clicks are never replayed.
+
+    With ``wait_for_progress`` the engine remembers the template it acted on
+    (the minimap position for an obstacle, or the mark of grace) and
+    reports an unhandled "waiting" outcome while that template is still
+    visible. This lets the caller poll quickly after a click without
+    clicking the same target twice. Call :meth:`clear_expectation` to allow
+    a retry when the action evidently failed.
+
+    Template results are memoised per frame. Pass the capture ``sequence``
+    to :meth:`evaluate`, and re-evaluating the same frame after a state
+    change matches only templates that have not been scored yet. Without a
+    sequence the memo still spans the queries of one evaluation.
+    ``match_calls`` totals the matches run and ``last_match_calls`` holds
+    the cost of the latest evaluation (zero when it was skipped).
+
+    With a ``course`` model the engine first tries only the click templates
+    expected for the current minimap state. After ``fallback_after``
+    consecutive evaluations without a hit among them, it also searches the
+    full click set until an obstacle is clicked or the minimap changes.
+    The miss count is part of the state, so an unchanged frame still
+    reaches the fallback.
+    """
+
+    def __init__(
+        self,
+        template_library: TemplateLibrary,
+        *,
+        change_detector: Optional[FrameChangeDetector] = None,
+        wait_for_progress: bool = False,
+        course: Optional[CourseModel] = None,
+        fallback_after: int = 2,
+    ) -> None:
+        self._templates = template_library
+        self.course = course
+        self.fallback_after = fallback_after
+        self.expected_misses = 0
+        self._change_detector = change_detector
+        self.wait_for_progress = wait_for_progress
+        self.awaiting: Optional[str] = None
+        self.current_map: Optional[str] = None
+        self.clicks_to_spend = 0
+        self.frames_evaluated = 0
+        self.frames_skipped = 0
+        self.match_calls = 0
+        self.last_match_calls = 0
+        self._scores = FrameScores()
+        self._last_outcome: Optional[DecisionOutcome] = None
+        self._last_state: Optional[Tuple[Optional[str], int, Optional[str], int]] = None
+
+    @property
+    def skip_ratio(self) -> float:
+        """Fraction of frames answered from the previous outcome."""
+
+        total = self.frames_evaluated + self.frames_skipped
+        return self.frames_skipped / total if total else 0.0
+
+    def evaluate(self, grayscale: np.ndarray, sequence: Hashable = None) -> DecisionOutcome:
+        state = (self.current_map, self.clicks_to_spend, self.awaiting, self.expected_misses)
+        changed = self._change_detector is None or self._change_detector.has_changed(grayscale)
+        if not changed and self._last_outcome is not None and state == self._last_state:
+            self.frames_skipped += 1
+            self.last_match_calls = 0
+            return self._last_outcome
+
+        self.frames_evaluated += 1
+        scores = self._scores.for_frame(sequence)
+        calls_before = scores.match_calls
+        outcome = self._evaluate(grayscale, scores)
+        outcome.match_calls = scores.match_calls - calls_before
+        self.last_match_calls = outcome.match_calls
+        self.match_calls += outcome.match_calls
+        self._last_outcome = outcome
+        self._last_state = state
+        return outcome
+
+    def clear_expectation(self) -> None:
+        """Forget the pending action so its target can be acted on again."""
+
+        self.awaiting = None
+
+    def _evaluate(self, grayscale: np.ndarray, scores: FrameScores) -> DecisionOutcome:
+        if self.clicks_to_spend == 0:
+            match = self._templates.match_first(grayscale, prefixes=MAP_PREFIXES, scores=scores)
+            if match:
+                if self.wait_for_progress and match.name == self.awaiting:
+                    return DecisionOutcome(False, f"Waiting to leave {match.name}")
+                self.awaiting = None
+                self.current_map = match.name
+                self.clicks_to_spend = 1
+                self.expected_misses = 0
+                return DecisionOutcome(True, f"Minimap state recognized: {match.name}")
+
+        if self.clicks_to_spend > 0:
+            if self.wait_for_progress and self.awaiting is not None and self.awaiting == self.current_map:
+                # An obstacle was clicked but a mark of grace left a click to
+                # spend; hold off until a different minimap state shows up.
+                # No minimap match is normal while the player is moving.
+                map_match = self._templates.match_first(grayscale, prefixes=MAP_PREFIXES, scores=scores)
+                if map_match is None or map_match.name == self.awaiting:
+                    return DecisionOutcome(False, f"Waiting to leave {self.awaiting}")
+                self.awaiting = None
+                self.current_map = map_match.name
+                self.expected_misses = 0
+
+            mog_match = self._templates.match_first(grayscale, prefixes=MOG_PREFIXES, scores=scores)
+            if mog_match:
+                if self.wait_for_progress and mog_match.name == self.awaiting:
+                    return DecisionOutcome(False, f"Waiting to collect {mog_match.name}")
+                self.awaiting = mog_match.name
+                self.clicks_to_spend += 1
+                return DecisionOutcome(
+                    True,
+                    f"Mark of grace recognized: {mog_match.name}",
+                    mog_match.center,
+                    post_delay=2.0,
+                )
+
+            click_match = self._match_click(grayscale, scores)
+            if click_match:
+                self.expected_misses = 0
+                self.clicks_to_spend = max(0, self.clicks_to_spend - 1)
+                self.awaiting = self.current_map
+                message = self._message_for_click(click_match)
+                return DecisionOutcome(
+                    True,
+                    message,
+                    click_match.center,
+                    post_delay=3.0,
+                )
+
+        return DecisionOutcome(False)
+
+    def _match_click(self, grayscale: np.ndarray, scores: FrameScores) -> Optional[TemplateMatch]:
+        expected = self.course.expected_after(self.current_map) if self.course else ()
+        if expected:
+            match = self._templates.match_first(grayscale, prefixes=expected, scores=scores)
+            if match is not None:
+                return match
+            if self.expected_misses < self.fallback_after:
+                self.expected_misses += 1
+                if self.expected_misses < self.fallback_after:
+                    return None
+        return self._templates.match_first(grayscale, prefixes=CLICK_PREFIXES, scores=scores)
+
+    @staticmethod
+    def _message_for_click(match: TemplateMatch) -> str:
+        if match.name.startswith("Clm"):
+            return f"Click of grace recognized: {match.name}"
+        if match.name.startswith("Clk"):
+            return f"Click point recognized: {match.name}"
+        return f"Click recognized: {match.name}"
+
+
+def _template_step(name: str) -> Optional[str]:
+    match = _STEP_PATTERN.match(os.path.splitext(name)[0])
+    return match.group(1).lower() if match else None
+
+
+__all__ = ["AgilityDecisionEngine", "CourseModel", "DecisionOutcome"]
@@ -0,0 +1,343 @@
+"""Drive several RuneLite clients from one process."""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import pyautogui
+
+from utils.env_manager import SecureEnvManager
+
+from .cursor import CursorExecutor, CursorService, HumanLikeCursor, _make_executor
+from .metrics import MetricsRegistry, get_metrics
+from .skills.base import SkillTask
+from .trajectory import TrajectoryPlanner
+from .window import WindowCaptureService, _window_handle, find_client_windows
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClientContext:
+    """Everything a pipeline needs to drive one client window.
+
+    ``shared`` is one dictionary for the whole supervisor, so pipelines can
+    build expensive read-only objects (such as a ``TemplateLibrary``) once
+    and reuse them for every client.
+    """
+
+    index: int
+    handle: int
+    account: Optional[str]
+    credentials: Dict[str, str]
+    window_service: WindowCaptureService
+    cursor: HumanLikeCursor
+    executor: Executor
+    metrics: MetricsRegistry
+    shared: Dict[str, Any]
+
+
+PipelineFactory = Callable[[ClientContext], SkillTask]
+
+
+@dataclass
+class ClientStatus:
+    """Snapshot of one client's pipeline."""
+
+    account: Optional[str]
+    handle: int
+    state: str = "idle"
+    updates: int = 0
+    errors: int = 0
+    error: Optional[str] = None
+
+
+@dataclass
+class _Client:
+    context: ClientContext
+    skill: SkillTask
+    status: ClientStatus
+    stop_event: threading.Event = field(default_factory=threading.Event)
+    thread: Optional[threading.Thread] = None
+
+
+class MultiClientSupervisor:
+    """Run one skill pipeline per RuneLite window, all in this process.
+
+    Every window whose title contains ``title`` is found by handle and
+    paired with an account from ``accounts``. By default the accounts come
+    from :meth:`SecureEnvManager.get_user_credentials`. A window whose
+    title shows an account's ``login`` or ``username`` gets that account,
+    and the remaining windows take the remaining accounts in order.
+    ``pipeline_factory`` builds the skill for each client from its
+    :class:`ClientContext`.
+
+    Clients share the process-wide template cache and one worker pool
+    (``executor``) for matching. The single physical mouse is a shared
+    :class:`~automation.cursor.CursorService`, which serves clients
+    round-robin and focuses each client's window before its click. With
+    ``tile`` the windows are resized by ``size_ratio`` and laid out in a
+    grid so they are all visible for capture at the same time.
+    """
+
+    def __init__(
+        self,
+        pipeline_factory: PipelineFactory,
+        *,
+        title: str = "RuneLite",
+        accounts: Optional[Mapping[str, Mapping[str, str]]] = None,
+        env_manager: Optional[SecureEnvManager] = None,
+        cursor_executor: "CursorExecutor | str" = "thread",
+        planner: Optional[TrajectoryPlanner] = None,
+        executor: Optional[Executor] = None,
+        max_workers: int = 4,
+        tile: bool = True,
+        size_ratio: float = 0.5,
+        screen_size: Optional[Tuple[int, int]] = None,
+        error_backoff: float = 1.0,
+        metrics: Optional[MetricsRegistry] = None,
+        find_windows: Callable[[str], Sequence[Any]] = find_client_windows,
+        window_factory: Optional[Callable[[int, Tuple[int, int]], WindowCaptureService]] = None,
+    ) -> None:
+        self.pipeline_factory = pipeline_factory
+        self.title = title
+        self.tile = tile
+        self.size_ratio = size_ratio
+        self.error_backoff = error_backoff
+        self.metrics = metrics or get_metrics()
+        self._accounts = accounts
+        self._env_manager = env_manager
+        self._screen_size = screen_size
+        self._find_windows = find_windows
+        self._window_factory = window_factory or self._default_window
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="client-match"
+        )
+        self.cursor_service = CursorService(
+            _make_executor(cursor_executor, planner or TrajectoryPlanner()), metrics=self.metrics
+        )
+        self.shared: Dict[str, Any] = {}
+        self._clients: List[_Client] = []
+        self._lock = threading.Lock()
+
+    @property
+    def clients(self) -> Tuple[ClientContext, ...]:
+        return tuple(client.context for client in self._clients)
+
+    def discover(self) -> Tuple[ClientContext, ...]:
+        """Find client windows, assign accounts, and build one pipeline per client."""
+
+        if self._clients:
+            raise RuntimeError("Clients have already been discovered")
+        accounts = self._accounts
+        if accounts is None:
+            accounts = (self._env_manager or SecureEnvManager()).get_user_credentials()
+        windows = list(self._find_windows(self.title))
+        pairs = assign_accounts(windows, accounts)
+        if len(windows) > len(pairs):
+            logger.warning(
+                "More client windows than accounts; extra windows are ignored",
+                extra={"windows": len(windows), "accounts": len(accounts)},
+            )
+        positions = tile_positions(len(pairs), self.size_ratio, self._screen_dimensions())
+        for index, ((window, account), position) in enumerate(zip(pairs, positions)):
+            handle = _window_handle(window)
+            window_service = self._window_factory(handle, position)
+            cursor = HumanLikeCursor(service=self.cursor_service, before_action=window_service.activate)
+            context = ClientContext(
+                index=index,
+                handle=handle,
+                account=account,
+                credentials=dict(accounts[account]),
+                window_service=window_service,
+                cursor=cursor,
+                executor=self._executor,
+                metrics=self.metrics,
+                shared=self.shared,
+            )
+            skill = self.pipeline_factory(context)
+            self._clients.append(_Client(context, skill, ClientStatus(account, handle)))
+        logger.info("Discovered clients", extra={"clients": len(self._clients)})
+        return self.clients
+
+    def start(self) -> None:
+        if not self._clients:
+            self.discover()
+        self.cursor_service.start()
+        for client in self._clients:
+            if client.thread is not None and client.thread.is_alive():
+                continue
+            client.stop_event.clear()
+            client.thread = threading.Thread(
+                target=self._run_client,
+                args=(client,),
+                name=f"client-{client.context.account or client.context.index}",
+                daemon=True,
+            )
+            client.thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        for client in self._clients:
+            client.stop_event.set()
+        self.cursor_service.cancel_pending(abort_current=True)
+        for client in self._clients:
+            if client.thread is not None:
+                client.thread.join(timeout=timeout)
+                client.thread = None
+        self.cursor_service.stop()
+
+    def close(self) -> None:
+        """Stop every client and release the worker pool and windows."""
+
+        self.stop()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        for client in self._clients:
+            close = getattr(client.context.window_service, "close", None)
+            if close is not None:
+                close()
+
+    def status(self) -> List[ClientStatus]:
+        with self._lock:
+            return [replace(client.status) for client in self._clients]
+
+    def _run_client(self, client: _Client) -> None:
+        skill = client.skill
+        try:
+            skill.start()
+            self._set_state(client, "running")
+            while not client.stop_event.is_set():
+                try:
+                    skill.update()
+                except Exception as exc:
+                    logger.exception("Client update failed", extra={"account": client.context.account})
+                    with self._lock:
+                        client.status.errors += 1
+                        client.status.error = str(exc)
+                    client.stop_event.wait(self.error_backoff)
+                    continue
+                with self._lock:
+                    client.status.updates += 1
+        except Exception as exc:
+            logger.exception("Client pipeline failed", extra={"account": client.context.account})
+            with self._lock:
+                client.status.error = str(exc)
+            self._set_state(client, "error")
+            return
+        finally:
+            try:
+                skill.stop()
+            except Exception:  # pragma: no cover - defensive cleanup
+                logger.exception("Client shutdown failed", extra={"account": client.context.account})
+        self._set_state(client, "stopped")
+
+    def _set_state(self, client: _Client, state: str) -> None:
+        with self._lock:
+            client.status.state = state
+
+    def _screen_dimensions(self) -> Tuple[int, int]:
+        if self._screen_size is not None:
+            return self._screen_size
+        width, height = pyautogui.size()
+        return int(width), int(height)
+
+    def _default_window(self, handle: int, position: Tuple[int, int]) -> WindowCaptureService:
+        return WindowCaptureService(
+            self.title,
+            handle=handle,
+            size_ratio=self.size_ratio,
+            position=position,
+            manage_geometry=self.tile,
+            require_active=False,
+            metrics=self.metrics,
+        )
+
+
+def assign_accounts(
+    windows: Sequence[Any], accounts: Mapping[str, Mapping[str, str]]
+) -> List[Tuple[Any, str]]:
+    """Pair windows with account labels, preferring accounts named in the window title."""
+
+    remaining = list(accounts)
+    assigned: Dict[int, str] = {}
+    for index, window in enumerate(windows):
+        title = getattr(window, "title", "") or ""
+        for label in remaining:
+            names = (accounts[label].get("login"), accounts[label].get("username"))
+            if any(name and name in title for name in names):
+                assigned[index] = label
+                remaining.remove(label)
+                break
+    pairs: List[Tuple[Any, str]] = []
+    for index, window in enumerate(windows):
+        label = assigned.get(index)
+        if label is None and remaining:
+            label = remaining.pop(0)
+        if label is not None:
+            pairs.append((window, label))
+    return pairs
+
+
+def tile_positions(count: int, size_ratio: float, screen_size: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """Top-left corners for ``count`` windows of ``size_ratio`` of the screen, in a grid.
+
+    When more windows are requested than fit, the grid wraps around and
+    later windows overlap earlier ones.
+    """
+
+    width = int(screen_size[0] * size_ratio)
+    height = int(screen_size[1] * size_ratio)
+    columns = max(1, int(1 / size_ratio + 1e-9))
+    rows = max(1, int(1 / size_ratio + 1e-9))
+    positions = []
+    for index in range(count):
+        slot = index % (columns * rows)
+        positions.append(((slot % columns) * width, (slot // columns) * height))
+    return positions
+
+
+def agility_pipeline(template_dir: str = "Agility/Canifis/", **skill_options: Any) -> PipelineFactory:
+    """Return a factory building an :class:`AgilitySkill` per client.
+
+    All clients share a single template library that matches on the
+    supervisor's worker pool.
+    """
+
+    def factory(context: ClientContext) -> SkillTask:
+        from perception.regions import DEFAULT_REGIONS
+
+        from .skills.agility import AgilitySkill
+        from .templates import TemplateLibrary
+
+        library = context.shared.get("agility_templates")
+        if library is None:
+            library = TemplateLibrary(
+                template_dir, regions=DEFAULT_REGIONS, executor=context.executor, metrics=context.metrics
+            )
+            context.shared["agility_templates"] = library
+        options = {"enable_preview": False, **skill_options}
+        return AgilitySkill(
+            window_service=context.window_service,
+            template_library=library,
+            cursor=context.cursor,
+            metrics=context.metrics,
+            **options,
+        )
+
+    return factory
+
+
+__all__ = [
+    "ClientContext",
+    "ClientStatus",
+    "MultiClientSupervisor",
+    "PipelineFactory",
+    "agility_pipeline",
+    "assign_accounts",
+    "tile_positions",
+]
@@ -3,12 +3,27 @@
 from __future__ import annotations
 
 import os
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Dict, Iterable, Optional, Tuple
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
 
 import cv2
 import numpy as np
 
+from perception.atlas import load_atlas_templates
+from perception.matching import (
+    DirectMatcher,
+    ImagePyramid,
+    MatchHit,
+    PreparedTemplate,
+    TemplateMatcher,
+    prepare_template,
+)
+from perception.regions import RegionRegistry
+from perception.template_cache import TemplateCache, get_template_cache
+
+from .metrics import MetricsRegistry, get_metrics
+
 
 @dataclass
 class TemplateMatch:
@@ -19,53 +34,331 @@ class TemplateMatch:
     score: float
 
 
+class FrameScores:
+    """Template results for one frame, shared by every query on that frame.
+
+    Pass the same instance to successive
+    :meth:`TemplateLibrary.match_first` calls. Each template is then matched
+    at most once per frame, and the cropped search areas are reused too.
+    :meth:`for_frame` starts over whenever the frame key (usually the
+    capture sequence number) changes. ``match_calls`` counts template
+    evaluations since the last reset; with the default
+    :class:`~perception.matching.DirectMatcher` each is one
+    ``cv2.matchTemplate`` call. ``cache_hits`` counts results served from
+    the memo.
+    """
+
+    def __init__(self) -> None:
+        self.frame_key: Hashable = None
+        self.results: Dict[str, Optional[TemplateMatch]] = {}
+        self.searches: Dict[Tuple[int, int, int, int], ImagePyramid] = {}
+        self.match_calls = 0
+        self.cache_hits = 0
+
+    def for_frame(self, frame_key: Hashable = None) -> "FrameScores":
+        """Reset unless ``frame_key`` names the frame already cached; ``None`` always resets."""
+
+        if frame_key is None or frame_key != self.frame_key:
+            self.frame_key = frame_key
+            self.results = {}
+            self.searches = {}
+            self.match_calls = 0
+            self.cache_hits = 0
+        return self
+
+
 class TemplateLibrary:
-    """Load and query OpenCV templates from disk."""
+    """Load and query OpenCV templates from disk.
+
+    ``matcher`` selects the search strategy; pass a
+    :class:`~perception.matching.PyramidMatcher` for coarse-to-fine matching
+    on large frames. The default matches at full resolution. ``regions``
+    restricts each template to the part of the window it can appear in; the
+    reported centres are always in full-frame coordinates.
+
+    With ``workers`` above one (or a shared ``executor``) candidate
+    templates are matched concurrently; OpenCV releases the GIL inside
+    ``matchTemplate``. Results are still consumed in sorted-name order, so
+    the returned match is the same as a sequential scan, and queued
+    lower-priority work is cancelled once it is decided.
+
+    Each template match is timed under ``match.<template name>`` in
+    ``metrics`` (the shared registry by default).
+
+    The candidate list for each prefix tuple is computed once. Pass a
+    :class:`FrameScores` to :meth:`match_first` or :meth:`match_best` to
+    memoise results across several queries on the same frame.
+
+    Templates are converted to grayscale once at load time. A template
+    with a transparent background has its alpha channel kept as a mask, so
+    only its opaque pixels are compared (see
+    :func:`~perception.matching.prepare_template`); ``masked_method``
+    selects the OpenCV method for those.
+
+    Templates packed with ``python -m perception.atlas`` are taken from
+    the memory-mapped atlas in ``atlas_dir`` (``<template_dir>/.atlas`` by
+    default) instead of being decoded; files changed since the atlas was
+    built are decoded as usual.
 
-    def __init__(self, template_dir: str, threshold: float = 0.9) -> None:
+    Matchers with a ``prepare`` method, such as
+    :class:`~perception.matching.AdaptiveMatcher`, receive every template
+    once after loading, so they can plan per template.
+
+    Each template reports its strongest location. :meth:`match_best`
+    picks the highest-scoring template, and :meth:`match_all` returns
+    every separate hit after non-maximum suppression.
+    """
+
+    def __init__(
+        self,
+        template_dir: str,
+        threshold: float = 0.9,
+        *,
+        matcher: Optional[TemplateMatcher] = None,
+        regions: Optional[RegionRegistry] = None,
+        cache: Optional[TemplateCache] = None,
+        workers: int = 1,
+        executor: Optional[Executor] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        masked_method: int = cv2.TM_CCOEFF_NORMED,
+        atlas_dir: Optional[str] = None,
+    ) -> None:
         self.template_dir = template_dir
+        self.atlas_dir = atlas_dir
+        self.masked_method = masked_method
         self.threshold = threshold
+        self.matcher = matcher or DirectMatcher()
+        self.regions = regions
+        self._cache = cache or get_template_cache()
+        self._metrics = metrics or get_metrics()
+        self._own_executor = executor is None and workers > 1
+        if self._own_executor:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="template-match")
+        self._executor = executor
         self.templates: Dict[str, np.ndarray] = {}
+        self.prepared: Dict[str, PreparedTemplate] = {}
+        self._candidates: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
         self._load_templates()
 
     def _load_templates(self) -> None:
+        packed = load_atlas_templates(
+            self.template_dir, atlas_dir=self.atlas_dir, masked_method=self.masked_method
+        )
         for filename in os.listdir(self.template_dir):
             path = os.path.join(self.template_dir, filename)
             if not os.path.isfile(path):
                 continue
-            template = cv2.imread(path, 0)
-            if template is None:
-                continue
-            self.templates[filename] = template
+            prepared = packed.get(filename)
+            if prepared is None:
+                image = self._cache.load(path, cv2.IMREAD_UNCHANGED)
+                if image is None:
+                    continue
+                prepared = prepare_template(image, masked_method=self.masked_method)
+            self.prepared[filename] = prepared
+            self.templates[filename] = prepared.image
+        prepare = getattr(self.matcher, "prepare", None)
+        if prepare is not None:
+            prepare(self.prepared.values())
+
+    def candidates(self, prefixes: Iterable[str]) -> Tuple[str, ...]:
+        """Return the template names starting with any of ``prefixes``, in sorted order."""
+
+        key = tuple(prefixes)
+        names = self._candidates.get(key)
+        if names is None:
+            names = tuple(name for name in sorted(self.templates) if name.startswith(key))
+            self._candidates[key] = names
+        return names
 
     def match_first(
         self,
         grayscale: np.ndarray,
         *,
         prefixes: Iterable[str],
+        scores: Optional[FrameScores] = None,
     ) -> Optional[TemplateMatch]:
-        """Return the first matching template with the given prefixes."""
+        """Return the first matching template with the given prefixes.
 
-        for template_name in sorted(self.templates):
-            if not any(template_name.startswith(prefix) for prefix in prefixes):
-                continue
-            match = self._match_template(template_name, grayscale)
-            if match is not None:
-                return match
-        return None
+        ``scores`` must belong to ``grayscale``; templates it already holds
+        are not matched again.
+        """
+
+        if scores is None:
+            scores = FrameScores()
+        candidates = self.candidates(prefixes)
+        pending = [name for name in candidates if name not in scores.results]
+        if self._executor is None or len(pending) < 2:
+            for template_name in candidates:
+                match = self._cached_match(template_name, grayscale, scores)
+                if match is not None:
+                    return match
+            return None
+        return self._match_first_parallel(candidates, pending, grayscale, scores)
+
+    def match_best(
+        self,
+        grayscale: np.ndarray,
+        *,
+        prefixes: Iterable[str],
+        scores: Optional[FrameScores] = None,
+    ) -> Optional[TemplateMatch]:
+        """Return the highest-scoring match among all templates with the given prefixes."""
+
+        if scores is None:
+            scores = FrameScores()
+        candidates = self.candidates(prefixes)
+        pending = [name for name in candidates if name not in scores.results]
+        fresh: Tuple[str, ...] = ()
+        if self._executor is not None and len(pending) > 1:
+            fresh = tuple(pending)
+            for template_name in pending:
+                self._search_area(template_name, grayscale, scores.searches)
+            futures = [
+                self._executor.submit(self._match_template, template_name, grayscale, scores.searches)
+                for template_name in pending
+            ]
+            for template_name, future in zip(pending, futures):
+                scores.match_calls += 1
+                scores.results[template_name] = future.result()
+        matches = [
+            scores.results[name] if name in fresh else self._cached_match(name, grayscale, scores)
+            for name in candidates
+        ]
+        return max((match for match in matches if match is not None), key=lambda match: match.score, default=None)
+
+    def match_all(
+        self,
+        grayscale: np.ndarray,
+        *,
+        prefixes: Iterable[str],
+        max_hits: int = 10,
+    ) -> List[TemplateMatch]:
+        """Return up to ``max_hits`` separate hits per template with the given prefixes, strongest first."""
+
+        searches: Dict[Tuple[int, int, int, int], ImagePyramid] = {}
+        candidates = self.candidates(prefixes)
+        for template_name in candidates:
+            self._search_area(template_name, grayscale, searches)
+        if self._executor is not None and len(candidates) > 1:
+            per_template = list(
+                self._executor.map(
+                    lambda name: self._match_template_all(name, grayscale, searches, max_hits), candidates
+                )
+            )
+        else:
+            per_template = [
+                self._match_template_all(name, grayscale, searches, max_hits) for name in candidates
+            ]
+        matches = [match for matches in per_template for match in matches]
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches
+
+    def _cached_match(self, template_name: str, grayscale: np.ndarray, scores: FrameScores) -> Optional[TemplateMatch]:
+        if template_name in scores.results:
+            scores.cache_hits += 1
+            return scores.results[template_name]
+        scores.match_calls += 1
+        match = self._match_template(template_name, grayscale, scores.searches)
+        scores.results[template_name] = match
+        return match
+
+    def _match_first_parallel(
+        self,
+        candidates: Tuple[str, ...],
+        pending: List[str],
+        grayscale: np.ndarray,
+        scores: FrameScores,
+    ) -> Optional[TemplateMatch]:
+        assert self._executor is not None
+        searches = scores.searches
+        # Resolve the search areas up front so worker threads share them.
+        for template_name in pending:
+            self._search_area(template_name, grayscale, searches)
+        futures: Dict[str, Future[Optional[TemplateMatch]]] = {
+            template_name: self._executor.submit(self._match_template, template_name, grayscale, searches)
+            for template_name in pending
+        }
+        try:
+            for template_name in candidates:
+                future = futures.get(template_name)
+                if future is None:
+                    scores.cache_hits += 1
+                    match = scores.results[template_name]
+                else:
+                    match = future.result()
+                    scores.results[template_name] = match
+                if match is not None:
+                    return match
+            return None
+        finally:
+            for template_name, future in futures.items():
+                if future.cancel():
+                    continue
+                # Started before the decision was made, so it costs a match;
+                # keep its result if it has already finished.
+                scores.match_calls += 1
+                if future.done() and future.exception() is None:
+                    scores.results.setdefault(template_name, future.result())
+
+    def close(self) -> None:
+        """Shut down the worker pool if this library created it."""
+
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _search_area(
+        self,
+        template_name: str,
+        grayscale: np.ndarray,
+        searches: Dict[Tuple[int, int, int, int], ImagePyramid],
+    ) -> Tuple[ImagePyramid, Tuple[int, int]]:
+        """Return the (cached) pyramid to search for a template and its frame offset."""
+
+        height, width = grayscale.shape[:2]
+        if self.regions is None:
+            bounds = (0, 0, width, height)
+        else:
+            region = self.regions.lookup(template_name, self.template_dir)
+            bounds = region.bounds(width, height, min_size=self.templates[template_name].shape)
+        pyramid = searches.get(bounds)
+        if pyramid is None:
+            x0, y0, x1, y1 = bounds
+            pyramid = ImagePyramid(grayscale[y0:y1, x0:x1])
+            searches[bounds] = pyramid
+        return pyramid, (bounds[0], bounds[1])
 
     def _match_template(
-        self, template_name: str, grayscale: np.ndarray
+        self,
+        template_name: str,
+        grayscale: np.ndarray,
+        searches: Dict[Tuple[int, int, int, int], ImagePyramid],
     ) -> Optional[TemplateMatch]:
-        template = self.templates[template_name]
-        w, h = template.shape[::-1]
-        res = cv2.matchTemplate(grayscale, template, cv2.TM_CCOEFF_NORMED)
-        loc = np.where(res >= self.threshold)
-        for pt in zip(*loc[::-1]):
-            center = (pt[0] + w // 2, pt[1] + h // 2)
-            score = float(res[pt[1], pt[0]])
-            return TemplateMatch(name=template_name, center=center, score=score)
-        return None
-
-
-__all__ = ["TemplateLibrary", "TemplateMatch"]
+        template = self.prepared[template_name]
+        pyramid, offset = self._search_area(template_name, grayscale, searches)
+        with self._metrics.timer(f"match.{template_name}"):
+            hit = self.matcher.locate(pyramid, template, self.threshold)
+        if hit is None:
+            return None
+        return self._to_match(template_name, hit, offset)
+
+    def _match_template_all(
+        self,
+        template_name: str,
+        grayscale: np.ndarray,
+        searches: Dict[Tuple[int, int, int, int], ImagePyramid],
+        max_hits: int,
+    ) -> List[TemplateMatch]:
+        template = self.prepared[template_name]
+        pyramid, offset = self._search_area(template_name, grayscale, searches)
+        with self._metrics.timer(f"match.{template_name}"):
+            hits = self.matcher.locate_all(pyramid, template, self.threshold, max_hits)
+        return [self._to_match(template_name, hit, offset) for hit in hits]
+
+    def _to_match(self, template_name: str, hit: MatchHit, offset: Tuple[int, int]) -> TemplateMatch:
+        h, w = self.templates[template_name].shape[:2]
+        center = (offset[0] + hit.top_left[0] + w // 2, offset[1] + hit.top_left[1] + h // 2)
+        return TemplateMatch(name=template_name, center=center, score=hit.score)
+
+
+__all__ = ["FrameScores", "TemplateLibrary", "TemplateMatch"]
@@ -0,0 +1,195 @@
+"""Precomputed cursor trajectories streamed at a fixed rate."""
+
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Tuple
+
+import numpy as np
+
+Point = Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class FittsTiming:
+    """Movement time as a function of distance, following Fitts' law.
+
+    ``duration = intercept + slope * log2(1 + distance / target_width)``,
+    scaled by a random factor in ``1 ± jitter`` and clamped to
+    ``[minimum, maximum]`` seconds. Short hops therefore finish quickly
+    while long sweeps still take a plausible amount of time.
+    """
+
+    intercept: float = 0.06
+    slope: float = 0.07
+    target_width: float = 24.0
+    jitter: float = 0.1
+    minimum: float = 0.04
+    maximum: float = 1.0
+
+    def __call__(self, distance: float, rng: Optional[np.random.Generator] = None) -> float:
+        duration = self.intercept + self.slope * math.log2(1.0 + distance / self.target_width)
+        if self.jitter and rng is not None:
+            duration *= 1.0 + rng.uniform(-self.jitter, self.jitter)
+        return min(self.maximum, max(self.minimum, duration))
+
+
+@dataclass(frozen=True)
+class Trajectory:
+    """Integer screen points to visit, one every ``interval`` seconds."""
+
+    points: np.ndarray
+    interval: float
+
+    @property
+    def duration(self) -> float:
+        return max(0, len(self.points) - 1) * self.interval
+
+    @property
+    def end(self) -> Point:
+        x, y = self.points[-1]
+        return int(x), int(y)
+
+
+def minimum_jerk_profile(samples: int) -> np.ndarray:
+    """Return ``samples`` progress values in ``[0, 1]`` along a minimum-jerk curve.
+
+    The profile ``10t³ - 15t⁴ + 6t⁵`` starts and ends with zero velocity and
+    acceleration, like a human reaching movement.
+    """
+
+    t = np.linspace(0.0, 1.0, max(2, samples))
+    return t**3 * (10.0 - 15.0 * t + 6.0 * t**2)
+
+
+def minimum_jerk(start: Point, end: Point, duration: float, *, rate: float = 120.0) -> Trajectory:
+    """Straight-line trajectory from ``start`` to ``end`` with a minimum-jerk speed profile."""
+
+    s = minimum_jerk_profile(_sample_count(duration, rate))[:, None]
+    a = np.asarray(start, dtype=np.float64)
+    b = np.asarray(end, dtype=np.float64)
+    return Trajectory(_to_points(a + (b - a) * s), 1.0 / rate)
+
+
+def bezier(
+    start: Point,
+    end: Point,
+    duration: float,
+    *,
+    rate: float = 120.0,
+    curvature: float = 0.15,
+    rng: Optional[np.random.Generator] = None,
+) -> Trajectory:
+    """Curved trajectory along a cubic Bezier, traversed with a minimum-jerk profile.
+
+    The two control points sit at one and two thirds of the way to ``end``,
+    pushed sideways by up to ``curvature`` times the distance.
+    """
+
+    rng = rng or np.random.default_rng()
+    a = np.asarray(start, dtype=np.float64)
+    b = np.asarray(end, dtype=np.float64)
+    delta = b - a
+    normal = np.array([-delta[1], delta[0]])
+    offsets = rng.uniform(-curvature, curvature, size=2)
+    c1 = a + delta / 3.0 + normal * offsets[0]
+    c2 = a + 2.0 * delta / 3.0 + normal * offsets[1]
+
+    s = minimum_jerk_profile(_sample_count(duration, rate))[:, None]
+    u = 1.0 - s
+    curve = u**3 * a + 3 * u**2 * s * c1 + 3 * u * s**2 * c2 + s**3 * b
+    return Trajectory(_to_points(curve), 1.0 / rate)
+
+
+@dataclass
+class TrajectoryPlanner:
+    """Plan cursor paths between two points.
+
+    ``kind`` is ``"minimum_jerk"`` (straight) or ``"bezier"`` (curved).
+    ``timing`` maps distance in pixels to the movement time in seconds, and
+    points are sampled at ``rate`` Hz. When ``settle_range`` is set, the
+    cursor dwells that long on the target before clicking instead of using
+    the action's ``click_delay_range``.
+    """
+
+    kind: str = "bezier"
+    rate: float = 120.0
+    timing: Callable[..., float] = field(default_factory=FittsTiming)
+    curvature: float = 0.15
+    settle_range: Optional[Tuple[float, float]] = (0.02, 0.08)
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.kind not in ("minimum_jerk", "bezier"):
+            raise ValueError(f"Unknown trajectory kind '{self.kind}'")
+        if self.rate <= 0:
+            raise ValueError("rate must be positive")
+        self._rng = np.random.default_rng(self.seed)
+
+    def plan(self, start: Point, end: Point) -> Trajectory:
+        distance = math.hypot(end[0] - start[0], end[1] - start[1])
+        duration = self.timing(distance, self._rng) if distance else 0.0
+        if self.kind == "bezier":
+            return bezier(start, end, duration, rate=self.rate, curvature=self.curvature, rng=self._rng)
+        return minimum_jerk(start, end, duration, rate=self.rate)
+
+
+def stream(
+    trajectory: Trajectory,
+    move: Callable[[int, int], Any],
+    *,
+    abort: Any = None,
+    clock: Callable[[], float] = time.monotonic,
+) -> bool:
+    """Send each point of ``trajectory`` to ``move`` on a fixed schedule.
+
+    Deadlines are computed from the start time, so a slow ``move`` does not
+    stretch the whole movement: points that are already overdue are skipped
+    and the final point is always sent. Repeated points are not re-sent.
+    Returns ``False`` when ``abort`` (an ``Event``) is set before the end.
+    """
+
+    points = trajectory.points
+    last = len(points) - 1
+    started = clock()
+    previous: Optional[Point] = None
+    index = 0
+    while index <= last:
+        delay = started + index * trajectory.interval - clock()
+        if delay > 0:
+            if abort is not None and abort.wait(delay):
+                return False
+            if abort is None:
+                time.sleep(delay)
+        elif abort is not None and abort.is_set():
+            return False
+        # Skip to the newest point that is already due.
+        due = int((clock() - started) / trajectory.interval)
+        index = min(last, max(index, due))
+        point = (int(points[index][0]), int(points[index][1]))
+        if point != previous:
+            move(*point)
+            previous = point
+        index += 1
+    return True
+
+
+def _sample_count(duration: float, rate: float) -> int:
+    return max(2, int(math.ceil(duration * rate)) + 1)
+
+
+def _to_points(curve: np.ndarray) -> np.ndarray:
+    return np.rint(curve).astype(np.int32)
+
+
+__all__ = [
+    "FittsTiming",
+    "Trajectory",
+    "TrajectoryPlanner",
+    "bezier",
+    "minimum_jerk",
+    "minimum_jerk_profile",
+    "stream",
+]
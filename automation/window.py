@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import threading
+import time
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from typing import Any, List, Optional, Tuple
 
 import cv2
 import numpy as np
@@ -12,6 +14,9 @@ import pygetwindow as gw
 import win32api
 import win32con
 
+from .capture import CaptureBackend, default_capture_backend
+from .metrics import MetricsRegistry, get_metrics
+
 
 @dataclass
 class WindowGeometry:
@@ -30,7 +35,28 @@ class WindowGeometry:
 
 
 class WindowCaptureService:
-    """High level helper around ``pygetwindow`` for RuneLite automation."""
+    """High level helper around ``pygetwindow`` for RuneLite automation.
+
+    Pixels are grabbed by a :class:`~automation.capture.CaptureBackend`,
+    which defaults to the fastest backend installed.
+
+    Window preparation (restore, resize, move, activate) involves several
+    window-manager round trips, so it runs once and the resulting geometry
+    is cached. Every ``revalidate_interval`` seconds a cheap check compares
+    the window's reported position, size, and state with the cached values
+    and prepares the window again only if it drifted. Pass
+    ``revalidate_interval=None`` to prepare the window before every capture.
+
+    ``handle`` selects one of several windows sharing ``title`` (see
+    :func:`find_client_windows`). With ``require_active=False`` a window
+    that merely lost focus does not count as drifted, which keeps several
+    clients from stealing focus from each other on every revalidation; call
+    :meth:`activate` before sending input instead. Preparation and
+    :meth:`activate` hold one lock, so a cursor thread focusing the window
+    never interleaves with the capture thread restoring or moving it.
+
+    Captures are timed under ``capture.grab`` in ``metrics``.
+    """
 
     def __init__(
         self,
@@ -39,20 +65,59 @@ class WindowCaptureService:
         size_ratio: float = 0.5,
         position: Tuple[int, int] = (0, 0),
         manage_geometry: bool = True,
+        backend: Optional[CaptureBackend] = None,
+        revalidate_interval: Optional[float] = 1.0,
+        metrics: Optional[MetricsRegistry] = None,
+        handle: Optional[int] = None,
+        require_active: bool = True,
     ) -> None:
         self._title = title
+        self._handle = handle
+        self._require_active = require_active
         self._size_ratio = size_ratio
         self._position = position
         self._manage_geometry = manage_geometry
+        self._backend = backend or default_capture_backend()
+        self._revalidate_interval = revalidate_interval
+        self._metrics = metrics or get_metrics()
+        self._window_lock = threading.RLock()
         self._window = self._get_window()
         self._preview_name: Optional[str] = None
+        self._geometry: Optional[WindowGeometry] = None
+        self._observed_geometry: Optional[WindowGeometry] = None
+        self._validated_at = 0.0
 
     def _get_window(self):
         windows = gw.getWindowsWithTitle(self._title)
+        if self._handle is not None:
+            windows = [window for window in windows if _window_handle(window) == self._handle]
+            if not windows:
+                raise RuntimeError(f"Window '{self._title}' with handle {self._handle} not found")
         if not windows:
             raise RuntimeError(f"Window with title '{self._title}' not found")
         return windows[0]
 
+    @property
+    def handle(self) -> Optional[int]:
+        return _window_handle(self._window)
+
+    @property
+    def window_title(self) -> str:
+        return getattr(self._window, "title", self._title)
+
+    def activate(self) -> None:
+        """Bring the window to the foreground unless it already is."""
+
+        with self._window_lock:
+            if not getattr(self._window, "isActive", False):
+                self._window.activate()
+
+    def to_screen(self, point: Tuple[int, int]) -> Tuple[int, int]:
+        """Translate a point in captured-frame coordinates to screen coordinates."""
+
+        geometry = self._geometry or self._current_geometry()
+        return (point[0] + geometry.left, point[1] + geometry.top)
+
     def configure_preview(self, name: str) -> None:
         """Enable an OpenCV preview window to visualise captures."""
 
@@ -87,6 +152,10 @@ class WindowCaptureService:
     def prepare_window(self) -> WindowGeometry:
         """Ensure the window is visible and optionally resized and positioned."""
 
+        with self._window_lock:
+            return self._prepare_window()
+
+    def _prepare_window(self) -> WindowGeometry:
         self._ensure_window_visible()
         if self._manage_geometry:
             geometry = self._desired_geometry()
@@ -99,19 +168,57 @@ class WindowCaptureService:
         if self._preview_name:
             cv2.resizeWindow(self._preview_name, geometry.width, geometry.height)
             cv2.moveWindow(self._preview_name, geometry.left, geometry.top)
+        self._geometry = geometry
+        self._observed_geometry = self._current_geometry()
+        self._validated_at = time.monotonic()
         return geometry
 
-    def capture(self) -> Tuple[np.ndarray, np.ndarray]:
-        """Capture the window as colour and grayscale numpy arrays."""
+    def tracked_geometry(self) -> WindowGeometry:
+        """Return the cached geometry, preparing the window only when needed."""
+
+        with self._window_lock:
+            if self._revalidate_interval is None or self._geometry is None:
+                return self._prepare_window()
+            now = time.monotonic()
+            if now - self._validated_at >= self._revalidate_interval:
+                self._validated_at = now
+                if self._has_drifted():
+                    return self._prepare_window()
+            return self._geometry
+
+    def invalidate_geometry(self) -> None:
+        """Force the next capture to prepare the window again."""
 
-        geometry = self.prepare_window()
-        screenshot = pyautogui.screenshot(region=geometry.region)
-        color = np.array(screenshot)
-        grayscale = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+        self._geometry = None
+
+    def _has_drifted(self) -> bool:
+        if self._window.isMinimized:
+            return True
+        if self._require_active and not getattr(self._window, "isActive", True):
+            return True
+        return self._current_geometry() != self._observed_geometry
+
+    def capture(self, out: Optional[Tuple[np.ndarray, np.ndarray]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Capture the window as BGR colour and grayscale numpy arrays.
+
+        Both arrays are persistent buffers owned by the capture backend and
+        are overwritten by the next call, unless ``out`` supplies arrays of
+        the window's size to write into instead.
+        """
+
+        geometry = self.tracked_geometry()
+        with self._metrics.timer("capture.grab"):
+            color, grayscale = self._backend.grab(geometry.region, out)
         if self._preview_name is not None:
             cv2.imshow(self._preview_name, color)
         return color, grayscale
 
+    def close(self) -> None:
+        """Close the preview window and release the capture backend."""
+
+        self.close_preview()
+        self._backend.close()
+
     def close_preview(self) -> None:
         """Destroy the OpenCV preview window if one was created."""
 
@@ -120,4 +227,21 @@ class WindowCaptureService:
             self._preview_name = None
 
 
-__all__ = ["WindowCaptureService", "WindowGeometry"]
+def find_client_windows(title: str = "RuneLite") -> List[Any]:
+    """Return every window whose title contains ``title``, one per handle, ordered by handle."""
+
+    unique = {}
+    for window in gw.getWindowsWithTitle(title):
+        handle = _window_handle(window)
+        if handle is not None:
+            unique.setdefault(handle, window)
+    return [unique[handle] for handle in sorted(unique)]
+
+
+def _window_handle(window: Any) -> Optional[int]:
+    # pygetwindow exposes the native handle as ``_hWnd`` on Windows.
+    handle = getattr(window, "_hWnd", None)
+    return int(handle) if handle is not None else None
+
+
+__all__ = ["WindowCaptureService", "WindowGeometry", "find_client_windows"]
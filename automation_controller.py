@@ -3,8 +3,11 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 import threading
+import time
 from typing import Callable, Dict, Optional
 
+from automation.metrics import MetricsRegistry, get_metrics
+
 
 @dataclass
 class TaskStatus:
@@ -32,9 +35,14 @@ class _RunningTask:
 
 
 class AutomationController:
-    """Coordinates asynchronous automation tasks and their lifecycle."""
+    """Coordinates asynchronous automation tasks and their lifecycle.
+
+    Each task run is timed under ``task.<name>`` in ``metrics``, and the
+    interval between its progress updates under ``task.<name>.update``.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, *, metrics: Optional[MetricsRegistry] = None) -> None:
+        self.metrics = metrics or get_metrics()
         self._tasks: Dict[str, _TaskDescriptor] = {}
         self._running: Dict[str, _RunningTask] = {}
         self._lock = threading.Lock()
@@ -72,12 +80,16 @@ class AutomationController:
                 raise RuntimeError(f"Task '{name}' is already running")
 
             stop_event = threading.Event()
+            metrics = self.metrics
+            run_stage = f"task.{name}"
+            update_stage = f"task.{name}.update"
 
             def _notify(status: TaskStatus) -> None:
                 if callback is not None:
                     callback(status)
 
             def _run_task() -> None:
+                started = last_update = time.perf_counter()
                 try:
                     _notify(
                         TaskStatus(
@@ -90,6 +102,11 @@ class AutomationController:
                     )
 
                     def _update(message: str, progress: Optional[float] = None) -> None:
+                        nonlocal last_update
+                        if metrics.enabled:
+                            now = time.perf_counter()
+                            metrics.observe(update_stage, now - last_update)
+                            last_update = now
                         _notify(
                             TaskStatus(
                                 name=descriptor.name,
@@ -134,6 +151,7 @@ class AutomationController:
                         )
                     )
                 finally:
+                    metrics.observe(run_stage, time.perf_counter() - started)
                     with self._lock:
                         self._running.pop(name, None)
 
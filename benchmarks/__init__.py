@@ -0,0 +1 @@
+"""Headless benchmarks for the RuneLabs vision pipeline."""
@@ -0,0 +1,5 @@
+import sys
+
+from .vision import main
+
+sys.exit(main())
@@ -0,0 +1,206 @@
+"""Frame corpora for the vision benchmarks.
+
+The synthetic corpus composites the shipped ``Agility/Canifis`` and
+``Login/`` templates onto procedurally generated backgrounds so the suite
+runs headless without a RuneLite client. Recorded sessions can be replayed
+instead with :func:`recorded_corpus`.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from automation.capture import ReplayBackend
+from perception.inventory import InventoryGrid
+from perception.regions import INVENTORY_REGION, LOGIN_BOX_REGION, MINIMAP_REGION, RegionOfInterest
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp"}
+
+# Central play area where agility obstacles and marks of grace are drawn.
+PLAY_AREA_REGION = RegionOfInterest(0.05, 0.1, 0.55, 0.8)
+
+
+@dataclass
+class CorpusFrame:
+    """A BGR frame, its grayscale copy, and the labels composited into it."""
+
+    color: np.ndarray
+    grayscale: np.ndarray
+    expected: Dict[str, object] = field(default_factory=dict)
+
+
+@dataclass
+class Corpus:
+    """Frames to benchmark plus the assets the recognizers need."""
+
+    frames: List[CorpusFrame]
+    agility_dir: Path
+    login_dir: Path
+    inventory_dir: Optional[Path] = None
+    grid: InventoryGrid = field(default_factory=InventoryGrid)
+
+    @property
+    def frame_size(self) -> Tuple[int, int]:
+        height, width = self.frames[0].grayscale.shape
+        return (width, height)
+
+    def save(self, directory: Path | str) -> Path:
+        """Write the frames as numbered PNGs replayable by :func:`recorded_corpus`."""
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for index, frame in enumerate(self.frames):
+            cv2.imwrite(str(directory / f"frame{index:05d}.png"), frame.color)
+        return directory
+
+
+def synthetic_corpus(
+    workdir: Path | str,
+    frame_count: int = 60,
+    *,
+    size: Tuple[int, int] = (960, 540),
+    agility_dir: Path | str = "Agility/Canifis",
+    login_dir: Path | str = "Login",
+    login_every: int = 5,
+    inventory_items: int = 6,
+    seed: int = 0,
+) -> Corpus:
+    """Build ``frame_count`` frames of ``size`` (width, height).
+
+    Every ``login_every``-th frame shows a login-screen template inside the
+    login box. The remaining frames show a minimap template, an obstacle or
+    mark of grace in the play area, and a partly filled inventory. Synthetic
+    inventory icons are written to ``workdir/perception/templates`` so the
+    inventory recognizers load them and ``DEFAULT_REGIONS`` confines them to
+    the inventory panel, as in production.
+    """
+
+    rng = np.random.default_rng(seed)
+    agility_dir, login_dir = Path(agility_dir), Path(login_dir)
+    agility = _load_directory(agility_dir)
+    login = _load_directory(login_dir)
+    maps = sorted(name for name in agility if name.startswith("Map"))
+    obstacles = sorted(name for name in agility if not name.startswith("Map"))
+    width, height = size
+
+    inventory_dir = Path(workdir) / "perception" / "templates"
+    inventory_dir.mkdir(parents=True, exist_ok=True)
+    x0, y0, _, _ = INVENTORY_REGION.bounds(width, height)
+    grid = InventoryGrid(origin=(x0 + 40, y0 + 30))
+    slot_width, slot_height = grid.slot_size
+    icons = {
+        f"item{index}": _background(rng, (slot_height, slot_width), blur=3)
+        for index in range(inventory_items)
+    }
+    for name, icon in icons.items():
+        cv2.imwrite(str(inventory_dir / f"{name}.png"), icon)
+
+    frames: List[CorpusFrame] = []
+    for index in range(frame_count):
+        color = _background(rng, (height, width), blur=15)
+        expected: Dict[str, object] = {}
+        if login and login_every and index % login_every == 0:
+            name = sorted(login)[(index // login_every) % len(login)]
+            _paste(color, login[name], LOGIN_BOX_REGION, rng)
+            expected["login"] = name
+        else:
+            if maps:
+                name = maps[index % len(maps)]
+                _paste(color, agility[name], MINIMAP_REGION, rng)
+                expected["map"] = name
+            if obstacles:
+                name = obstacles[int(rng.integers(len(obstacles)))]
+                _paste(color, agility[name], PLAY_AREA_REGION, rng)
+                expected["obstacle"] = name
+            origins = list(grid.slot_origins())
+            slots: Dict[int, str] = {}
+            for slot in rng.choice(len(origins), size=min(8, len(origins)), replace=False):
+                label = f"item{int(rng.integers(inventory_items))}"
+                x, y = origins[int(slot)]
+                color[y : y + slot_height, x : x + slot_width] = icons[label]
+                slots[int(slot)] = label
+            expected["inventory"] = slots
+        grayscale = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+        frames.append(CorpusFrame(color, grayscale, expected))
+
+    return Corpus(frames, agility_dir, login_dir, inventory_dir, grid)
+
+
+def recorded_corpus(
+    source: Path | str,
+    *,
+    agility_dir: Path | str = "Agility/Canifis",
+    login_dir: Path | str = "Login",
+    inventory_dir: Optional[Path | str] = None,
+    grid: Optional[InventoryGrid] = None,
+    limit: Optional[int] = None,
+) -> Corpus:
+    """Load recorded frames (image directory or video) through :class:`ReplayBackend`."""
+
+    backend = ReplayBackend(source, loop=False)
+    frames: List[CorpusFrame] = []
+    try:
+        while limit is None or len(frames) < limit:
+            try:
+                color, grayscale = backend.grab((0, 0, 0, 0))
+            except RuntimeError:
+                break
+            frames.append(CorpusFrame(color.copy(), grayscale.copy()))
+    finally:
+        backend.close()
+    if not frames:
+        raise RuntimeError(f"No frames found in '{source}'")
+    return Corpus(
+        frames,
+        Path(agility_dir),
+        Path(login_dir),
+        Path(inventory_dir) if inventory_dir is not None else None,
+        grid or InventoryGrid(),
+    )
+
+
+def _load_directory(directory: Path) -> Dict[str, np.ndarray]:
+    images: Dict[str, np.ndarray] = {}
+    if not directory.is_dir():
+        return images
+    for filename in sorted(os.listdir(directory)):
+        if Path(filename).suffix.lower() not in IMAGE_SUFFIXES:
+            continue
+        image = cv2.imread(str(directory / filename), cv2.IMREAD_COLOR)
+        if image is not None:
+            images[filename] = image
+    return images
+
+
+def _background(rng: np.random.Generator, shape: Tuple[int, int], *, blur: int) -> np.ndarray:
+    noise = rng.integers(0, 255, (*shape, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (blur, blur), 0)
+
+
+def _paste(
+    frame: np.ndarray,
+    image: np.ndarray,
+    region: RegionOfInterest,
+    rng: np.random.Generator,
+) -> None:
+    height, width = frame.shape[:2]
+    x0, y0, x1, y1 = region.bounds(width, height, min_size=image.shape[:2])
+    h, w = image.shape[:2]
+    x = int(rng.integers(x0, max(x0 + 1, x1 - w + 1)))
+    y = int(rng.integers(y0, max(y0 + 1, y1 - h + 1)))
+    frame[y : y + h, x : x + w] = image
+
+
+__all__ = [
+    "Corpus",
+    "CorpusFrame",
+    "PLAY_AREA_REGION",
+    "recorded_corpus",
+    "synthetic_corpus",
+]
@@ -0,0 +1,201 @@
+"""Measure startup and per-action overhead of the cursor executors.
+
+Run ``python -m benchmarks.cursor`` from the repository root. Every mode
+uses dry-run executors with zero move/click delays, so the numbers are the
+cost of the plumbing (queues, pickling, thread hand-offs) rather than of
+the simulated human timing. ``--movement`` additionally times full actions
+with the default delays, comparing the fixed move delay with trajectories
+timed by distance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from automation.cursor import (
+    CursorAction,
+    CursorService,
+    HumanLikeCursor,
+    ProcessCursorExecutor,
+    ThreadCursorExecutor,
+)
+from automation.trajectory import TrajectoryPlanner
+
+from .harness import environment_metadata
+
+MODES = ("thread", "shared", "process")
+# Typical distances in pixels between consecutive clicks on a rooftop course.
+HOP_DISTANCES = (40, 80, 150, 250, 400)
+
+
+def _action() -> CursorAction:
+    return CursorAction(
+        position=(100, 100),
+        move_offset=0,
+        move_delay_range=(0.0, 0.0),
+        click_delay_range=(0.0, 0.0),
+    )
+
+
+def _build(mode: str, clients: int) -> tuple[List[HumanLikeCursor], Callable[[], None], Callable[[], None]]:
+    """Return the cursors for ``mode`` plus its start and stop callables."""
+
+    if mode == "shared":
+        service = CursorService(ThreadCursorExecutor(dry_run=True))
+        cursors = [HumanLikeCursor(service=service) for _ in range(clients)]
+        return cursors, service.start, service.stop
+    if mode == "thread":
+        cursors = [HumanLikeCursor(executor=ThreadCursorExecutor(dry_run=True)) for _ in range(clients)]
+    elif mode == "process":
+        cursors = [HumanLikeCursor(executor=ProcessCursorExecutor(dry_run=True)) for _ in range(clients)]
+    else:
+        raise ValueError(f"Unknown cursor mode '{mode}'")
+
+    def start() -> None:
+        for cursor in cursors:
+            cursor.start()
+
+    def stop() -> None:
+        for cursor in cursors:
+            cursor.stop()
+
+    return cursors, start, stop
+
+
+def _worker_rss_kb(cursors: Sequence[HumanLikeCursor]) -> Optional[int]:
+    """Sum the resident memory of process workers (Linux only)."""
+
+    total = 0
+    for cursor in cursors:
+        executor = cursor.service.executor
+        process = getattr(executor, "_process", None)
+        if process is None or process.pid is None:
+            continue
+        try:
+            status = Path(f"/proc/{process.pid}/status").read_text()
+        except OSError:
+            return None
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                total += int(line.split()[1])
+    return total or None
+
+
+def measure(mode: str, *, actions: int = 200, clients: int = 1) -> Dict[str, object]:
+    """Time ``start()`` up to the first completed action, then ``actions`` round trips per client."""
+
+    cursors, start, stop = _build(mode, clients)
+    started = time.perf_counter()
+    start()
+    for future in [cursor.queue_click(_action()) for cursor in cursors]:
+        future.result(timeout=30)
+    startup = time.perf_counter() - started
+
+    samples: List[float] = []
+    try:
+        rss_kb = _worker_rss_kb(cursors)
+        for _ in range(actions):
+            for cursor in cursors:
+                submitted = time.perf_counter()
+                cursor.queue_click(_action()).result(timeout=30)
+                samples.append(time.perf_counter() - submitted)
+    finally:
+        stop()
+
+    latencies = np.array(samples) * 1000.0
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        "mode": mode,
+        "clients": clients,
+        "actions": len(samples),
+        "startup_ms": round(startup * 1000.0, 3),
+        "p50_ms": round(float(p50), 4),
+        "p95_ms": round(float(p95), 4),
+        "p99_ms": round(float(p99), 4),
+        "worker_rss_kb": rss_kb,
+    }
+
+
+def measure_movement(
+    distances: Sequence[int] = HOP_DISTANCES,
+    *,
+    actions: int = 20,
+    seed: int = 0,
+) -> List[Dict[str, object]]:
+    """Time dry-run clicks ``distance`` pixels apart, with and without a trajectory planner."""
+
+    rows: List[Dict[str, object]] = []
+    for label, planner in (("fixed", None), ("trajectory", TrajectoryPlanner(seed=seed))):
+        cursor = HumanLikeCursor(executor=ThreadCursorExecutor(dry_run=True, planner=planner))
+        cursor.start()
+        try:
+            for distance in distances:
+                cursor.queue_click(CursorAction(position=(0, 0), move_offset=0)).result(timeout=30)
+                samples = []
+                for index in range(actions):
+                    x = distance if index % 2 == 0 else 0
+                    result = cursor.queue_click(CursorAction(position=(x, 0), move_offset=0)).result(timeout=30)
+                    samples.append(result.clicked_at - result.started_at)
+                rows.append(
+                    {
+                        "movement": label,
+                        "distance_px": distance,
+                        "mean_ms": round(float(np.mean(samples)) * 1000.0, 1),
+                    }
+                )
+        finally:
+            cursor.stop()
+    return rows
+
+
+def format_table(rows: Sequence[Dict[str, object]]) -> str:
+    header = f"{'mode':<10}{'clients':>8}{'startup ms':>12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'worker KB':>11}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        rss = row["worker_rss_kb"]
+        lines.append(
+            f"{row['mode']:<10}{row['clients']:>8}{row['startup_ms']:>12.2f}{row['p50_ms']:>10.3f}"
+            f"{row['p95_ms']:>10.3f}{row['p99_ms']:>10.3f}{(rss if rss is not None else '-'):>11}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cursor", description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--actions", type=int, default=200, help="round trips per client")
+    parser.add_argument("--clients", type=int, default=1, help="cursors driven at once")
+    parser.add_argument("--movement", action="store_true", help="also time moves over typical hop distances")
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results/cursor.json"))
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    rows = [measure(mode, actions=args.actions, clients=args.clients) for mode in args.modes]
+    print(format_table(rows))
+    report: Dict[str, object] = {"environment": environment_metadata(), "executors": rows}
+    if args.movement:
+        movement = measure_movement()
+        print(f"\n{'movement':<12}{'distance px':>12}{'mean ms':>10}")
+        for row in movement:
+            print(f"{row['movement']:<12}{row['distance_px']:>12}{row['mean_ms']:>10.1f}")
+        report["movement"] = movement
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, sort_keys=True))
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+__all__ = ["HOP_DISTANCES", "MODES", "format_table", "main", "measure", "measure_movement"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Find where batched FFT correlation overtakes one ``cv2.matchTemplate`` per template.
+
+Run ``python -m benchmarks.fft`` from the repository root. For each
+template size and template count, a fresh frame is matched against every
+template with :class:`~perception.matching.DirectMatcher` and with
+:class:`~perception.matching.FFTMatcher`. The FFT timing includes the
+per-frame transform and window energies, so it is the real cost of one
+captured frame. The summary lists, per template size, the smallest
+template count at which the FFT path wins; use it for
+``AdaptiveMatcher(min_templates=...)``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from perception.matching import DirectMatcher, FFTMatcher, ImagePyramid
+
+from .harness import environment_metadata
+
+TEMPLATE_SIZES = (16, 40, 80, 160)
+TEMPLATE_COUNTS = (1, 2, 3, 4, 8, 16, 32)
+
+
+def _textured(shape: Tuple[int, int], rng: np.random.Generator) -> np.ndarray:
+    noise = rng.integers(0, 255, shape, dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (9, 9), 0)
+
+
+def measure(
+    frame_size: Tuple[int, int],
+    size: int,
+    count: int,
+    *,
+    repeats: int = 5,
+    seed: int = 0,
+) -> Dict[str, object]:
+    """Median per-frame time to match ``count`` ``size``-pixel templates both ways."""
+
+    rng = np.random.default_rng(seed)
+    width, height = frame_size
+    frames = [_textured((height, width), rng) for _ in range(repeats)]
+    templates = [_textured((size, size), rng) for _ in range(count)]
+    direct, fft = DirectMatcher(), FFTMatcher()
+    # Template spectra are computed once per library, not per frame.
+    warm_up = ImagePyramid(frames[0])
+    for template in templates:
+        fft.locate(warm_up, template, 1.0)
+
+    timings: Dict[str, List[float]] = {"direct": [], "fft": []}
+    for frame in frames:
+        for name, matcher in (("direct", direct), ("fft", fft)):
+            pyramid = ImagePyramid(frame)
+            started = time.perf_counter()
+            for template in templates:
+                matcher.locate(pyramid, template, 0.9)
+            timings[name].append(time.perf_counter() - started)
+    direct_ms = float(np.median(timings["direct"])) * 1000.0
+    fft_ms = float(np.median(timings["fft"])) * 1000.0
+    return {
+        "template_px": size,
+        "templates": count,
+        "direct_ms": round(direct_ms, 3),
+        "fft_ms": round(fft_ms, 3),
+        "speedup": round(direct_ms / fft_ms, 2) if fft_ms else None,
+    }
+
+
+def crossover(rows: Sequence[Dict[str, object]]) -> Dict[int, Optional[int]]:
+    """Smallest template count per template size at which the FFT path is faster."""
+
+    result: Dict[int, Optional[int]] = {}
+    for row in rows:
+        size = int(row["template_px"])
+        result.setdefault(size, None)
+        if result[size] is None and float(row["fft_ms"]) < float(row["direct_ms"]):
+            result[size] = int(row["templates"])
+    return result
+
+
+def format_table(rows: Sequence[Dict[str, object]]) -> str:
+    header = f"{'template px':>12}{'templates':>11}{'direct ms':>11}{'fft ms':>10}{'speedup':>9}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(
+            f"{row['template_px']:>12}{row['templates']:>11}{row['direct_ms']:>11.2f}"
+            f"{row['fft_ms']:>10.2f}{row['speedup']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fft", description=__doc__.splitlines()[0])
+    parser.add_argument("--frame-size", type=int, nargs=2, default=(960, 540), metavar=("WIDTH", "HEIGHT"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(TEMPLATE_SIZES))
+    parser.add_argument("--counts", type=int, nargs="+", default=list(TEMPLATE_COUNTS))
+    parser.add_argument("--repeats", type=int, default=5, help="frames timed per configuration")
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results/fft.json"))
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    frame_size = tuple(args.frame_size)
+    rows = [
+        measure(frame_size, size, count, repeats=args.repeats)
+        for size in args.sizes
+        for count in args.counts
+    ]
+    print(format_table(rows))
+    points = crossover(rows)
+    print("\ncrossover (templates at which FFT wins):")
+    for size, count in points.items():
+        print(f"  {size:>4} px: {count if count is not None else 'never'}")
+    report = {
+        "environment": environment_metadata(),
+        "frame_size": list(frame_size),
+        "rows": rows,
+        "crossover": {str(size): count for size, count in points.items()},
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2, sort_keys=True))
+    print(f"\nResults written to {args.output}")
+    return 0
+
+
+__all__ = ["TEMPLATE_COUNTS", "TEMPLATE_SIZES", "crossover", "format_table", "main", "measure"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""Timing, memory, and reporting helpers for the benchmark suite."""
+
+from __future__ import annotations
+
+import json
+import platform
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+try:  # Unix only; peak RSS is omitted elsewhere
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+from .corpus import CorpusFrame
+
+StageFunc = Callable[[CorpusFrame], bool]
+
+
+@dataclass
+class Stage:
+    """A named pipeline step run once per frame; returns whether it matched."""
+
+    name: str
+    run: StageFunc
+
+
+@dataclass
+class StageResult:
+    """Latency samples (seconds), hit count, and traced peak memory of one stage."""
+
+    name: str
+    samples: List[float] = field(default_factory=list)
+    hits: int = 0
+    peak_memory_bytes: Optional[int] = None
+
+    def summary(self) -> Dict[str, object]:
+        samples = np.asarray(self.samples, dtype=np.float64) * 1000.0
+        if not samples.size:
+            return {"frames": 0}
+        p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+        mean = float(samples.mean())
+        return {
+            "frames": int(samples.size),
+            "hits": self.hits,
+            "mean_ms": round(mean, 4),
+            "p50_ms": round(float(p50), 4),
+            "p95_ms": round(float(p95), 4),
+            "p99_ms": round(float(p99), 4),
+            "max_ms": round(float(samples.max()), 4),
+            "fps": round(1000.0 / mean, 2) if mean else None,
+            "peak_memory_kb": (
+                round(self.peak_memory_bytes / 1024, 1)
+                if self.peak_memory_bytes is not None
+                else None
+            ),
+        }
+
+
+@dataclass
+class BenchmarkReport:
+    """Per-stage results plus enough environment detail to compare runs."""
+
+    stages: Dict[str, StageResult]
+    metadata: Dict[str, object] = field(default_factory=dict)
+
+    def as_dict(self) -> Dict[str, object]:
+        return {
+            "metadata": self.metadata,
+            "stages": {name: result.summary() for name, result in self.stages.items()},
+        }
+
+    def write_json(self, path: Path | str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.as_dict(), indent=2, sort_keys=True))
+        return path
+
+    def format_table(self) -> str:
+        header = f"{'stage':<18}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'fps':>10}{'peak KB':>10}{'hits':>8}"
+        lines = [header, "-" * len(header)]
+        for name, result in self.stages.items():
+            row = result.summary()
+            if not row.get("frames"):
+                lines.append(f"{name:<18}{'(no frames)':>10}")
+                continue
+            lines.append(
+                f"{name:<18}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}"
+                f"{row['fps'] or 0:>10.1f}{row['peak_memory_kb'] or 0:>10.0f}"
+                f"{row['hits']:>5}/{row['frames']:<3}"
+            )
+        return "\n".join(lines)
+
+
+def run_stages(
+    stages: Iterable[Stage],
+    frames: Sequence[CorpusFrame],
+    *,
+    warmup: int = 3,
+    repeat: int = 1,
+    memory_frames: int = 5,
+    metadata: Optional[Dict[str, object]] = None,
+) -> BenchmarkReport:
+    """Time every stage over ``frames`` ``repeat`` times after ``warmup`` frames.
+
+    Peak memory is measured in a separate pass over ``memory_frames`` frames
+    with :mod:`tracemalloc` (which traces NumPy buffers but not OpenCV's
+    internal allocations), so tracing overhead never inflates the latencies.
+    """
+
+    results: Dict[str, StageResult] = {}
+    for stage in stages:
+        result = StageResult(stage.name)
+        for frame in frames[:warmup]:
+            stage.run(frame)
+        for _ in range(repeat):
+            for frame in frames:
+                started = time.perf_counter()
+                hit = stage.run(frame)
+                result.samples.append(time.perf_counter() - started)
+                result.hits += bool(hit)
+        if memory_frames:
+            result.peak_memory_bytes = _traced_peak(stage, frames[:memory_frames])
+        results[stage.name] = result
+
+    info = environment_metadata()
+    info.update(metadata or {})
+    info["frames"] = len(frames)
+    info["repeat"] = repeat
+    return BenchmarkReport(results, info)
+
+
+def environment_metadata() -> Dict[str, object]:
+    info: Dict[str, object] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__,
+        "opencv": getattr(cv2, "__version__", "unknown"),
+        "opencv_threads": cv2.getNumThreads() if hasattr(cv2, "getNumThreads") else None,
+    }
+    if resource is not None:
+        # ru_maxrss is KiB on Linux and bytes on macOS.
+        scale = 1 if platform.system() == "Darwin" else 1024
+        info["peak_rss_kb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale // 1024
+    return info
+
+
+def compare_reports(
+    current: Dict[str, object],
+    baseline: Dict[str, object],
+    *,
+    metric: str = "p95_ms",
+    tolerance: float = 0.10,
+) -> List[str]:
+    """Return a message for each stage whose ``metric`` grew by more than ``tolerance``."""
+
+    regressions: List[str] = []
+    current_stages = current.get("stages", {})
+    baseline_stages = baseline.get("stages", {})
+    for name, row in current_stages.items():  # type: ignore[union-attr]
+        before = baseline_stages.get(name, {}).get(metric)  # type: ignore[union-attr]
+        after = row.get(metric)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        if change > tolerance:
+            regressions.append(f"{name}: {metric} {before:.3f} -> {after:.3f} (+{change:.0%})")
+    return regressions
+
+
+def _traced_peak(stage: Stage, frames: Sequence[CorpusFrame]) -> int:
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for frame in frames:
+            stage.run(frame)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return max(0, peak - baseline)
+
+
+__all__ = [
+    "BenchmarkReport",
+    "Stage",
+    "StageResult",
+    "compare_reports",
+    "environment_metadata",
+    "run_stages",
+]
@@ -0,0 +1,198 @@
+"""Benchmark the capture → match → decide pipeline on a frame corpus.
+
+Run ``python -m benchmarks`` from the repository root. Results are printed
+as a table and written as JSON; pass ``--baseline`` with an earlier JSON
+file to fail when a stage's p95 latency regresses.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from automation.capture import ReplayBackend
+from automation.skills.agility_engine import AgilityDecisionEngine, CourseModel
+from automation.templates import TemplateLibrary
+from perception.inventory import GridInventoryRecognizer, TemplateInventoryRecognizer
+from perception.matching import PyramidMatcher
+from perception.regions import DEFAULT_REGIONS, RegionRegistry
+from perception.template_cache import TemplateCache
+
+from .corpus import Corpus, CorpusFrame, recorded_corpus, synthetic_corpus
+from .harness import BenchmarkReport, Stage, compare_reports, run_stages
+
+AGILITY_PREFIXES = ("Map", "Mog", "Clm", "Clk", "Cl")
+LOGIN_THRESHOLD = 0.8
+
+
+class LoginStateMatcher:
+    """The per-frame template loop of ``Login.py``.
+
+    ``Login.py`` drives the client as soon as it is imported, so its matching
+    loop is reproduced here: every login template is cropped to its region
+    and thresholded with ``np.where`` until one matches.
+    """
+
+    def __init__(
+        self,
+        template_dir: Path | str,
+        *,
+        regions: RegionRegistry = DEFAULT_REGIONS,
+        cache: Optional[TemplateCache] = None,
+        threshold: float = LOGIN_THRESHOLD,
+    ) -> None:
+        self.template_dir = Path(template_dir)
+        self.regions = regions
+        self.threshold = threshold
+        cache = cache or TemplateCache()
+        self.templates: Dict[str, np.ndarray] = {}
+        for filename in sorted(os.listdir(self.template_dir)):
+            template = cache.load(self.template_dir / filename, cv2.IMREAD_GRAYSCALE)
+            if template is not None:
+                self.templates[filename] = template
+
+    def match(self, grayscale: np.ndarray) -> Optional[str]:
+        for name, template in self.templates.items():
+            region = self.regions.lookup(name, self.template_dir)
+            search, _ = region.crop(grayscale, min_size=template.shape)
+            result = cv2.matchTemplate(search, template, cv2.TM_CCOEFF_NORMED)
+            if np.where(result >= self.threshold)[0].size:
+                return name
+        return None
+
+
+def build_stages(corpus: Corpus, *, workers: int = 1, pyramid: bool = False) -> List[Stage]:
+    """Create one :class:`Stage` per pipeline component for ``corpus``."""
+
+    cache = TemplateCache()
+    matcher = PyramidMatcher() if pyramid else None
+    library = TemplateLibrary(
+        str(corpus.agility_dir),
+        regions=DEFAULT_REGIONS,
+        cache=cache,
+        matcher=matcher,
+        workers=workers,
+    )
+    engine = AgilityDecisionEngine(library, course=CourseModel.from_templates(library.templates))
+    replay = ReplayBackend([frame.color for frame in corpus.frames])
+    width, height = corpus.frame_size
+
+    def capture(frame: CorpusFrame) -> bool:
+        replay.grab((0, 0, width, height))
+        return True
+
+    def template_library(frame: CorpusFrame) -> bool:
+        return library.match_first(frame.grayscale, prefixes=AGILITY_PREFIXES) is not None
+
+    def agility_decision(frame: CorpusFrame) -> bool:
+        return engine.evaluate(frame.grayscale).handled
+
+    stages = [
+        Stage("capture_replay", capture),
+        Stage("template_library", template_library),
+        Stage("agility_decision", agility_decision),
+    ]
+
+    if corpus.inventory_dir is not None:
+        sweep = TemplateInventoryRecognizer(
+            corpus.inventory_dir, regions=DEFAULT_REGIONS, cache=cache, workers=workers
+        )
+        grid = GridInventoryRecognizer(corpus.inventory_dir, grid=corpus.grid, cache=cache)
+        stages.append(Stage("inventory_sweep", lambda frame: bool(sweep.detect_from_image(frame.color))))
+        stages.append(
+            Stage(
+                "inventory_grid",
+                lambda frame: any(d.template_path for d in grid.detect_from_image(frame.color)),
+            )
+        )
+
+    login = LoginStateMatcher(corpus.login_dir, cache=cache)
+    stages.append(Stage("login_state", lambda frame: login.match(frame.grayscale) is not None))
+    return stages
+
+
+def run_benchmark(
+    corpus: Corpus,
+    *,
+    repeat: int = 1,
+    warmup: int = 3,
+    workers: int = 1,
+    pyramid: bool = False,
+) -> BenchmarkReport:
+    stages = build_stages(corpus, workers=workers, pyramid=pyramid)
+    width, height = corpus.frame_size
+    return run_stages(
+        stages,
+        corpus.frames,
+        warmup=warmup,
+        repeat=repeat,
+        metadata={
+            "frame_size": [width, height],
+            "workers": workers,
+            "matcher": "pyramid" if pyramid else "direct",
+        },
+    )
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=60, help="synthetic frames to generate")
+    parser.add_argument("--size", default="960x540", help="synthetic frame size WIDTHxHEIGHT")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", type=Path, help="replay recorded frames (image directory or video)")
+    parser.add_argument("--save-corpus", type=Path, help="write the synthetic frames to this directory")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1, help="template-matching threads")
+    parser.add_argument("--pyramid", action="store_true", help="use the coarse-to-fine matcher")
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results/latest.json"))
+    parser.add_argument("--baseline", type=Path, help="earlier results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed p95 regression")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="runelabs-bench-") as workdir:
+        if args.corpus is not None:
+            corpus = recorded_corpus(args.corpus)
+        else:
+            width, height = (int(value) for value in args.size.lower().split("x"))
+            corpus = synthetic_corpus(workdir, args.frames, size=(width, height), seed=args.seed)
+            if args.save_corpus is not None:
+                corpus.save(args.save_corpus)
+        report = run_benchmark(
+            corpus,
+            repeat=args.repeat,
+            warmup=args.warmup,
+            workers=args.workers,
+            pyramid=args.pyramid,
+        )
+
+    print(report.format_table())
+    path = report.write_json(args.output)
+    print(f"\nResults written to {path}")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_reports(report.as_dict(), baseline, tolerance=args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            return 1
+    return 0
+
+
+__all__ = ["LoginStateMatcher", "build_stages", "main", "run_benchmark"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,8 +12,11 @@ from dotenv import load_dotenv
 from automation.logging_config import configure_logging
 from automation.controller import AutomationController  # merged controller (lifecycle + nav/perception)
 from automation.quest import QuestOrchestrator
+from automation.supervisor import MultiClientSupervisor, agility_pipeline
 from navigation.controller import NavigationController
+from navigation.route_store import RouteStore
 from perception.inventory import TemplateInventoryRecognizer
+from perception.regions import DEFAULT_REGIONS
 from login_launcher import LoginLaunchError, LoginLauncher
 
 
@@ -37,6 +40,8 @@ class MainWindow:
         # Navigation / perception stack
         template_root = Path("Agility/Canifis")
         inventory_template_root = Path("perception/templates")
+        # Routes and minimap templates persist under Agility/Canifis/.routes,
+        # so the navigation buttons never decode images after the first run.
         self.navigation_controller = NavigationController(
             template_root,
             route_overrides={
@@ -44,8 +49,11 @@ class MainWindow:
                 "varrock": ["Map3", "Map4", "Map5", "Map6"],
                 "ge": ["Map5", "Map6", "Map7", "Map8"],
             },
+            route_store=RouteStore(template_root),
+        )
+        self.inventory_recognizer = TemplateInventoryRecognizer(
+            inventory_template_root, regions=DEFAULT_REGIONS
         )
-        self.inventory_recognizer = TemplateInventoryRecognizer(inventory_template_root)
 
         # Unified automation controller (provides task lifecycle + shared state + nav/perception)
         self.automation_controller = AutomationController(
@@ -115,6 +123,10 @@ class MainWindow:
         self.mining_button = Button(self.skill_frame, text="Mining", command=self.mining)
         self.mining_button.pack(side=tk.LEFT)
 
+        self.supervisor = None
+        self.all_clients_button = Button(self.skill_frame, text="Agility (all clients)", command=self.agility_all_clients)
+        self.all_clients_button.pack(side=tk.LEFT)
+
         self.navigation_label = Label(master, text="Navigate")
         self.navigation_label.pack()
 
@@ -174,6 +186,32 @@ class MainWindow:
     def agility(self):
         logger.info("Agility button clicked")
 
+    def agility_all_clients(self):
+        if self.supervisor is not None:
+            logger.info("Stopping multi-client agility")
+            self.supervisor.close()
+            self.supervisor = None
+            self.all_clients_button.config(text="Agility (all clients)")
+            self.activity_var.set("Activity: None")
+            return
+        supervisor = MultiClientSupervisor(agility_pipeline())
+        try:
+            clients = supervisor.discover()
+        except Exception as e:
+            logger.exception("Client discovery failed")
+            messagebox.showerror("RuneLabs", f"Could not find RuneLite clients:\n{e}")
+            supervisor.close()
+            return
+        if not clients:
+            messagebox.showwarning("RuneLabs", "No RuneLite windows with a configured account were found.")
+            supervisor.close()
+            return
+        logger.info("Starting multi-client agility", extra={"clients": len(clients)})
+        supervisor.start()
+        self.supervisor = supervisor
+        self.all_clients_button.config(text=f"Stop all ({len(clients)})")
+        self.activity_var.set(f"Activity: Agility x{len(clients)}")
+
     def fletching(self):
         logger.info("Fletching button clicked")
 
@@ -236,6 +274,8 @@ class MainWindow:
 
     # ---------- Window lifecycle ----------
     def on_close(self):
+        if self.supervisor is not None:
+            self.supervisor.close()
         try:
             self.master.destroy()
         except Exception:
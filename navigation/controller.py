@@ -5,19 +5,28 @@ from pathlib import Path
 from typing import Dict, Iterable, List, Optional
 
 from .minimap import MinimapTemplateReader, RouteBuilder, RouteWaypoint
+from .route_store import RouteStore
 
 
 class NavigationController:
-    """Generates waypoint sequences for high level navigation requests."""
+    """Generates waypoint sequences for high level navigation requests.
+
+    With a ``route_store`` templates come from its memory-mapped pool and
+    planned routes are persisted, so planning a known route on a later run
+    is a lookup that never decodes an image.
+    """
 
     def __init__(
         self,
         template_directory: Path | str,
         route_overrides: Optional[Dict[str, Iterable[str]]] = None,
+        *,
+        route_store: Optional[RouteStore] = None,
     ) -> None:
         self.template_directory = Path(template_directory)
         self.reader = MinimapTemplateReader(self.template_directory)
-        self.builder = RouteBuilder(self.reader)
+        self.route_store = route_store
+        self.builder = RouteBuilder(route_store or self.reader)
         self._route_cache: Dict[str, List[RouteWaypoint]] = {}
         self._route_overrides = {
             key.lower(): tuple(templates)
@@ -25,7 +34,7 @@ class NavigationController:
         }
 
     def list_templates(self) -> List[str]:
-        return [template.name for template in self.reader.available_templates()]
+        return [template.name for template in self.builder.reader.available_templates()]
 
     def plan_route(self, destination: str) -> List[RouteWaypoint]:
         """Return waypoint information for the requested destination."""
@@ -34,10 +43,15 @@ class NavigationController:
             return list(self._route_cache[route_key])
 
         override = self._route_overrides.get(route_key)
-        if override:
-            waypoints = self.builder.build_custom_route(override, description=f"Route to {destination.title()}")
-        else:
-            waypoints = self.builder.build_route(description=f"Route to {destination.title()}")
+        source = override or None
+        waypoints = self.route_store.get(route_key, source) if self.route_store else None
+        if waypoints is None:
+            if override:
+                waypoints = self.builder.build_custom_route(override, description=f"Route to {destination.title()}")
+            else:
+                waypoints = self.builder.build_route(description=f"Route to {destination.title()}")
+            if self.route_store is not None:
+                self.route_store.put(route_key, waypoints, source=source)
         self._route_cache[route_key] = waypoints
         return list(waypoints)
 
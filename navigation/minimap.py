@@ -3,11 +3,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, Iterator, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol
 
 import cv2
 import numpy as np
 
+from perception.template_cache import TemplateCache, get_template_cache
+
 
 @dataclass
 class MinimapTemplate:
@@ -21,15 +23,22 @@ class MinimapTemplate:
 class MinimapTemplateReader:
     """Loads minimap templates from disk for navigation routines."""
 
-    def __init__(self, template_directory: Path | str, image_prefix: str = "Map") -> None:
+    def __init__(
+        self,
+        template_directory: Path | str,
+        image_prefix: str = "Map",
+        *,
+        cache: Optional[TemplateCache] = None,
+    ) -> None:
         self.template_directory = Path(template_directory)
         self.image_prefix = image_prefix
+        self._cache = cache or get_template_cache()
 
     def available_templates(self) -> List[MinimapTemplate]:
         """Return a list of minimap templates sorted by inferred waypoint order."""
         templates: List[MinimapTemplate] = []
         for path in sorted(self._iter_template_paths(), key=self._sort_key):
-            image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+            image = self._cache.load(path, cv2.IMREAD_COLOR)
             if image is None:
                 continue
             templates.append(MinimapTemplate(name=path.stem, path=path, image=image))
@@ -53,6 +62,13 @@ class MinimapTemplateReader:
         return (int(digits) if digits else 0, path.stem)
 
 
+class TemplateSource(Protocol):
+    """Anything that lists minimap templates, such as a reader or a route store."""
+
+    def available_templates(self) -> List[MinimapTemplate]:
+        ...
+
+
 @dataclass
 class RouteWaypoint:
     """Simple data container describing a navigation waypoint."""
@@ -73,7 +89,7 @@ class RouteWaypoint:
 class RouteBuilder:
     """Builds waypoint sequences from minimap templates."""
 
-    def __init__(self, reader: MinimapTemplateReader) -> None:
+    def __init__(self, reader: TemplateSource) -> None:
         self.reader = reader
 
     def build_route(self, description: Optional[str] = None) -> List[RouteWaypoint]:
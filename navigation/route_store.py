@@ -0,0 +1,273 @@
+"""Persisted routes over a memory-mapped pool of minimap templates."""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from perception.atlas import TemplateAtlas
+
+from .minimap import MinimapTemplate, MinimapTemplateReader, RouteWaypoint
+
+logger = logging.getLogger(__name__)
+
+ROUTE_STORE_DIRNAME = ".routes"
+_FORMAT_VERSION = 1
+
+
+@dataclass(frozen=True)
+class StoredRoute:
+    """A route as saved on disk: waypoint orders and template ids into the pool."""
+
+    description: Optional[str]
+    source: Optional[Tuple[str, ...]]
+    waypoints: Tuple[Tuple[int, int], ...]
+
+
+class RouteStore:
+    """Serve planned routes without decoding any minimap image.
+
+    Every minimap template of ``template_directory`` is packed once into a
+    single memory-mapped pool (a :class:`~perception.atlas.TemplateAtlas`
+    in ``store_directory``, ``<template_directory>/.routes`` by default).
+    There is one :class:`MinimapTemplate` per pool id, and its image is a
+    view into the pool. Routes are saved as ``(order, template id)`` pairs
+    in ``routes.json``, so a stored route is rebuilt from a dictionary
+    lookup. Every route shares the same template objects, which keeps
+    memory flat however many routes are stored.
+
+    The pool is rebuilt, and stored routes are dropped, when a minimap
+    file is added, removed or modified. Unreadable files are left out and
+    listed in ``skipped.json``, so they only trigger a rebuild once they
+    change. The store can stand in for a
+    :class:`MinimapTemplateReader` in :class:`RouteBuilder`.
+    """
+
+    def __init__(
+        self,
+        template_directory: Path | str,
+        store_directory: Optional[Path | str] = None,
+        *,
+        image_prefix: str = "Map",
+    ) -> None:
+        self.template_directory = Path(template_directory)
+        self.store_directory = (
+            Path(store_directory) if store_directory is not None else self.template_directory / ROUTE_STORE_DIRNAME
+        )
+        self.image_prefix = image_prefix
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._templates: List[MinimapTemplate] = []
+        self._ids: Dict[str, int] = {}
+        self._routes: Dict[str, StoredRoute] = {}
+
+    @property
+    def pool_path(self) -> Path:
+        return self.store_directory / "pool.npy"
+
+    @property
+    def skipped_path(self) -> Path:
+        return self.store_directory / "skipped.json"
+
+    @property
+    def routes_path(self) -> Path:
+        return self.store_directory / "routes.json"
+
+    def available_templates(self) -> List[MinimapTemplate]:
+        """Return the pooled minimap templates in waypoint order."""
+
+        self._ensure_loaded()
+        return sorted(self._templates, key=lambda template: MinimapTemplateReader._sort_key(template.path))
+
+    def template(self, template_id: int) -> MinimapTemplate:
+        self._ensure_loaded()
+        return self._templates[template_id]
+
+    def template_id(self, name: str) -> Optional[int]:
+        self._ensure_loaded()
+        return self._ids.get(name)
+
+    def route_keys(self) -> Tuple[str, ...]:
+        self._ensure_loaded()
+        return tuple(self._routes)
+
+    def get(self, key: str, source: Optional[Sequence[str]] = None) -> Optional[List[RouteWaypoint]]:
+        """Return the stored route for ``key`` if it was built from the same ``source`` template names."""
+
+        self._ensure_loaded()
+        route = self._routes.get(key)
+        if route is None or route.source != _source(source):
+            return None
+        return [
+            RouteWaypoint(order=order, template=self._templates[template_id], description=route.description)
+            for order, template_id in route.waypoints
+        ]
+
+    def put(
+        self,
+        key: str,
+        waypoints: Iterable[RouteWaypoint],
+        *,
+        source: Optional[Sequence[str]] = None,
+    ) -> None:
+        """Store ``waypoints`` under ``key`` and write ``routes.json``.
+
+        Waypoints must use this store's templates; ``source`` records the
+        template names the route was built from, so :meth:`get` can tell
+        when a route override changed.
+        """
+
+        self._ensure_loaded()
+        waypoints = list(waypoints)
+        pairs = []
+        for waypoint in waypoints:
+            template_id = self._ids.get(waypoint.template.name)
+            if template_id is None:
+                raise KeyError(f"Template '{waypoint.template.name}' is not in the route store")
+            pairs.append((waypoint.order, template_id))
+        description = waypoints[0].description if waypoints else None
+        with self._lock:
+            self._routes[key] = StoredRoute(description, _source(source), tuple(pairs))
+            self._save_routes()
+
+    def clear(self) -> None:
+        """Forget every stored route; the template pool is kept."""
+
+        self._ensure_loaded()
+        with self._lock:
+            self._routes = {}
+            self._save_routes()
+
+    # ----- Internals -----
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            atlas = self._load_pool()
+            self._templates = [
+                MinimapTemplate(
+                    name=Path(filename).stem,
+                    path=self.template_directory / filename,
+                    image=atlas.view(filename),
+                )
+                for filename in atlas.entries
+            ]
+            self._ids = {template.name: index for index, template in enumerate(self._templates)}
+            self._routes = self._load_routes()
+            self._loaded = True
+
+    def _load_pool(self) -> TemplateAtlas:
+        sources = {path.name: path for path in self._source_paths()}
+        if not sources:
+            return TemplateAtlas(np.zeros(0, dtype=np.uint8), {}, channels=3)
+        if self.pool_path.exists():
+            try:
+                atlas = TemplateAtlas.load(self.pool_path)
+            except (OSError, ValueError, KeyError, TypeError) as exc:
+                logger.warning("Rebuilding unreadable route pool", extra={"path": str(self.pool_path), "error": str(exc)})
+            else:
+                if self._pool_is_fresh(atlas, sources):
+                    return atlas
+                # Windows cannot replace a file that is still mapped.
+                del atlas
+        logger.info("Building minimap template pool", extra={"templates": len(sources)})
+        atlas = TemplateAtlas.build(sources.values(), channels=3)
+        self._save_skipped(sorted(set(sources) - set(atlas.entries)))
+        atlas.save(self.store_directory, "pool")
+        del atlas
+        # Template ids may have changed, so routes saved against the old pool are void.
+        self.routes_path.unlink(missing_ok=True)
+        return TemplateAtlas.load(self.pool_path)
+
+    def _pool_is_fresh(self, atlas: TemplateAtlas, sources: Dict[str, Path]) -> bool:
+        # Files the build could not read are remembered with their stat, so
+        # a corrupt template does not force a rebuild on every start.
+        skipped = self._load_skipped()
+        if skipped is None:
+            return False
+        if set(atlas.entries) | set(skipped) != set(sources) or set(atlas.entries) & set(skipped):
+            return False
+        if not all(atlas.is_fresh(name, self.template_directory) for name in atlas.entries):
+            return False
+        return all(_stat_key(sources[name]) == key for name, key in skipped.items())
+
+    def _load_skipped(self) -> Optional[Dict[str, Tuple[int, int]]]:
+        if not self.skipped_path.exists():
+            return {}
+        try:
+            table = json.loads(self.skipped_path.read_text())
+            return {name: (int(key[0]), int(key[1])) for name, key in table.items()}
+        except (OSError, ValueError, TypeError, IndexError, AttributeError):
+            return None
+
+    def _save_skipped(self, names: Sequence[str]) -> None:
+        self.store_directory.mkdir(parents=True, exist_ok=True)
+        table = {}
+        for name in names:
+            logger.warning("Minimap template left out of the route pool", extra={"template": name})
+            table[name] = list(_stat_key(self.template_directory / name))
+        self.skipped_path.write_text(json.dumps(table, indent=1))
+
+    def _source_paths(self) -> List[Path]:
+        reader = MinimapTemplateReader(self.template_directory, self.image_prefix)
+        return list(reader._iter_template_paths())
+
+    def _load_routes(self) -> Dict[str, StoredRoute]:
+        if not self.routes_path.exists():
+            return {}
+        try:
+            table = json.loads(self.routes_path.read_text())
+            if table.get("version") != _FORMAT_VERSION or table.get("templates") != [t.name for t in self._templates]:
+                return {}
+            return {
+                key: StoredRoute(
+                    route["description"],
+                    _source(route["source"]),
+                    tuple((int(order), int(template_id)) for order, template_id in route["waypoints"]),
+                )
+                for key, route in table["routes"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable route file", extra={"path": str(self.routes_path), "error": str(exc)})
+            return {}
+
+    def _save_routes(self) -> None:
+        table = {
+            "version": _FORMAT_VERSION,
+            "templates": [template.name for template in self._templates],
+            "routes": {
+                key: {
+                    "description": route.description,
+                    "source": list(route.source) if route.source is not None else None,
+                    "waypoints": [list(pair) for pair in route.waypoints],
+                }
+                for key, route in self._routes.items()
+            },
+        }
+        self.store_directory.mkdir(parents=True, exist_ok=True)
+        temporary = self.routes_path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text(json.dumps(table, indent=1))
+        os.replace(temporary, self.routes_path)
+
+
+def _stat_key(path: Path) -> Tuple[int, int]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _source(source: Optional[Sequence[str]]) -> Optional[Tuple[str, ...]]:
+    return tuple(source) if source is not None else None
+
+
+__all__ = ["ROUTE_STORE_DIRNAME", "RouteStore", "StoredRoute"]
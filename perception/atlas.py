@@ -0,0 +1,291 @@
+"""Pack template categories into memory-mapped atlases.
+
+An atlas holds every template of one category (the letters a file name
+starts with, such as ``Map`` or ``Clk``) in a single contiguous ``uint8``
+array saved as ``<category>.npy``, plus an offset table in
+``<category>.json``. Loading memory-maps the array and hands out views,
+so start-up neither decodes images nor allocates one array per template.
+
+Build the atlases for a template directory with::
+
+    python -m perception.atlas Agility/Canifis/
+
+They are written to ``<directory>/.atlas/``, where ``TemplateLibrary``
+picks them up. Entries whose source file changed since the build are
+ignored, and those templates are decoded as usual.
+
+Both files carry the same build stamp: the last bytes of the array and
+``build`` in the table. An atlas whose two files come from different
+builds, for example after an interrupted save, fails to load and its
+templates are decoded instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .matching import PreparedTemplate, prepare_template
+
+logger = logging.getLogger(__name__)
+
+ATLAS_DIRNAME = ".atlas"
+TEMPLATE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp"}
+_FORMAT_VERSION = 2
+_ALIGN = 64
+_STAMP_BYTES = 16
+_CATEGORY = re.compile(r"^[A-Za-z]+")
+
+
+@dataclass(frozen=True)
+class AtlasEntry:
+    """Where one template lives in an atlas, and the source file it came from."""
+
+    name: str
+    shape: Tuple[int, ...]
+    offset: int
+    mask_offset: Optional[int]
+    mtime_ns: int
+    size: int
+
+
+class TemplateAtlas:
+    """Templates of one category packed into a single array.
+
+    :meth:`prepared` returns :class:`~perception.matching.PreparedTemplate`
+    objects whose pixels and masks are views into that array.
+    """
+
+    def __init__(self, pixels: np.ndarray, entries: Dict[str, AtlasEntry], channels: int) -> None:
+        self.pixels = pixels
+        self.entries = entries
+        self.channels = channels
+
+    @classmethod
+    def build(
+        cls,
+        paths: Iterable[Path | str],
+        *,
+        channels: int = 1,
+        min_transparent: float = 0.02,
+        alpha_cutoff: int = 128,
+    ) -> "TemplateAtlas":
+        """Decode and prepare ``paths`` and pack them; unreadable files are skipped."""
+
+        prepared: List[Tuple[Path, os.stat_result, PreparedTemplate]] = []
+        for path in sorted(Path(path) for path in paths):
+            image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+            if image is None:
+                logger.warning("Skipping unreadable template", extra={"path": str(path)})
+                continue
+            template = prepare_template(
+                image, channels=channels, min_transparent=min_transparent, alpha_cutoff=alpha_cutoff
+            )
+            prepared.append((path, path.stat(), template))
+
+        entries: Dict[str, AtlasEntry] = {}
+        offset = 0
+        for path, stat, template in prepared:
+            image_offset = offset
+            offset = _aligned(offset + template.image.nbytes)
+            mask_offset = None
+            if template.mask is not None:
+                mask_offset = offset
+                offset = _aligned(offset + template.mask.nbytes)
+            entries[path.name] = AtlasEntry(
+                path.name, template.image.shape, image_offset, mask_offset, stat.st_mtime_ns, stat.st_size
+            )
+        # The trailing bytes hold the build stamp written by :meth:`save`.
+        pixels = np.zeros(offset + _STAMP_BYTES, dtype=np.uint8)
+        for path, _, template in prepared:
+            entry = entries[path.name]
+            pixels[entry.offset : entry.offset + template.image.nbytes] = template.image.ravel()
+            if template.mask is not None and entry.mask_offset is not None:
+                pixels[entry.mask_offset : entry.mask_offset + template.mask.nbytes] = template.mask.ravel()
+        return cls(pixels, entries, channels)
+
+    @classmethod
+    def load(cls, path: Path | str) -> "TemplateAtlas":
+        """Memory-map the atlas at ``path`` (either its ``.npy`` or ``.json`` file)."""
+
+        path = Path(path)
+        table = json.loads(path.with_suffix(".json").read_text())
+        if table.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported atlas version in {path}")
+        pixels = np.asarray(np.load(path.with_suffix(".npy"), mmap_mode="r"))
+        if pixels.size != table["size"] or pixels[-_STAMP_BYTES:].tobytes().hex() != table["build"]:
+            raise ValueError(f"Atlas table and pixels of {path} come from different builds")
+        entries = {}
+        for raw in table["entries"]:
+            raw["shape"] = tuple(raw["shape"])
+            entries[raw["name"]] = AtlasEntry(**raw)
+        return cls(pixels, entries, int(table["channels"]))
+
+    def save(self, directory: Path | str, category: str) -> Path:
+        """Write ``<category>.npy`` and ``<category>.json`` into ``directory``."""
+
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        pixels = self.pixels if self.pixels.flags.writeable else self.pixels.copy()
+        stamp = uuid.uuid4().bytes
+        pixels[-_STAMP_BYTES:] = np.frombuffer(stamp, dtype=np.uint8)
+        target = directory / f"{category}.npy"
+        temporary = target.with_suffix(f".{os.getpid()}.tmp")
+        with open(temporary, "wb") as handle:
+            np.save(handle, pixels)
+        os.replace(temporary, target)
+        table = {
+            "version": _FORMAT_VERSION,
+            "channels": self.channels,
+            "size": int(pixels.size),
+            "build": stamp.hex(),
+            "entries": [asdict(entry) for entry in self.entries.values()],
+        }
+        table_path = target.with_suffix(".json")
+        temporary = table_path.with_suffix(f".{os.getpid()}.json.tmp")
+        temporary.write_text(json.dumps(table, indent=1))
+        os.replace(temporary, table_path)
+        return target
+
+    def view(self, name: str) -> np.ndarray:
+        entry = self.entries[name]
+        count = int(np.prod(entry.shape))
+        return self.pixels[entry.offset : entry.offset + count].reshape(entry.shape)
+
+    def mask(self, name: str) -> Optional[np.ndarray]:
+        entry = self.entries[name]
+        if entry.mask_offset is None:
+            return None
+        count = entry.shape[0] * entry.shape[1]
+        return self.pixels[entry.mask_offset : entry.mask_offset + count].reshape(entry.shape[:2])
+
+    def is_fresh(self, name: str, source_dir: Path | str) -> bool:
+        """Whether the source file of ``name`` is unchanged since the build."""
+
+        entry = self.entries[name]
+        try:
+            stat = os.stat(os.path.join(source_dir, name))
+        except OSError:
+            return False
+        return (stat.st_mtime_ns, stat.st_size) == (entry.mtime_ns, entry.size)
+
+    def prepared(
+        self,
+        *,
+        source_dir: Optional[Path | str] = None,
+        masked_method: int = cv2.TM_CCOEFF_NORMED,
+    ) -> Dict[str, PreparedTemplate]:
+        """Return views of every template, leaving out stale ones when ``source_dir`` is given."""
+
+        templates: Dict[str, PreparedTemplate] = {}
+        for name in self.entries:
+            if source_dir is not None and not self.is_fresh(name, source_dir):
+                continue
+            mask = self.mask(name)
+            method = masked_method if mask is not None else cv2.TM_CCOEFF_NORMED
+            templates[name] = PreparedTemplate(self.view(name), mask, method)
+        return templates
+
+
+def template_category(name: str) -> str:
+    """Return the letters a template name starts with (``Clk3.jpg`` -> ``Clk``)."""
+
+    match = _CATEGORY.match(name)
+    return match.group(0) if match else "misc"
+
+
+def build_atlases(
+    template_dir: Path | str,
+    *,
+    output: Optional[Path | str] = None,
+    channels: int = 1,
+) -> List[Path]:
+    """Build one atlas per category of the templates in ``template_dir``."""
+
+    template_dir = Path(template_dir)
+    output = Path(output) if output is not None else template_dir / ATLAS_DIRNAME
+    categories: Dict[str, List[Path]] = {}
+    for path in sorted(template_dir.iterdir()):
+        if path.is_file() and path.suffix.lower() in TEMPLATE_SUFFIXES:
+            categories.setdefault(template_category(path.name), []).append(path)
+    written = []
+    for category, paths in categories.items():
+        written.append(TemplateAtlas.build(paths, channels=channels).save(output, category))
+    return written
+
+
+def load_atlas_templates(
+    template_dir: Path | str,
+    *,
+    atlas_dir: Optional[Path | str] = None,
+    channels: int = 1,
+    masked_method: int = cv2.TM_CCOEFF_NORMED,
+) -> Dict[str, PreparedTemplate]:
+    """Return the up-to-date atlas templates for ``template_dir``, or nothing when there are no atlases."""
+
+    atlas_dir = Path(atlas_dir) if atlas_dir is not None else Path(template_dir) / ATLAS_DIRNAME
+    if not atlas_dir.is_dir():
+        return {}
+    templates: Dict[str, PreparedTemplate] = {}
+    for table in sorted(atlas_dir.glob("*.json")):
+        try:
+            atlas = TemplateAtlas.load(table)
+        except (OSError, ValueError, KeyError, TypeError) as exc:
+            logger.warning("Ignoring unreadable template atlas", extra={"path": str(table), "error": str(exc)})
+            continue
+        if atlas.channels != channels:
+            continue
+        templates.update(atlas.prepared(source_dir=template_dir, masked_method=masked_method))
+    return templates
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m perception.atlas", description="Pack template directories into memory-mapped atlases."
+    )
+    parser.add_argument("directories", nargs="+", type=Path, help="template directories to pack")
+    parser.add_argument("--output", type=Path, help=f"atlas directory (default: <directory>/{ATLAS_DIRNAME})")
+    parser.add_argument("--channels", type=int, choices=(1, 3), default=1, help="1 for TemplateLibrary")
+    args = parser.parse_args(argv)
+    if args.output is not None and len(args.directories) > 1:
+        parser.error("--output needs a single directory")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    for directory in args.directories:
+        for path in build_atlases(directory, output=args.output, channels=args.channels):
+            atlas = TemplateAtlas.load(path)
+            print(f"{path}: {len(atlas.entries)} templates, {atlas.pixels.nbytes / 1024:.1f} KiB")
+    return 0
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+__all__ = [
+    "ATLAS_DIRNAME",
+    "AtlasEntry",
+    "TemplateAtlas",
+    "build_atlases",
+    "load_atlas_templates",
+    "main",
+    "template_category",
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""Cheap frame-differencing used to skip re-matching unchanged frames."""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from .regions import FULL_FRAME, RegionOfInterest
+
+
+class FrameChangeDetector:
+    """Detects whether any watched region changed since the reference frame.
+
+    Each region is shrunk to a coarse ``grid`` of cell averages. A frame
+    counts as changed when any cell in any region moves by more than
+    ``threshold`` grey levels from the reference. Averaging over cells hides
+    pixel noise, while a per-cell maximum still catches small objects such
+    as a mark of grace appearing. The reference only advances on a changed
+    frame, so slow drift eventually registers as a change.
+    """
+
+    def __init__(
+        self,
+        regions: Sequence[RegionOfInterest] = (FULL_FRAME,),
+        *,
+        grid: Tuple[int, int] = (64, 36),
+        threshold: float = 6.0,
+    ) -> None:
+        if not regions:
+            raise ValueError("At least one region is required")
+        self.regions = tuple(regions)
+        self.grid = grid
+        self.threshold = threshold
+        self._reference: Optional[List[np.ndarray]] = None
+        self._reference_shape: Optional[Tuple[int, ...]] = None
+
+    def signature(self, grayscale: np.ndarray) -> List[np.ndarray]:
+        """Return the downsampled per-region signature of a grayscale frame."""
+
+        signatures: List[np.ndarray] = []
+        for region in self.regions:
+            crop, _ = region.crop(grayscale)
+            height, width = crop.shape[:2]
+            cols = max(1, min(self.grid[0], width))
+            rows = max(1, min(self.grid[1], height))
+            cells = cv2.resize(crop, (cols, rows), interpolation=cv2.INTER_AREA)
+            signatures.append(cells.astype(np.int16))
+        return signatures
+
+    def has_changed(self, grayscale: np.ndarray) -> bool:
+        """Return ``True`` and adopt ``grayscale`` as the reference if it changed."""
+
+        current = self.signature(grayscale)
+        reference = self._reference
+        changed = (
+            reference is None
+            or self._reference_shape != grayscale.shape
+            or any(
+                float(np.abs(cur - ref).max()) > self.threshold
+                for cur, ref in zip(current, reference)
+            )
+        )
+        if changed:
+            self._reference = current
+            self._reference_shape = grayscale.shape
+        return changed
+
+    def reset(self) -> None:
+        """Forget the reference so the next frame counts as changed."""
+
+        self._reference = None
+        self._reference_shape = None
+
+
+__all__ = ["FrameChangeDetector"]
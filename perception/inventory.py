@@ -1,12 +1,18 @@
 """Template-based inventory and object recognition pipeline."""
 from __future__ import annotations
 
+from concurrent.futures import Executor, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Sequence, Tuple
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .matching import PreparedTemplate, correlate, prepare_template
+from .regions import RegionRegistry
+from .template_cache import TemplateCache, get_template_cache
 
 
 @dataclass
@@ -16,30 +22,58 @@ class InventoryDetection:
     label: str
     location: Tuple[int, int]
     confidence: float
-    template_path: Path
+    template_path: Optional[Path]
+    slot: Optional[int] = None
 
     def as_dict(self) -> Dict[str, object]:
         return {
             "label": self.label,
             "location": self.location,
             "confidence": self.confidence,
-            "template_path": str(self.template_path),
+            "template_path": str(self.template_path) if self.template_path is not None else None,
+            "slot": self.slot,
         }
 
 
 class TemplateInventoryRecognizer:
-    """Perform template matching against screenshots to locate inventory objects."""
+    """Perform template matching against screenshots to locate inventory objects.
+
+    When ``regions`` is given, screenshots are treated as full window captures
+    and each template is only searched inside its registered region; reported
+    locations stay in screenshot coordinates. With ``workers`` above one (or
+    a shared ``executor``) templates are matched concurrently; detections keep
+    the template order of a sequential sweep.
+
+    Colour templates are matched in BGR and grayscale ones in grayscale.
+    Alpha channels become masks at load time, so transparent icon
+    backgrounds do not affect the score. Each screenshot is converted at
+    most once per channel layout, however many templates use it.
+    """
 
     def __init__(
         self,
         template_directory: Path | str,
         detection_threshold: float = 0.8,
         labels: Optional[Dict[str, str]] = None,
+        *,
+        regions: Optional[RegionRegistry] = None,
+        cache: Optional[TemplateCache] = None,
+        workers: int = 1,
+        executor: Optional[Executor] = None,
+        masked_method: int = cv2.TM_CCOEFF_NORMED,
     ) -> None:
         self.template_directory = Path(template_directory)
         self.detection_threshold = detection_threshold
         self.labels = labels or {}
-        self._templates: Dict[str, Tuple[Path, np.ndarray]] = {}
+        self.regions = regions
+        self.masked_method = masked_method
+        self._cache = cache or get_template_cache()
+        self._own_executor = executor is None and workers > 1
+        if self._own_executor:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inventory-match")
+        self._executor = executor
+        self._templates: Dict[str, Tuple[Path, PreparedTemplate]] = {}
+        self._channels: Tuple[int, ...] = ()
         self._load_templates()
 
     def _load_templates(self) -> None:
@@ -50,27 +84,250 @@ class TemplateInventoryRecognizer:
                 continue
             if path.suffix.lower() not in {".png", ".jpg", ".jpeg", ".bmp"}:
                 continue
-            image = cv2.imread(str(path), cv2.IMREAD_UNCHANGED)
+            image = self._cache.load(path, cv2.IMREAD_UNCHANGED)
             if image is None:
                 continue
-            self._templates[path.stem] = (path, image)
+            channels = 3 if image.ndim == 3 and image.shape[2] >= 3 else 1
+            template = prepare_template(image, channels=channels, masked_method=self.masked_method)
+            self._templates[path.stem] = (path, template)
+        self._channels = tuple(sorted({_channel_count(template.image) for _, template in self._templates.values()}))
 
     def detect_from_image(self, image: np.ndarray) -> List[InventoryDetection]:
-        detections: List[InventoryDetection] = []
         if image is None or not self._templates:
-            return detections
-        for name, (path, template) in self._templates.items():
-            result = cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(result)
-            if max_val < self.detection_threshold:
+            return []
+        views = {channels: _with_channels(image, channels) for channels in self._channels}
+        entries = list(self._templates.items())
+        if self._executor is None or len(entries) < 2:
+            results = [
+                self._detect_template(name, path, template, views)
+                for name, (path, template) in entries
+            ]
+        else:
+            futures = [
+                self._executor.submit(self._detect_template, name, path, template, views)
+                for name, (path, template) in entries
+            ]
+            results = [future.result() for future in futures]
+        return [detection for detection in results if detection is not None]
+
+    def _detect_template(
+        self, name: str, path: Path, template: PreparedTemplate, views: Dict[int, np.ndarray]
+    ) -> Optional[InventoryDetection]:
+        image = views[_channel_count(template.image)]
+        search, (offset_x, offset_y) = image, (0, 0)
+        if self.regions is not None:
+            region = self.regions.lookup(name, self.template_directory)
+            search, (offset_x, offset_y) = region.crop(image, min_size=template.shape[:2])
+        if template.shape[0] > search.shape[0] or template.shape[1] > search.shape[1]:
+            return None
+        result = correlate(search, template)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val < self.detection_threshold:
+            return None
+        return InventoryDetection(
+            label=self.labels.get(name, name),
+            location=(offset_x + max_loc[0], offset_y + max_loc[1]),
+            confidence=float(max_val),
+            template_path=path,
+        )
+
+    def detect_from_path(self, image_path: Path | str) -> List[InventoryDetection]:
+        image = cv2.imread(str(image_path), cv2.IMREAD_UNCHANGED)
+        if image is None:
+            return []
+        return self.detect_from_image(image)
+
+    def template_names(self) -> Sequence[str]:
+        return tuple(self._templates.keys())
+
+    def close(self) -> None:
+        """Shut down the worker pool if this recognizer created it."""
+
+        if self._own_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+@dataclass(frozen=True)
+class InventoryGrid:
+    """Pixel layout of the 4x7 inventory grid within a screenshot.
+
+    Defaults describe the fixed-mode RuneLite client (765x503): the first
+    item sprite starts at ``(563, 213)`` and slots repeat every 42 px
+    horizontally and 36 px vertically. Use ``origin`` to shift the grid when
+    the screenshot is offset or cropped, for example when capturing a
+    resized window.
+    """
+
+    origin: Tuple[int, int] = (563, 213)
+    slot_size: Tuple[int, int] = (36, 32)
+    pitch: Tuple[int, int] = (42, 36)
+    columns: int = 4
+    rows: int = 7
+
+    @property
+    def slot_count(self) -> int:
+        return self.columns * self.rows
+
+    @property
+    def extent(self) -> Tuple[int, int]:
+        """Width and height an image needs to contain every slot."""
+
+        return (
+            self.origin[0] + (self.columns - 1) * self.pitch[0] + self.slot_size[0],
+            self.origin[1] + (self.rows - 1) * self.pitch[1] + self.slot_size[1],
+        )
+
+    def slot_origins(self) -> Iterator[Tuple[int, int]]:
+        """Yield the top-left corner of every slot in row-major order."""
+
+        for row in range(self.rows):
+            for column in range(self.columns):
+                yield (
+                    self.origin[0] + column * self.pitch[0],
+                    self.origin[1] + row * self.pitch[1],
+                )
+
+
+class GridInventoryRecognizer:
+    """Classify every inventory slot against every template in one batched pass.
+
+    The 28 slot tiles are cut once (at each offset within ``max_shift``
+    pixels to absorb small misalignment) and stacked into a single array.
+    Templates are stored as zero-mean, unit-norm vectors over their opaque
+    pixels, so three matrix products yield the masked normalised
+    cross-correlation of every tile against every template, the same
+    score as a masked ``TM_CCOEFF_NORMED`` match. Each slot reports its best template above
+    ``detection_threshold``. Slots whose pixels are nearly uniform (standard
+    deviation below ``empty_std``) are reported as ``empty_label``.
+    Templates and their alpha masks are resized to the slot size once at
+    load time.
+    """
+
+    def __init__(
+        self,
+        template_directory: Path | str,
+        detection_threshold: float = 0.8,
+        labels: Optional[Dict[str, str]] = None,
+        *,
+        grid: Optional[InventoryGrid] = None,
+        max_shift: int = 2,
+        empty_std: float = 4.0,
+        empty_label: str = "empty",
+        cache: Optional[TemplateCache] = None,
+    ) -> None:
+        self.template_directory = Path(template_directory)
+        self.detection_threshold = detection_threshold
+        self.labels = labels or {}
+        self.grid = grid or InventoryGrid()
+        self.max_shift = max_shift
+        self.empty_std = empty_std
+        self.empty_label = empty_label
+        self._cache = cache or get_template_cache()
+        self._names: List[str] = []
+        self._paths: List[Path] = []
+        pixels = self.grid.slot_size[0] * self.grid.slot_size[1]
+        self._bank = np.empty((0, pixels), dtype=np.float32)
+        self._weights = np.empty((0, pixels), dtype=np.float32)
+        self._load_templates()
+
+    def _load_templates(self) -> None:
+        if not self.template_directory.exists():
+            return
+        width, height = self.grid.slot_size
+        vectors: List[np.ndarray] = []
+        weights: List[np.ndarray] = []
+        for path in sorted(self.template_directory.iterdir()):
+            if not path.is_file() or path.suffix.lower() not in {".png", ".jpg", ".jpeg", ".bmp"}:
+                continue
+            image = self._cache.load(path, cv2.IMREAD_UNCHANGED)
+            if image is None:
                 continue
-            label = self.labels.get(name, name)
+            prepared = prepare_template(image)
+            image, mask = prepared.image, prepared.mask
+            if image.shape != (height, width):
+                image = cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+                if mask is not None:
+                    mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+            vectors.append(image.reshape(-1))
+            weights.append(np.ones(width * height, dtype=np.float32) if mask is None else (mask.reshape(-1) > 0))
+            self._names.append(path.stem)
+            self._paths.append(path)
+        if vectors:
+            self._weights = np.stack(weights).astype(np.float32)
+            self._bank = _masked_rows(np.stack(vectors), self._weights)
+
+    def template_names(self) -> Sequence[str]:
+        return tuple(self._names)
+
+    def slot_tiles(self, image: np.ndarray) -> np.ndarray:
+        """Return grayscale tiles shaped ``(slots, shifts, height, width)``.
+
+        Raises ``ValueError`` when a slot lies outside ``image``. Shifted
+        tiles stop at the image edge.
+        """
+
+        grayscale = _to_grayscale(image)
+        width, height = self.grid.slot_size
+        needed_width, needed_height = self.grid.extent
+        if min(self.grid.origin) < 0 or needed_width > grayscale.shape[1] or needed_height > grayscale.shape[0]:
+            raise ValueError(
+                f"Inventory grid at {self.grid.origin} needs a {needed_width}x{needed_height} image, "
+                f"got {grayscale.shape[1]}x{grayscale.shape[0]}; adjust InventoryGrid.origin"
+            )
+        windows = sliding_window_view(grayscale, (height, width))
+        shifts = np.arange(-self.max_shift, self.max_shift + 1)
+        origins = np.array(list(self.grid.slot_origins()))
+        xs = origins[:, 0, None, None] + shifts[None, None, :]
+        ys = origins[:, 1, None, None] + shifts[None, :, None]
+        xs = np.clip(xs, 0, windows.shape[1] - 1)
+        ys = np.clip(ys, 0, windows.shape[0] - 1)
+        tiles = windows[ys, xs]
+        return tiles.reshape(self.grid.slot_count, -1, height, width)
+
+    def detect_from_image(self, image: np.ndarray) -> List[InventoryDetection]:
+        if image is None:
+            return []
+        width, height = self.grid.slot_size
+        tiles = self.slot_tiles(image)
+        centre = tiles.shape[1] // 2
+        flat = tiles[:, centre].reshape(self.grid.slot_count, -1).astype(np.float32)
+        empty = flat.std(axis=1) < self.empty_std
+
+        best_scores = np.zeros(self.grid.slot_count, dtype=np.float32)
+        best_index = np.full(self.grid.slot_count, -1)
+        if len(self._names):
+            vectors = tiles.reshape(-1, width * height).astype(np.float32)
+            scores = _masked_ncc(vectors, self._bank, self._weights)
+            scores = scores.reshape(self.grid.slot_count, tiles.shape[1], -1)
+            per_template = scores.max(axis=1)
+            best_index = per_template.argmax(axis=1)
+            best_scores = per_template[np.arange(self.grid.slot_count), best_index]
+
+        detections: List[InventoryDetection] = []
+        for slot, location in enumerate(self.grid.slot_origins()):
+            if empty[slot]:
+                detections.append(
+                    InventoryDetection(
+                        label=self.empty_label,
+                        location=location,
+                        confidence=1.0,
+                        template_path=None,
+                        slot=slot,
+                    )
+                )
+                continue
+            index = int(best_index[slot])
+            if index < 0 or best_scores[slot] < self.detection_threshold:
+                continue
+            name = self._names[index]
             detections.append(
                 InventoryDetection(
-                    label=label,
-                    location=max_loc,
-                    confidence=float(max_val),
-                    template_path=path,
+                    label=self.labels.get(name, name),
+                    location=location,
+                    confidence=float(best_scores[slot]),
+                    template_path=self._paths[index],
+                    slot=slot,
                 )
             )
         return detections
@@ -81,8 +338,62 @@ class TemplateInventoryRecognizer:
             return []
         return self.detect_from_image(image)
 
-    def template_names(self) -> Sequence[str]:
-        return tuple(self._templates.keys())
+
+def _channel_count(image: np.ndarray) -> int:
+    return 1 if image.ndim == 2 else image.shape[2]
+
+
+def _with_channels(image: np.ndarray, channels: int) -> np.ndarray:
+    """Return ``image`` as grayscale (``channels == 1``) or BGR, converting only when needed."""
+
+    if channels == 1:
+        return _to_grayscale(image)
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return image
+
+
+def _to_grayscale(image: np.ndarray) -> np.ndarray:
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2GRAY)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
+def _masked_rows(vectors: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Return rows that are zero-mean and unit-norm over their weighted pixels, and zero elsewhere."""
+
+    rows = vectors.astype(np.float32)
+    counts = np.maximum(weights.sum(axis=1, keepdims=True), 1.0)
+    rows -= (rows * weights).sum(axis=1, keepdims=True) / counts
+    rows *= weights
+    norms = np.linalg.norm(rows, axis=1, keepdims=True)
+    np.maximum(norms, 1e-6, out=norms)
+    rows /= norms
+    return rows
+
+
+def _masked_ncc(tiles: np.ndarray, bank: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Masked zero-mean NCC of every tile row against every template row.
+
+    ``bank`` rows sum to zero, so the tile's masked mean drops out of the
+    numerator; the tile's masked variance comes from two more products.
+    """
+
+    counts = np.maximum(weights.sum(axis=1), 1.0)
+    numerator = tiles @ bank.T
+    sums = tiles @ weights.T
+    energies = (tiles * tiles) @ weights.T
+    variance = np.maximum(energies - sums * sums / counts, 1e-6)
+    return numerator / np.sqrt(variance)
 
 
-__all__ = ["InventoryDetection", "TemplateInventoryRecognizer"]
+__all__ = [
+    "GridInventoryRecognizer",
+    "InventoryDetection",
+    "InventoryGrid",
+    "TemplateInventoryRecognizer",
+]
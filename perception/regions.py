@@ -0,0 +1,156 @@
+"""Declarative search regions that restrict template matching to where templates can appear."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path, PurePath
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RegionOfInterest:
+    """Rectangle expressed as fractions of the window width and height.
+
+    Fractions keep a region valid as the RuneLite window is resized. Resolve
+    against a :class:`~automation.window.WindowGeometry` (or any object with
+    ``width``/``height``) with :meth:`resolve`, or crop a captured frame
+    directly with :meth:`crop`.
+    """
+
+    left: float
+    top: float
+    width: float
+    height: float
+
+    def bounds(
+        self,
+        width: int,
+        height: int,
+        *,
+        min_size: Optional[Sequence[int]] = None,
+    ) -> Tuple[int, int, int, int]:
+        """Return pixel bounds ``(x0, y0, x1, y1)`` clipped to a ``width`` x ``height`` frame.
+
+        ``min_size`` (``(height, width)``, e.g. a template shape) grows the
+        bounds around their centre so a template never outsizes its region.
+        """
+
+        x0 = int(round(self.left * width))
+        y0 = int(round(self.top * height))
+        x1 = int(round((self.left + self.width) * width))
+        y1 = int(round((self.top + self.height) * height))
+        if min_size is not None:
+            x0, x1 = _grow(x0, x1, int(min_size[1]), width)
+            y0, y1 = _grow(y0, y1, int(min_size[0]), height)
+        return (max(0, x0), max(0, y0), min(width, x1), min(height, y1))
+
+    def resolve(self, geometry: object) -> Tuple[int, int, int, int]:
+        """Return bounds relative to a window geometry's top-left corner."""
+
+        return self.bounds(int(geometry.width), int(geometry.height))  # type: ignore[attr-defined]
+
+    def crop(
+        self,
+        image: np.ndarray,
+        *,
+        min_size: Optional[Sequence[int]] = None,
+    ) -> Tuple[np.ndarray, Tuple[int, int]]:
+        """Return a view of ``image`` limited to this region and its ``(x, y)`` offset."""
+
+        height, width = image.shape[:2]
+        x0, y0, x1, y1 = self.bounds(width, height, min_size=min_size)
+        return image[y0:y1, x0:x1], (x0, y0)
+
+    @property
+    def is_full_frame(self) -> bool:
+        return (self.left, self.top, self.width, self.height) == (0.0, 0.0, 1.0, 1.0)
+
+
+def _grow(start: int, end: int, minimum: int, limit: int) -> Tuple[int, int]:
+    missing = minimum - (end - start)
+    if missing <= 0:
+        return start, end
+    start -= missing // 2
+    end = start + minimum
+    if start < 0:
+        start, end = 0, minimum
+    if end > limit:
+        start, end = max(0, limit - minimum), limit
+    return start, end
+
+
+FULL_FRAME = RegionOfInterest(0.0, 0.0, 1.0, 1.0)
+MINIMAP_REGION = RegionOfInterest(0.65, 0.0, 0.35, 0.45)
+INVENTORY_REGION = RegionOfInterest(0.6, 0.4, 0.4, 0.6)
+LOGIN_BOX_REGION = RegionOfInterest(0.15, 0.1, 0.7, 0.8)
+
+
+class RegionRegistry:
+    """Maps template name prefixes and template directories to search regions.
+
+    Prefix rules win over directory rules, and the longest matching prefix
+    wins among prefixes. Templates without a rule search the full frame.
+    """
+
+    def __init__(
+        self,
+        prefixes: Optional[Dict[str, RegionOfInterest]] = None,
+        directories: Optional[Dict[str, RegionOfInterest]] = None,
+    ) -> None:
+        self._prefixes: Dict[str, RegionOfInterest] = dict(prefixes or {})
+        self._directories: Dict[str, RegionOfInterest] = {}
+        for directory, region in (directories or {}).items():
+            self.register_directory(directory, region)
+
+    def register_prefix(self, prefix: str, region: RegionOfInterest) -> None:
+        self._prefixes[prefix] = region
+
+    def register_directory(self, directory: Path | str, region: RegionOfInterest) -> None:
+        self._directories[_normalise_directory(directory)] = region
+
+    def lookup(
+        self, template_name: str, directory: Optional[Path | str] = None
+    ) -> RegionOfInterest:
+        """Return the region a template should be searched in."""
+
+        best_prefix = ""
+        for prefix in self._prefixes:
+            if template_name.startswith(prefix) and len(prefix) > len(best_prefix):
+                best_prefix = prefix
+        if best_prefix:
+            return self._prefixes[best_prefix]
+        if directory is not None:
+            normalised = _normalise_directory(directory)
+            for key, region in self._directories.items():
+                if normalised == key or normalised.endswith("/" + key):
+                    return region
+        return FULL_FRAME
+
+
+def _normalise_directory(directory: Path | str) -> str:
+    return PurePath(directory).as_posix().rstrip("/")
+
+
+DEFAULT_REGIONS = RegionRegistry(
+    prefixes={
+        "Map": MINIMAP_REGION,
+        # The in-game marker is the chat tab strip, outside the login box.
+        "4 InGame": FULL_FRAME,
+    },
+    directories={
+        "Login": LOGIN_BOX_REGION,
+        "perception/templates": INVENTORY_REGION,
+    },
+)
+
+
+__all__ = [
+    "DEFAULT_REGIONS",
+    "FULL_FRAME",
+    "INVENTORY_REGION",
+    "LOGIN_BOX_REGION",
+    "MINIMAP_REGION",
+    "RegionOfInterest",
+    "RegionRegistry",
+]
@@ -0,0 +1,159 @@
+"""Process-wide cache of decoded template images backed by memory-mapped ``.npy`` files."""
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR_ENV = "RUNELABS_TEMPLATE_CACHE"
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "runelabs" / "templates"
+
+
+class _Entry(NamedTuple):
+    mtime_ns: int
+    size: int
+    image: np.ndarray
+
+
+class TemplateCache:
+    """Decode each template once per process and persist the decoded arrays.
+
+    Entries are keyed by resolved path, ``cv2.imread`` flags and an optional
+    downsampling ``scale``, and are invalidated whenever the source file's
+    mtime or size changes. When ``cache_dir`` is set, decoded arrays are also
+    written there as one ``.npy`` file per variant and memory-mapped on later
+    runs, so start-up skips JPEG/PNG decoding entirely. Returned arrays are
+    shared between callers and therefore read-only.
+    """
+
+    def __init__(self, cache_dir: Optional[Path | str] = None) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries: Dict[Tuple[str, int, float], _Entry] = {}
+        self._lock = threading.Lock()
+        self.decodes = 0
+
+    def load(
+        self,
+        path: Path | str,
+        flags: int = cv2.IMREAD_GRAYSCALE,
+        *,
+        scale: float = 1.0,
+    ) -> Optional[np.ndarray]:
+        """Return the decoded template at ``path`` or ``None`` if it cannot be read."""
+
+        resolved = str(Path(path).resolve())
+        try:
+            stat = os.stat(resolved)
+        except OSError:
+            return None
+        key = (resolved, int(flags), float(scale))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry.mtime_ns, entry.size) == (stat.st_mtime_ns, stat.st_size):
+                return entry.image
+
+        image = self._load_persisted(key, stat)
+        if image is None:
+            image = self._decode(resolved, flags, scale)
+            if image is None:
+                return None
+            self._persist(key, stat, image)
+        image.setflags(write=False)
+        with self._lock:
+            self._entries[key] = _Entry(stat.st_mtime_ns, stat.st_size, image)
+        return image
+
+    def clear(self) -> None:
+        """Drop the in-process entries; persisted files are kept."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def _decode(self, path: str, flags: int, scale: float) -> Optional[np.ndarray]:
+        image = cv2.imread(path, flags)
+        if image is None:
+            return None
+        self.decodes += 1
+        if scale != 1.0:
+            image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return np.ascontiguousarray(image)
+
+    def _persisted_path(self, key: Tuple[str, int, float], stat: os.stat_result) -> Path:
+        assert self.cache_dir is not None
+        key_digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        stamp = f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+        return self.cache_dir / f"{key_digest}-{stamp}.npy"
+
+    def _load_persisted(
+        self, key: Tuple[str, int, float], stat: os.stat_result
+    ) -> Optional[np.ndarray]:
+        if self.cache_dir is None:
+            return None
+        cached = self._persisted_path(key, stat)
+        if not cached.exists():
+            return None
+        try:
+            return np.asarray(np.load(cached, mmap_mode="r"))
+        except (OSError, ValueError) as exc:
+            logger.debug("Ignoring unreadable template cache file", extra={"path": str(cached), "error": str(exc)})
+            return None
+
+    def _persist(
+        self, key: Tuple[str, int, float], stat: os.stat_result, image: np.ndarray
+    ) -> None:
+        if self.cache_dir is None:
+            return
+        target = self._persisted_path(key, stat)
+        key_prefix = target.name.split("-", 1)[0]
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            for stale in self.cache_dir.glob(f"{key_prefix}-*.npy"):
+                stale.unlink()
+            temporary = target.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporary, "wb") as handle:
+                np.save(handle, image)
+            os.replace(temporary, target)
+        except OSError as exc:
+            logger.debug("Could not persist template cache file", extra={"path": str(target), "error": str(exc)})
+
+
+_shared_cache: Optional[TemplateCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_template_cache() -> TemplateCache:
+    """Return the process-wide cache shared by every template loader.
+
+    The on-disk location defaults to ``~/.cache/runelabs/templates`` and can
+    be overridden with ``RUNELABS_TEMPLATE_CACHE``; an empty value keeps the
+    cache in memory only.
+    """
+
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            cache_dir = os.environ.get(CACHE_DIR_ENV, str(DEFAULT_CACHE_DIR))
+            _shared_cache = TemplateCache(cache_dir or None)
+        return _shared_cache
+
+
+def load_template(
+    path: Path | str,
+    flags: int = cv2.IMREAD_GRAYSCALE,
+    *,
+    scale: float = 1.0,
+) -> Optional[np.ndarray]:
+    """Load ``path`` through the shared :class:`TemplateCache`."""
+
+    return get_template_cache().load(path, flags, scale=scale)
+
+
+__all__ = ["CACHE_DIR_ENV", "TemplateCache", "get_template_cache", "load_template"]
@@ -6,6 +6,9 @@ ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
+# Keep the shared template cache in memory so tests never write to ~/.cache.
+os.environ.setdefault("RUNELABS_TEMPLATE_CACHE", "")
+
 try:  # pragma: no cover - prefer real numpy when available
     import numpy  # type: ignore
 except ModuleNotFoundError:  # pragma: no cover - fallback for test environment
@@ -65,6 +68,11 @@ def _ensure_module(name, attributes):
     return module
 
 
+try:  # pragma: no cover - prefer real OpenCV when available
+    import cv2  # type: ignore  # noqa: F401
+except ModuleNotFoundError:  # pragma: no cover - fallback for test environment
+    pass
+
 if "cv2" not in sys.modules:  # pragma: no cover - provide lightweight stub
     def _match_template(*args, **kwargs):
         return numpy.zeros((0, 0))
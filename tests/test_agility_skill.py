@@ -0,0 +1,233 @@
+import numpy as np
+
+from automation.skills.agility import AgilityDecisionEngine, CourseModel
+from automation.templates import TemplateMatch
+from perception.change import FrameChangeDetector
+
+
+class StubLibrary:
+    def __init__(self, matches=None):
+        self.matches = dict(matches or {})
+        self.calls = []
+
+    def match_first(self, grayscale, *, prefixes, scores=None):
+        self.calls.append(tuple(prefixes))
+        for prefix in prefixes:
+            if prefix in self.matches:
+                return self.matches[prefix]
+        return None
+
+
+def _frame(value=0):
+    return np.full((54, 96), value, dtype=np.uint8)
+
+
+def test_change_detector_flags_small_localised_change():
+    detector = FrameChangeDetector()
+    frame = _frame(40)
+
+    assert detector.has_changed(frame) is True
+    assert detector.has_changed(frame.copy()) is False
+
+    moved = frame.copy()
+    moved[10:14, 20:24] = 200
+    assert detector.has_changed(moved) is True
+
+
+def test_engine_reuses_outcome_for_unchanged_frame():
+    library = StubLibrary()
+    engine = AgilityDecisionEngine(library, change_detector=FrameChangeDetector())
+
+    first = engine.evaluate(_frame())
+    second = engine.evaluate(_frame())
+
+    assert first.handled is False
+    assert second is first
+    assert library.calls == [("Map",)]
+    assert engine.frames_evaluated == 1
+    assert engine.frames_skipped == 1
+    assert engine.skip_ratio == 0.5
+
+
+def test_engine_re_evaluates_same_frame_after_state_change():
+    library = StubLibrary({"Map": TemplateMatch("Map1.jpg", (5, 5), 0.95)})
+    engine = AgilityDecisionEngine(library, change_detector=FrameChangeDetector())
+
+    assert engine.evaluate(_frame()).handled is True
+    engine.evaluate(_frame())
+
+    assert engine.clicks_to_spend == 1
+    assert engine.frames_skipped == 0
+    assert library.calls[1:] == [("Mog",), ("Clm", "Clk", "Cl")]
+
+
+def test_engine_without_detector_always_matches():
+    library = StubLibrary()
+    engine = AgilityDecisionEngine(library)
+
+    engine.evaluate(_frame())
+    engine.evaluate(_frame())
+
+    assert len(library.calls) == 2
+    assert engine.skip_ratio == 0.0
+
+
+def test_engine_waits_for_progress_before_clicking_again():
+    library = StubLibrary(
+        {
+            "Map": TemplateMatch("Map1.jpg", (5, 5), 0.95),
+            "Clk": TemplateMatch("Clk1.jpg", (50, 60), 0.95),
+        }
+    )
+    engine = AgilityDecisionEngine(library, wait_for_progress=True)
+
+    assert engine.evaluate(_frame()).handled is True
+    assert engine.evaluate(_frame()).click_position == (50, 60)
+
+    waiting = engine.evaluate(_frame())
+    assert waiting.handled is False
+    assert engine.awaiting == "Map1.jpg"
+
+    library.matches["Map"] = TemplateMatch("Map2.jpg", (5, 5), 0.95)
+    assert engine.evaluate(_frame()).handled is True
+    assert engine.current_map == "Map2.jpg"
+    assert engine.awaiting is None
+
+
+def test_engine_reports_match_calls_per_decision():
+    class CountingLibrary(StubLibrary):
+        def match_first(self, grayscale, *, prefixes, scores=None):
+            scores.match_calls += len(prefixes)
+            return super().match_first(grayscale, prefixes=prefixes)
+
+    library = CountingLibrary()
+    engine = AgilityDecisionEngine(library, change_detector=FrameChangeDetector())
+
+    first = engine.evaluate(_frame(), sequence=1)
+    engine.evaluate(_frame(), sequence=2)
+
+    assert first.match_calls == 1
+    assert engine.last_match_calls == 0
+    assert engine.match_calls == 1
+
+
+def test_course_model_pairs_minimap_states_with_their_obstacles():
+    course = CourseModel.from_templates(
+        ["Map3.jpg", "Map6F.png", "Clk3.jpg", "Clr3.png", "Clk6f.png", "Clk6.jpg", "Mog3.png"]
+    )
+
+    assert course.expected == {"Map3.jpg": ("Clk3.jpg", "Clr3.png"), "Map6F.png": ("Clk6f.png",)}
+    assert course.expected_after("Map9.jpg") == ()
+
+
+def test_engine_tries_expected_obstacle_before_full_set():
+    library = StubLibrary({"Map": TemplateMatch("Map3.jpg", (5, 5), 0.95)})
+    course = CourseModel({"Map3.jpg": ("Clk3.jpg",)})
+    engine = AgilityDecisionEngine(library, course=course, fallback_after=2)
+
+    engine.evaluate(_frame())
+    del library.matches["Map"]
+    engine.evaluate(_frame())
+    engine.evaluate(_frame())
+
+    assert library.calls[1:] == [
+        ("Mog",),
+        ("Clk3.jpg",),
+        ("Mog",),
+        ("Clk3.jpg",),
+        ("Clm", "Clk", "Cl"),
+    ]
+    assert engine.expected_misses == 2
+
+    library.matches["Clk3.jpg"] = TemplateMatch("Clk3.jpg", (50, 60), 0.95)
+    assert engine.evaluate(_frame()).click_position == (50, 60)
+    assert engine.expected_misses == 0
+
+
+def test_engine_waits_after_obstacle_with_click_left_from_mark_of_grace():
+    library = StubLibrary(
+        {
+            "Map": TemplateMatch("Map1.jpg", (5, 5), 0.95),
+            "Mog": TemplateMatch("Mog1.png", (30, 30), 0.95),
+        }
+    )
+    engine = AgilityDecisionEngine(library, wait_for_progress=True)
+
+    engine.evaluate(_frame())
+    assert engine.evaluate(_frame()).click_position == (30, 30)
+    del library.matches["Mog"]
+    library.matches["Clk"] = TemplateMatch("Clk1.jpg", (50, 60), 0.95)
+    assert engine.evaluate(_frame()).click_position == (50, 60)
+    assert engine.clicks_to_spend == 1
+
+    waiting = engine.evaluate(_frame())
+    assert waiting.handled is False
+    assert waiting.click_position is None
+
+    library.matches["Map"] = TemplateMatch("Map2.jpg", (5, 5), 0.95)
+    library.matches["Clk"] = TemplateMatch("Clk2.jpg", (70, 80), 0.95)
+    assert engine.evaluate(_frame()).click_position == (70, 80)
+    assert engine.current_map == "Map2.jpg"
+    assert engine.clicks_to_spend == 0
+
+
+def test_engine_reaches_fallback_on_unchanged_frame():
+    library = StubLibrary({"Map": TemplateMatch("Map3.jpg", (5, 5), 0.95)})
+    course = CourseModel({"Map3.jpg": ("Clk3.jpg",)})
+    engine = AgilityDecisionEngine(
+        library, change_detector=FrameChangeDetector(), course=course, fallback_after=2
+    )
+
+    engine.evaluate(_frame())
+    del library.matches["Map"]
+    library.matches["Cl"] = TemplateMatch("Clr3.png", (50, 60), 0.95)
+    outcomes = [engine.evaluate(_frame()) for _ in range(5)]
+
+    assert [outcome.click_position for outcome in outcomes[:2]] == [None, (50, 60)]
+    assert engine.expected_misses == 0
+    assert engine.clicks_to_spend == 0
+
+
+def test_engine_skips_unchanged_frame_once_fallback_misses():
+    library = StubLibrary({"Map": TemplateMatch("Map3.jpg", (5, 5), 0.95)})
+    course = CourseModel({"Map3.jpg": ("Clk3.jpg",)})
+    engine = AgilityDecisionEngine(
+        library, change_detector=FrameChangeDetector(), course=course, fallback_after=2
+    )
+
+    engine.evaluate(_frame())
+    del library.matches["Map"]
+    for _ in range(6):
+        engine.evaluate(_frame())
+
+    assert engine.expected_misses == 2
+    assert engine.frames_evaluated == 4
+    assert engine.frames_skipped == 3
+
+
+def test_engine_keeps_waiting_while_minimap_is_unrecognised():
+    library = StubLibrary(
+        {
+            "Map": TemplateMatch("Map1.jpg", (5, 5), 0.95),
+            "Mog": TemplateMatch("Mog1.png", (30, 30), 0.95),
+        }
+    )
+    engine = AgilityDecisionEngine(library, wait_for_progress=True)
+
+    engine.evaluate(_frame())
+    engine.evaluate(_frame())
+    del library.matches["Mog"]
+    library.matches["Clk"] = TemplateMatch("Clk1.jpg", (50, 60), 0.95)
+    engine.evaluate(_frame())
+    assert engine.evaluate(_frame()).message == "Waiting to leave Map1.jpg"
+
+    del library.matches["Map"]
+    moving = engine.evaluate(_frame())
+
+    assert moving.handled is False
+    assert moving.click_position is None
+    assert engine.awaiting == "Map1.jpg"
+    assert engine.clicks_to_spend == 1
+
+    engine.clear_expectation()
+    assert engine.evaluate(_frame()).click_position == (50, 60)
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from automation.async_controller import AsyncAutomationController
+from automation.controller import AutomationTask
+from automation.cursor import CursorAction, HumanLikeCursor, ThreadCursorExecutor
+from automation.metrics import MetricsRegistry
+
+
+class StubWindowAPI:
+    def capture(self):
+        color = np.zeros((4, 4, 3), dtype=np.uint8)
+        return color, color[:, :, 0]
+
+
+class AsyncCountingTask(AutomationTask):
+    def __init__(self, name, steps, log):
+        super().__init__(name)
+        self.steps = steps
+        self.log = log
+        self.stopped = False
+
+    async def perform_step(self, context):
+        color, grayscale = await context["controller"].capture()
+        self.log.append((self.name, grayscale.shape))
+        await asyncio.sleep(0.001)
+        self.steps -= 1
+        return self.steps > 0
+
+    async def on_stop(self, context):
+        self.stopped = True
+
+
+class BlockingTask(AutomationTask):
+    def __init__(self):
+        super().__init__("blocking")
+        self.threads = set()
+
+    def perform_step(self, context):
+        self.threads.add(threading.current_thread().name)
+        context["stop_event"].wait(0.01)
+        return True
+
+
+def test_coroutine_tasks_interleave_on_one_loop():
+    log = []
+    metrics = MetricsRegistry()
+    controller = AsyncAutomationController(StubWindowAPI(), metrics=metrics)
+    first = AsyncCountingTask("first", 3, log)
+    second = AsyncCountingTask("second", 3, log)
+    controller.register_task(first)
+    controller.register_task(second)
+
+    async def main():
+        controller.start("first")
+        controller.start("second")
+        assert set(controller.list_running()) == {"first", "second"}
+        return await controller.wait_all()
+
+    try:
+        results = asyncio.run(main())
+    finally:
+        controller.close()
+
+    assert all(isinstance(result, dict) for result in results)
+    assert [name for name, _ in log[:2]] == ["first", "second"]
+    assert len(log) == 6 and first.stopped and second.stopped
+    assert metrics.snapshot()["task.first.step"]["count"] == 3
+    assert controller.list_running() == ()
+
+
+def test_blocking_steps_run_off_loop_and_stop_cooperatively():
+    controller = AsyncAutomationController()
+    task = BlockingTask()
+    controller.register_task(task)
+
+    async def main():
+        running = controller.start("blocking")
+        with pytest.raises(RuntimeError):
+            controller.start("blocking")
+        await asyncio.sleep(0.05)
+        assert controller.stop_task("blocking")
+        return await asyncio.wait_for(running, timeout=5)
+
+    try:
+        context = asyncio.run(main())
+    finally:
+        controller.close()
+
+    assert context["stop_event"].is_set()
+    assert all(name.startswith("automation") for name in task.threads)
+    assert not controller.is_running("blocking")
+
+
+def test_click_awaits_the_cursor_future():
+    cursor = HumanLikeCursor(executor=ThreadCursorExecutor(dry_run=True))
+    controller = AsyncAutomationController(cursor=cursor)
+    action = CursorAction(position=(5, 6), move_offset=0, move_delay_range=(0, 0), click_delay_range=(0, 0))
+    cursor.start()
+    try:
+        result = asyncio.run(controller.click(action))
+    finally:
+        cursor.stop()
+        controller.close()
+
+    assert result.position == (5, 6)
+
+
+def test_concurrent_captures_get_their_own_frames():
+    class ReusedBufferWindowAPI:
+        def __init__(self):
+            self.color = np.zeros((4, 4, 3), dtype=np.uint8)
+            self.count = 0
+            self.active = 0
+            self.overlapped = False
+
+        def capture(self):
+            self.active += 1
+            self.overlapped |= self.active > 1
+            self.count += 1
+            self.color[:] = self.count
+            threading.Event().wait(0.005)
+            self.active -= 1
+            return self.color, self.color[:, :, 0]
+
+    window = ReusedBufferWindowAPI()
+    controller = AsyncAutomationController(window, max_workers=4)
+
+    async def main():
+        return await asyncio.gather(*(controller.capture() for _ in range(4)))
+
+    try:
+        frames = asyncio.run(main())
+    finally:
+        controller.close()
+
+    assert window.overlapped is False
+    assert sorted(int(color[0, 0, 0]) for color, _ in frames) == [1, 2, 3, 4]
+    assert not any(np.shares_memory(color, window.color) for color, _ in frames)
@@ -0,0 +1,81 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from automation.templates import TemplateLibrary
+from perception.atlas import TemplateAtlas, build_atlases, load_atlas_templates, main, template_category
+from perception.template_cache import TemplateCache
+
+requires_cv2 = pytest.mark.skipif(not hasattr(cv2, "imwrite"), reason="OpenCV not installed")
+
+
+def _pattern(shape, seed):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 255, shape, dtype=np.uint8), (5, 5), 0)
+
+
+def test_template_category_uses_leading_letters():
+    assert template_category("Clk3.jpg") == "Clk"
+    assert template_category("Map6F.png") == "Map"
+    assert template_category("42.png") == "misc"
+
+
+@requires_cv2
+def test_atlas_round_trips_templates_and_masks(tmp_path):
+    cv2.imwrite(str(tmp_path / "Clk1.png"), _pattern((30, 20), seed=1))
+    icon = np.dstack([_pattern((24, 24), seed=2)] * 3 + [np.zeros((24, 24), dtype=np.uint8)])
+    icon[4:20, 4:20, 3] = 255
+    cv2.imwrite(str(tmp_path / "Clk2.png"), icon)
+    cv2.imwrite(str(tmp_path / "Map1.png"), _pattern((40, 40), seed=3))
+
+    written = build_atlases(tmp_path)
+    atlas = TemplateAtlas.load(tmp_path / ".atlas" / "Clk.npy")
+    templates = load_atlas_templates(tmp_path)
+
+    assert sorted(path.name for path in written) == ["Clk.npy", "Map.npy"]
+    assert sorted(templates) == ["Clk1.png", "Clk2.png", "Map1.png"]
+    assert np.array_equal(templates["Clk1.png"].image, cv2.imread(str(tmp_path / "Clk1.png"), 0))
+    assert templates["Clk1.png"].mask is None
+    assert np.count_nonzero(templates["Clk2.png"].mask) == 16 * 16
+    assert np.shares_memory(atlas.view("Clk1.png"), atlas.pixels)
+
+
+@requires_cv2
+def test_library_uses_fresh_atlas_entries_only(tmp_path):
+    template = _pattern((40, 40), seed=4)
+    cv2.imwrite(str(tmp_path / "Map1.png"), template)
+    cv2.imwrite(str(tmp_path / "Map2.png"), _pattern((40, 40), seed=5))
+    assert main([str(tmp_path)]) == 0
+    cv2.imwrite(str(tmp_path / "Map2.png"), _pattern((30, 30), seed=6))
+    os.utime(tmp_path / "Map2.png", ns=(1, 1))
+
+    cache = TemplateCache()
+    library = TemplateLibrary(str(tmp_path), cache=cache)
+
+    assert cache.decodes == 1
+    assert library.templates["Map2.png"].shape == (30, 30)
+    frame = _pattern((200, 300), seed=7)
+    frame[50:90, 100:140] = template
+    assert library.match_first(frame, prefixes=("Map1",)).center == (120, 70)
+
+
+@requires_cv2
+def test_atlas_from_mixed_builds_falls_back_to_decoding(tmp_path):
+    cv2.imwrite(str(tmp_path / "Map1.png"), _pattern((40, 40), seed=8))
+    cv2.imwrite(str(tmp_path / "Map2.png"), _pattern((30, 30), seed=9))
+    build_atlases(tmp_path)
+    table = (tmp_path / ".atlas" / "Map.json").read_text()
+    build_atlases(tmp_path)
+    # An interrupted save leaves the old table next to the new pixels.
+    (tmp_path / ".atlas" / "Map.json").write_text(table)
+
+    with pytest.raises(ValueError, match="different builds"):
+        TemplateAtlas.load(tmp_path / ".atlas" / "Map.npy")
+    assert load_atlas_templates(tmp_path) == {}
+
+    cache = TemplateCache()
+    library = TemplateLibrary(str(tmp_path), cache=cache)
+    assert cache.decodes == 2
+    assert sorted(library.templates) == ["Map1.png", "Map2.png"]
@@ -0,0 +1,64 @@
+import json
+
+import cv2
+import pytest
+
+from benchmarks.corpus import synthetic_corpus
+from benchmarks.fft import crossover
+from benchmarks.harness import StageResult, compare_reports, run_stages
+from benchmarks.vision import build_stages
+
+requires_cv2 = pytest.mark.skipif(not hasattr(cv2, "minMaxLoc"), reason="OpenCV not installed")
+
+
+def test_stage_summary_reports_percentiles():
+    result = StageResult("stage", samples=[0.001 * value for value in range(1, 101)], hits=40)
+
+    summary = result.summary()
+
+    assert summary["frames"] == 100
+    assert summary["hits"] == 40
+    assert summary["p50_ms"] == pytest.approx(50.5)
+    assert summary["p99_ms"] == pytest.approx(99.01)
+    assert summary["fps"] == pytest.approx(1000 / 50.5, rel=1e-3)
+
+
+def test_compare_reports_flags_only_regressions():
+    baseline = {"stages": {"fast": {"p95_ms": 10.0}, "slow": {"p95_ms": 10.0}}}
+    current = {"stages": {"fast": {"p95_ms": 8.0}, "slow": {"p95_ms": 12.5}, "new": {"p95_ms": 1.0}}}
+
+    regressions = compare_reports(current, baseline, tolerance=0.1)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slow:")
+
+
+@requires_cv2
+def test_synthetic_corpus_runs_every_stage(tmp_path):
+    corpus = synthetic_corpus(tmp_path, frame_count=2, login_every=2)
+
+    report = run_stages(build_stages(corpus), corpus.frames, warmup=0, memory_frames=1)
+    data = report.as_dict()
+
+    assert set(data["stages"]) == {
+        "capture_replay",
+        "template_library",
+        "agility_decision",
+        "inventory_sweep",
+        "inventory_grid",
+        "login_state",
+    }
+    assert data["stages"]["login_state"]["hits"] == 1
+    assert data["stages"]["inventory_grid"]["hits"] == 1
+    assert json.loads(report.write_json(tmp_path / "out.json").read_text())["metadata"]["frames"] == 2
+
+
+def test_fft_crossover_reports_first_winning_count():
+    rows = [
+        {"template_px": 40, "templates": 1, "direct_ms": 10.0, "fft_ms": 20.0},
+        {"template_px": 40, "templates": 3, "direct_ms": 30.0, "fft_ms": 25.0},
+        {"template_px": 40, "templates": 8, "direct_ms": 80.0, "fft_ms": 40.0},
+        {"template_px": 160, "templates": 1, "direct_ms": 10.0, "fft_ms": 20.0},
+    ]
+
+    assert crossover(rows) == {40: 3, 160: None}
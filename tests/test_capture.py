@@ -0,0 +1,187 @@
+import cv2
+import numpy as np
+import pytest
+
+from automation import capture, window
+from automation.capture import PyAutoGuiBackend, ReplayBackend
+from automation.window import WindowCaptureService
+
+requires_cv2 = pytest.mark.skipif(not hasattr(cv2, "cvtColor"), reason="OpenCV not installed")
+
+
+class DummyWindow:
+    def __init__(self):
+        self.width = 400
+        self.height = 300
+        self.left = 0
+        self.top = 0
+        self.isMinimized = False
+        self._hWnd = 1
+        self.move_calls = 0
+        self.activate_calls = 0
+
+    def resizeTo(self, width, height):
+        self.width, self.height = width, height
+
+    def moveTo(self, x, y):
+        self.move_calls += 1
+        self.left, self.top = x, y
+
+    def activate(self):
+        self.activate_calls += 1
+
+
+def _frames(count, shape=(30, 40, 3)):
+    rng = np.random.default_rng(0)
+    return [rng.integers(0, 255, shape, dtype=np.uint8) for _ in range(count)]
+
+
+@requires_cv2
+def test_replay_backend_reuses_buffers_and_loops():
+    frames = _frames(2)
+    backend = ReplayBackend(frames)
+
+    color1, gray1 = backend.grab((0, 0, 40, 30))
+    first_gray = gray1.copy()
+    color2, gray2 = backend.grab((0, 0, 40, 30))
+    color3, _ = backend.grab((0, 0, 40, 30))
+
+    assert color1 is color2 is color3
+    assert gray1 is gray2
+    np.testing.assert_array_equal(first_gray, cv2.cvtColor(frames[0], cv2.COLOR_BGR2GRAY))
+    np.testing.assert_array_equal(color3, frames[0])
+
+
+@requires_cv2
+def test_replay_backend_reads_image_directory(tmp_path):
+    frames = _frames(3)
+    for index, frame in enumerate(frames):
+        cv2.imwrite(str(tmp_path / f"frame_{index:03d}.png"), frame)
+
+    backend = ReplayBackend(tmp_path, loop=False)
+    for frame in frames:
+        color, _ = backend.grab((0, 0, 0, 0))
+        np.testing.assert_array_equal(color, frame)
+    with pytest.raises(RuntimeError):
+        backend.grab((0, 0, 0, 0))
+
+
+@requires_cv2
+def test_pyautogui_backend_converts_rgb_to_bgr(monkeypatch):
+    rgb = np.zeros((4, 5, 3), dtype=np.uint8)
+    rgb[..., 0] = 255  # pure red in RGB order
+    monkeypatch.setattr(capture.pyautogui, "screenshot", lambda **_: rgb)
+
+    color, gray = PyAutoGuiBackend().grab((0, 0, 5, 4))
+
+    assert tuple(color[0, 0]) == (0, 0, 255)
+    assert gray[0, 0] == cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)[0, 0]
+
+
+@requires_cv2
+def test_window_service_captures_through_backend(monkeypatch):
+    monkeypatch.setattr(window.gw, "getWindowsWithTitle", lambda title: [DummyWindow()])
+    monkeypatch.setattr(window.pyautogui, "size", lambda: (800, 600))
+    frames = _frames(1, shape=(300, 400, 3))
+
+    service = WindowCaptureService("RuneLite", backend=ReplayBackend(frames))
+    color, grayscale = service.capture()
+
+    assert color.shape == (300, 400, 3)
+    assert grayscale.shape == (300, 400)
+
+
+def _service(monkeypatch, dummy, **kwargs):
+    monkeypatch.setattr(window.gw, "getWindowsWithTitle", lambda title: [dummy])
+    monkeypatch.setattr(window.pyautogui, "size", lambda: (800, 600))
+    return WindowCaptureService(
+        "RuneLite", backend=ReplayBackend(_frames(1, shape=(300, 400, 3))), **kwargs
+    )
+
+
+@requires_cv2
+def test_window_service_prepares_window_once_while_geometry_is_stable(monkeypatch):
+    dummy = DummyWindow()
+    service = _service(monkeypatch, dummy, revalidate_interval=0.0)
+
+    for _ in range(5):
+        service.capture()
+
+    assert dummy.move_calls == 1
+    assert dummy.activate_calls == 1
+
+
+@requires_cv2
+def test_window_service_reprepares_after_drift(monkeypatch):
+    dummy = DummyWindow()
+    service = _service(monkeypatch, dummy, revalidate_interval=0.0)
+    service.capture()
+
+    dummy.left = 50
+    service.capture()
+    service.capture()
+
+    assert dummy.move_calls == 2
+    assert dummy.left == 0
+
+
+@requires_cv2
+def test_window_service_skips_drift_checks_between_intervals(monkeypatch):
+    dummy = DummyWindow()
+    service = _service(monkeypatch, dummy, revalidate_interval=3600.0)
+    service.capture()
+
+    dummy.left = 50
+    service.capture()
+    assert dummy.move_calls == 1
+
+    service.invalidate_geometry()
+    service.capture()
+    assert dummy.move_calls == 2
+
+
+@requires_cv2
+def test_window_service_legacy_mode_prepares_every_capture(monkeypatch):
+    dummy = DummyWindow()
+    service = _service(monkeypatch, dummy, revalidate_interval=None)
+
+    service.capture()
+    service.capture()
+
+    assert dummy.move_calls == 2
+
+
+@requires_cv2
+def test_activate_waits_for_window_preparation(monkeypatch):
+    import threading
+
+    class SlowWindow(DummyWindow):
+        def __init__(self):
+            super().__init__()
+            self.moving = threading.Event()
+            self.release = threading.Event()
+            self.events = []
+
+        def moveTo(self, x, y):
+            self.moving.set()
+            self.release.wait(1.0)
+            self.events.append("move")
+            super().moveTo(x, y)
+
+        def activate(self):
+            self.events.append("activate")
+            super().activate()
+
+    dummy = SlowWindow()
+    service = _service(monkeypatch, dummy)
+    preparing = threading.Thread(target=service.prepare_window)
+    preparing.start()
+    assert dummy.moving.wait(1.0)
+    clicking = threading.Thread(target=service.activate)
+    clicking.start()
+    clicking.join(0.05)
+    dummy.release.set()
+    preparing.join(1.0)
+    clicking.join(1.0)
+
+    assert dummy.events == ["move", "activate", "activate"]
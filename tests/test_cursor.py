@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from automation.cursor import (
+    CursorAction,
+    CursorResult,
+    CursorService,
+    HumanLikeCursor,
+    ProcessCursorExecutor,
+    ThreadCursorExecutor,
+)
+
+
+def _action(position, delay=0.0):
+    return CursorAction(
+        position=position,
+        move_offset=0,
+        move_delay_range=(delay, delay),
+        click_delay_range=(0.0, 0.0),
+    )
+
+
+@pytest.mark.parametrize("executor_type", [ThreadCursorExecutor, ProcessCursorExecutor])
+def test_queue_click_future_resolves_when_click_lands(executor_type):
+    cursor = HumanLikeCursor(executor=executor_type(dry_run=True))
+    cursor.start()
+    try:
+        result = cursor.queue_click(_action((10, 20))).result(timeout=10)
+    finally:
+        cursor.stop()
+
+    assert isinstance(result, CursorResult)
+    assert result.position == (10, 20)
+    assert result.clicked_at >= result.started_at
+
+
+@pytest.mark.parametrize("executor_type", [ThreadCursorExecutor, ProcessCursorExecutor])
+def test_supersede_cancels_queued_and_aborts_in_flight_actions(executor_type):
+    cursor = HumanLikeCursor(executor=executor_type(dry_run=True))
+    cursor.start()
+    try:
+        slow = cursor.queue_click(_action((1, 1), delay=5.0))
+        queued = cursor.queue_click(_action((2, 2)))
+        deadline = time.monotonic() + 5
+        while not slow.running() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        latest = cursor.queue_click(_action((3, 3)), supersede=True)
+
+        assert queued.cancelled()
+        with pytest.raises(CancelledError):
+            slow.result(timeout=10)
+        assert latest.result(timeout=10).position == (3, 3)
+    finally:
+        cursor.stop()
+
+
+def test_shared_service_only_supersedes_the_callers_own_actions():
+    service = CursorService(ThreadCursorExecutor(dry_run=True))
+    first = HumanLikeCursor(service=service)
+    second = HumanLikeCursor(service=service)
+    service.start()
+    try:
+        blocker = first.queue_click(_action((1, 1), delay=0.2))
+        other = second.queue_click(_action((2, 2)))
+        mine = first.queue_click(_action((3, 3)))
+        latest = first.queue_click(_action((4, 4)), supersede=True)
+
+        assert mine.cancelled()
+        assert not other.cancelled()
+        assert other.result(timeout=10).position == (2, 2)
+        assert latest.result(timeout=10).position == (4, 4)
+        with pytest.raises(CancelledError):
+            blocker.result(timeout=10)
+        assert service.pending_count() == 0
+
+        second.stop()
+        assert service.is_running
+    finally:
+        service.stop()
+
+
+def test_unknown_executor_name_is_rejected():
+    with pytest.raises(ValueError):
+        HumanLikeCursor(executor="fibre")
+
+
+def test_shared_service_serves_owners_round_robin():
+    service = CursorService(ThreadCursorExecutor(dry_run=True))
+    order = []
+    busy = HumanLikeCursor(service=service, before_action=lambda: order.append("busy"))
+    quiet = HumanLikeCursor(service=service, before_action=lambda: order.append("quiet"))
+    futures = [busy.queue_click(_action((i, i))) for i in range(3)]
+    futures.append(quiet.queue_click(_action((9, 9))))
+
+    service.start()
+    try:
+        for future in futures:
+            future.result(timeout=10)
+    finally:
+        service.stop()
+
+    assert order == ["busy", "quiet", "busy", "busy"]
+    assert [future.result().position for future in futures[:3]] == [(0, 0), (1, 1), (2, 2)]
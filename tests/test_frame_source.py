@@ -0,0 +1,98 @@
+import itertools
+import time
+
+import numpy as np
+
+from automation.frame_source import FrameSource
+
+
+class CountingCapture:
+    """Produces frames whose pixels all equal the capture count."""
+
+    def __init__(self):
+        self._counter = itertools.count(1)
+        self.calls = 0
+
+    def __call__(self):
+        value = next(self._counter)
+        self.calls = value
+        pixel = value % 256
+        return (
+            np.full((4, 6, 3), pixel, dtype=np.uint8),
+            np.full((4, 6), pixel, dtype=np.uint8),
+        )
+
+
+def test_latest_is_non_blocking_and_sequence_increases():
+    source = FrameSource(CountingCapture())
+    assert source.latest() is None
+
+    source.start()
+    try:
+        first = source.wait_for(0, timeout=1.0)
+        assert first is not None
+        first.release()
+        second = source.wait_for(first.sequence, timeout=1.0)
+        assert second is not None
+        assert second.sequence > first.sequence
+        assert second.timestamp >= first.timestamp
+        second.release()
+        assert source.latest(after=10**9) is None
+    finally:
+        source.stop()
+
+
+def test_pinned_frames_are_never_overwritten():
+    capture = CountingCapture()
+    source = FrameSource(capture, capacity=2, interval=0.0)
+    source.start()
+    try:
+        frame = source.wait_for(0, timeout=1.0)
+        assert frame is not None
+        with frame:
+            expected = int(frame.grayscale[0, 0])
+            target = capture.calls + 50
+            deadline = time.monotonic() + 2.0
+            while capture.calls < target and time.monotonic() < deadline:
+                time.sleep(0.001)
+            assert np.all(frame.grayscale == expected)
+            assert np.all(frame.color == expected)
+    finally:
+        source.stop()
+    assert source.frames_captured > 1
+    assert source.frames_dropped > 0
+
+
+def test_capture_errors_are_recorded_and_retried():
+    calls = []
+
+    def failing_capture():
+        calls.append(1)
+        raise RuntimeError("window missing")
+
+    source = FrameSource(failing_capture, error_backoff=0.01)
+    source.start()
+    try:
+        assert source.wait_for(0, timeout=0.2) is None
+    finally:
+        source.stop()
+    assert len(calls) > 1
+    assert str(source.last_error) == "window missing"
+
+
+def test_any_capture_exception_is_recorded_and_retried():
+    calls = []
+
+    def failing_capture():
+        calls.append(1)
+        raise OSError("screen grab failed")
+
+    source = FrameSource(failing_capture, error_backoff=0.01)
+    source.start()
+    try:
+        assert source.wait_for(0, timeout=0.2) is None
+        assert source.is_running
+    finally:
+        source.stop()
+    assert len(calls) > 1
+    assert isinstance(source.last_error, OSError)
@@ -0,0 +1,115 @@
+import cv2
+import numpy as np
+import pytest
+
+from perception.inventory import GridInventoryRecognizer, InventoryGrid, TemplateInventoryRecognizer
+
+requires_cv2 = pytest.mark.skipif(not hasattr(cv2, "minMaxLoc"), reason="OpenCV not installed")
+
+
+def _pattern(shape, seed):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 255, shape, dtype=np.uint8), (5, 5), 0)
+
+
+@requires_cv2
+def test_parallel_detection_matches_sequential_sweep(tmp_path):
+    frame = _pattern((120, 160, 3), seed=0)
+    for index, (y, x) in enumerate([(10, 10), (60, 100), (80, 20)]):
+        icon = _pattern((24, 24, 3), seed=index + 1)
+        frame[y : y + 24, x : x + 24] = icon
+        cv2.imwrite(str(tmp_path / f"item{index}.png"), icon)
+
+    sequential = TemplateInventoryRecognizer(tmp_path).detect_from_image(frame)
+    recognizer = TemplateInventoryRecognizer(tmp_path, workers=3)
+    try:
+        parallel = recognizer.detect_from_image(frame)
+    finally:
+        recognizer.close()
+
+    assert [d.as_dict() for d in parallel] == [d.as_dict() for d in sequential]
+    assert sorted((d.label, d.location) for d in parallel) == [
+        ("item0", (10, 10)),
+        ("item1", (100, 60)),
+        ("item2", (20, 80)),
+    ]
+
+
+@requires_cv2
+def test_grid_recognizer_classifies_every_slot(tmp_path):
+    grid = InventoryGrid(origin=(10, 12))
+    frame = np.full((300, 200, 3), 40, dtype=np.uint8)
+    icons = {name: _pattern((32, 36, 3), seed=index + 1) for index, name in enumerate(["coins", "rope"])}
+    for name, icon in icons.items():
+        cv2.imwrite(str(tmp_path / f"{name}.png"), icon)
+    placements = {0: "coins", 5: "rope", 6: "coins", 27: "rope"}
+    origins = list(grid.slot_origins())
+    for slot, name in placements.items():
+        x, y = origins[slot]
+        # Offset by one pixel to exercise the shift search.
+        frame[y + 1 : y + 33, x + 1 : x + 37] = icons[name]
+
+    detections = GridInventoryRecognizer(tmp_path, grid=grid).detect_from_image(frame)
+
+    assert len(detections) == grid.slot_count
+    by_slot = {d.slot: d for d in detections}
+    for slot in range(grid.slot_count):
+        assert by_slot[slot].label == placements.get(slot, "empty")
+        assert by_slot[slot].location == origins[slot]
+    assert by_slot[5].confidence > 0.95
+    assert by_slot[1].template_path is None
+
+
+@requires_cv2
+def test_grid_recognizer_skips_unknown_items(tmp_path):
+    grid = InventoryGrid(origin=(0, 0))
+    frame = np.zeros((260, 170), dtype=np.uint8)
+    cv2.imwrite(str(tmp_path / "coins.png"), _pattern((32, 36), seed=1))
+    frame[0:32, 0:36] = _pattern((32, 36), seed=99)
+
+    detections = GridInventoryRecognizer(tmp_path, grid=grid).detect_from_image(frame)
+
+    assert 0 not in {d.slot for d in detections}
+    assert all(d.label == "empty" for d in detections)
+
+
+@requires_cv2
+def test_transparent_template_matches_icon_on_any_background(tmp_path):
+    icon = _pattern((24, 24, 3), seed=3)
+    alpha = np.zeros((24, 24), dtype=np.uint8)
+    alpha[4:20, 4:20] = 255
+    cv2.imwrite(str(tmp_path / "rune.png"), np.dstack([icon, alpha]))
+    frame = _pattern((120, 160, 3), seed=9)
+    frame[54:70, 84:100] = icon[4:20, 4:20]
+
+    detections = TemplateInventoryRecognizer(tmp_path, detection_threshold=0.95).detect_from_image(
+        cv2.cvtColor(frame, cv2.COLOR_BGR2BGRA)
+    )
+
+    assert [(d.label, d.location) for d in detections] == [("rune", (80, 50))]
+    assert detections[0].confidence > 0.99
+
+
+def test_grid_recognizer_rejects_grid_outside_image(tmp_path):
+    recognizer = GridInventoryRecognizer(tmp_path)
+
+    with pytest.raises(ValueError, match="needs a 725x461 image"):
+        recognizer.detect_from_image(np.zeros((300, 400), dtype=np.uint8))
+
+
+@requires_cv2
+def test_grid_recognizer_ignores_transparent_template_background(tmp_path):
+    grid = InventoryGrid(origin=(0, 0))
+    icon = _pattern((32, 36, 3), seed=3)
+    alpha = np.zeros((32, 36), dtype=np.uint8)
+    alpha[6:26, 8:28] = 255
+    cv2.imwrite(str(tmp_path / "coins.png"), np.dstack([icon, alpha]))
+    frame = np.clip(_pattern((260, 170, 3), seed=4).astype(np.int16) + 120, 0, 255).astype(np.uint8)
+    frame[6:26, 8:28] = icon[6:26, 8:28]
+
+    grid_detections = GridInventoryRecognizer(tmp_path, grid=grid).detect_from_image(frame)
+    masked = TemplateInventoryRecognizer(tmp_path).detect_from_image(frame[0:32, 0:36])
+
+    slot0 = {d.slot: d for d in grid_detections}[0]
+    assert slot0.label == "coins"
+    assert slot0.confidence == pytest.approx(masked[0].confidence, abs=0.02)
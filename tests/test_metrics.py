@@ -0,0 +1,100 @@
+import json
+import threading
+
+from automation.controller import AutomationController, AutomationTask
+from automation.metrics import MetricsRegistry
+
+
+class CountingTask(AutomationTask):
+    def __init__(self, steps):
+        super().__init__("counting")
+        self.steps = steps
+
+    def perform_step(self, context):
+        self.steps -= 1
+        return self.steps > 0
+
+
+def test_disabled_registry_records_nothing():
+    metrics = MetricsRegistry(enabled=False)
+
+    with metrics.timer("capture"):
+        pass
+    metrics.observe("decide", 0.5)
+
+    @metrics.timed("dispatch")
+    def dispatch():
+        return 7
+
+    assert dispatch() == 7
+    assert metrics.snapshot() == {}
+
+
+def test_snapshot_reports_rolling_percentiles_and_budget():
+    metrics = MetricsRegistry(window=100)
+    metrics.set_budget("decide", 0.05)
+    for value in range(1, 201):
+        metrics.observe("decide", value / 1000)
+
+    summary = metrics.snapshot()["decide"]
+
+    assert summary["count"] == 200
+    # Only the last 100 samples (101..200 ms) remain in the window.
+    assert summary["p50_ms"] == 150.5
+    assert summary["max_ms"] == 200.0
+    assert summary["over_budget"] == 150
+    assert json.loads(metrics.to_json())["decide"]["count"] == 200
+
+
+def test_prometheus_export_is_cumulative(tmp_path):
+    metrics = MetricsRegistry()
+    for seconds in (0.0002, 0.003, 0.003, 20.0):
+        metrics.observe("capture", seconds)
+
+    text = metrics.to_prometheus(tmp_path / "runelabs.prom")
+
+    assert (tmp_path / "runelabs.prom").read_text() == text
+    assert 'runelabs_stage_latency_seconds_bucket{stage="capture",le="0.0005"} 1' in text
+    assert 'runelabs_stage_latency_seconds_bucket{stage="capture",le="0.005"} 3' in text
+    assert 'runelabs_stage_latency_seconds_bucket{stage="capture",le="+Inf"} 4' in text
+    assert 'runelabs_stage_latency_seconds_count{stage="capture"} 4' in text
+
+
+def test_controller_times_each_task_step():
+    metrics = MetricsRegistry()
+    controller = AutomationController(metrics=metrics)
+    controller.register_task(CountingTask(3))
+
+    context = controller.run_task("counting")
+
+    assert context["metrics"] is metrics
+    assert metrics.snapshot()["task.counting.step"]["count"] == 3
+
+
+def test_exports_are_safe_while_stages_are_added_and_reset():
+    registry = MetricsRegistry()
+    stop = threading.Event()
+    errors = []
+
+    def churn():
+        index = 0
+        while not stop.is_set():
+            registry.observe(f"stage{index % 50}", 0.001)
+            index += 1
+            if index % 25 == 0:
+                registry.reset()
+
+    writer = threading.Thread(target=churn)
+    writer.start()
+    try:
+        for _ in range(300):
+            try:
+                registry.snapshot()
+                registry.to_prometheus()
+            except (RuntimeError, KeyError) as exc:  # pragma: no cover - the failure mode
+                errors.append(exc)
+    finally:
+        stop.set()
+        writer.join()
+
+    assert errors == []
@@ -0,0 +1,95 @@
+import cv2
+import numpy as np
+import pytest
+
+from automation.templates import TemplateLibrary
+from automation.window import WindowGeometry
+from perception.inventory import TemplateInventoryRecognizer
+from perception.regions import (
+    DEFAULT_REGIONS,
+    FULL_FRAME,
+    INVENTORY_REGION,
+    LOGIN_BOX_REGION,
+    MINIMAP_REGION,
+    RegionOfInterest,
+    RegionRegistry,
+)
+
+requires_cv2 = pytest.mark.skipif(not hasattr(cv2, "minMaxLoc"), reason="OpenCV not installed")
+
+
+def test_region_scales_with_window_geometry():
+    region = RegionOfInterest(0.5, 0.25, 0.5, 0.5)
+
+    assert region.resolve(WindowGeometry(left=10, top=10, width=960, height=540)) == (480, 135, 960, 405)
+    assert region.resolve(WindowGeometry(left=0, top=0, width=480, height=270)) == (240, 68, 480, 202)
+
+
+def test_region_grows_to_fit_template_without_leaving_frame():
+    region = RegionOfInterest(0.9, 0.0, 0.1, 0.1)
+
+    assert region.bounds(200, 100, min_size=(30, 40)) == (160, 0, 200, 30)
+
+
+def test_registry_prefers_longest_prefix_then_directory():
+    registry = RegionRegistry(
+        prefixes={"Map": MINIMAP_REGION, "Map6F": FULL_FRAME},
+        directories={"Login": LOGIN_BOX_REGION},
+    )
+
+    assert registry.lookup("Map3.jpg", "Agility/Canifis") is MINIMAP_REGION
+    assert registry.lookup("Map6F.png", "Agility/Canifis") is FULL_FRAME
+    assert registry.lookup("LoginField.png", "/opt/runelabs/Login/") is LOGIN_BOX_REGION
+    assert registry.lookup("Clk1.jpg", "Agility/Canifis") is FULL_FRAME
+
+
+def test_default_regions_cover_known_template_sets():
+    assert DEFAULT_REGIONS.lookup("Map1.jpg", "Agility/Canifis/") is MINIMAP_REGION
+    assert DEFAULT_REGIONS.lookup("PassField.png", "Login/") is LOGIN_BOX_REGION
+    assert DEFAULT_REGIONS.lookup("4 InGame.jpg", "Login/") is FULL_FRAME
+    assert DEFAULT_REGIONS.lookup("coins", "perception/templates") is INVENTORY_REGION
+
+
+def _pattern(shape, seed):
+    rng = np.random.default_rng(seed)
+    return cv2.GaussianBlur(rng.integers(0, 255, shape, dtype=np.uint8), (5, 5), 0)
+
+
+@requires_cv2
+def test_template_library_reports_full_frame_centres_for_cropped_search(tmp_path):
+    template = _pattern((40, 40), seed=3)
+    cv2.imwrite(str(tmp_path / "Map1.png"), template)
+    frame = _pattern((270, 480), seed=4)
+    frame[10:50, 400:440] = template
+
+    library = TemplateLibrary(str(tmp_path), regions=DEFAULT_REGIONS)
+    match = library.match_first(frame, prefixes=("Map",))
+
+    assert match is not None
+    assert match.center == (420, 30)
+
+
+@requires_cv2
+def test_template_library_region_excludes_matches_outside_it(tmp_path):
+    template = _pattern((40, 40), seed=3)
+    cv2.imwrite(str(tmp_path / "Map1.png"), template)
+    frame = _pattern((270, 480), seed=4)
+    frame[200:240, 20:60] = template
+
+    library = TemplateLibrary(str(tmp_path), regions=DEFAULT_REGIONS)
+
+    assert library.match_first(frame, prefixes=("Map",)) is None
+
+
+@requires_cv2
+def test_inventory_recognizer_offsets_cropped_locations(tmp_path):
+    icon = _pattern((24, 24), seed=5)
+    cv2.imwrite(str(tmp_path / "coins.png"), icon)
+    frame = _pattern((270, 480), seed=6)
+    frame[200:224, 400:424] = icon
+    registry = RegionRegistry(directories={str(tmp_path): INVENTORY_REGION})
+
+    recognizer = TemplateInventoryRecognizer(tmp_path, regions=registry)
+    detections = recognizer.detect_from_image(frame)
+
+    assert [(d.label, d.location) for d in detections] == [("coins", (400, 200))]
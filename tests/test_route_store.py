@@ -0,0 +1,94 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from navigation.controller import NavigationController
+from navigation.route_store import RouteStore
+
+requires_cv2 = pytest.mark.skipif(not hasattr(cv2, "imwrite"), reason="OpenCV not installed")
+
+
+def _minimaps(directory, count=4):
+    rng = np.random.default_rng(0)
+    for index in range(1, count + 1):
+        cv2.imwrite(str(directory / f"Map{index}.png"), rng.integers(0, 255, (20, 20, 3), dtype=np.uint8))
+
+
+@requires_cv2
+def test_stored_routes_reload_from_the_pool_without_decoding(tmp_path, monkeypatch):
+    _minimaps(tmp_path)
+    first = NavigationController(tmp_path, {"home": ["Map3", "Map1"]}, route_store=RouteStore(tmp_path))
+    planned = first.plan_route("home")
+
+    def _no_decode(*args, **kwargs):
+        raise AssertionError("templates should come from the pool")
+
+    monkeypatch.setattr(cv2, "imread", _no_decode)
+    store = RouteStore(tmp_path)
+    second = NavigationController(tmp_path, {"home": ["Map3", "Map1"]}, route_store=store)
+    route = second.plan_route("home")
+    shared = second.plan_route("other")
+
+    assert [wp.template.name for wp in route] == ["Map3", "Map1"]
+    assert [wp.template.name for wp in planned] == ["Map3", "Map1"]
+    assert np.array_equal(route[0].template.image, planned[0].template.image)
+    assert route[0].template is store.template(store.template_id("Map3"))
+    assert shared[0].template is route[1].template
+    assert set(store.route_keys()) == {"home", "other"}
+
+
+@requires_cv2
+def test_changed_override_replans_the_route(tmp_path):
+    _minimaps(tmp_path)
+    NavigationController(tmp_path, {"home": ["Map1", "Map2"]}, route_store=RouteStore(tmp_path)).plan_route("home")
+
+    route = NavigationController(
+        tmp_path, {"home": ["Map4"]}, route_store=RouteStore(tmp_path)
+    ).plan_route("home")
+
+    assert [wp.template.name for wp in route] == ["Map4"]
+    assert RouteStore(tmp_path).get("home", ["Map4"])[0].template.name == "Map4"
+
+
+@requires_cv2
+def test_modified_or_added_minimap_rebuilds_the_pool(tmp_path):
+    _minimaps(tmp_path, count=2)
+    store = RouteStore(tmp_path)
+    NavigationController(tmp_path, route_store=store).plan_route("home")
+    assert store.get("home") is not None
+
+    replacement = np.full((12, 12, 3), 7, dtype=np.uint8)
+    cv2.imwrite(str(tmp_path / "Map2.png"), replacement)
+    os.utime(tmp_path / "Map2.png", ns=(1, 1))
+    cv2.imwrite(str(tmp_path / "Map3.png"), replacement)
+    reloaded = RouteStore(tmp_path)
+
+    assert reloaded.get("home") is None
+    assert [template.name for template in reloaded.available_templates()] == ["Map1", "Map2", "Map3"]
+    assert reloaded.template(reloaded.template_id("Map2")).image.shape == (12, 12, 3)
+
+
+def test_empty_directory_has_no_templates(tmp_path):
+    store = RouteStore(tmp_path)
+
+    assert store.available_templates() == []
+    assert NavigationController(tmp_path, route_store=store).plan_route("home") == []
+    assert store.get("home") == []
+
+
+@requires_cv2
+def test_unreadable_minimap_does_not_rebuild_the_pool_every_start(tmp_path):
+    _minimaps(tmp_path, count=2)
+    (tmp_path / "Map3.png").write_bytes(b"not an image")
+    NavigationController(tmp_path, route_store=RouteStore(tmp_path)).plan_route("home")
+    built = (tmp_path / ".routes" / "pool.npy").stat().st_mtime_ns
+
+    reloaded = RouteStore(tmp_path)
+
+    assert [wp.template.name for wp in reloaded.get("home")] == ["Map1", "Map2"]
+    assert (tmp_path / ".routes" / "pool.npy").stat().st_mtime_ns == built
+
+    cv2.imwrite(str(tmp_path / "Map3.png"), np.zeros((20, 20, 3), dtype=np.uint8))
+    assert RouteStore(tmp_path).get("home") is None
@@ -0,0 +1,69 @@
+import pytest
+
+from automation.scheduler import TickScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _scheduler(clock, **kwargs):
+    return TickScheduler(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_idle_polls_back_off_to_the_cap():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, idle_backoff=2.0, max_idle_interval=2.0)
+
+    delays = []
+    for _ in range(4):
+        scheduler.idle()
+        delays.append(scheduler.wait())
+
+    assert delays == pytest.approx([0.6, 1.2, 2.0, 2.0])
+    assert scheduler.idle_time == pytest.approx(5.8)
+
+
+def test_action_polls_fast_then_follows_observed_tick_phase():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, fast_interval=0.05, fast_window=0.1)
+
+    scheduler.action_dispatched()
+    assert scheduler.next_delay() == pytest.approx(0.05)
+
+    scheduler.state_advanced()
+    assert scheduler.wait() == 0.0
+
+    scheduler.action_dispatched()
+    clock.now += 0.3
+    assert scheduler.idle() is False
+    # Mid-tick: sleep to the next predicted boundary, then poll fast.
+    assert scheduler.wait() == pytest.approx(0.3)
+    assert scheduler.next_delay() == pytest.approx(0.05)
+    assert scheduler.idle_time == 0.0
+
+
+def test_pending_action_times_out_once_and_metrics_are_reported():
+    clock = FakeClock()
+    scheduler = _scheduler(clock, action_timeout=1.0)
+
+    scheduler.action_dispatched()
+    clock.now += 0.5
+    assert scheduler.idle() is False
+    clock.now += 0.6
+    assert scheduler.idle() is True
+    assert scheduler.pending is False
+    assert scheduler.idle() is False
+
+    clock.now = 100.0 + 3600.0
+    assert scheduler.actions_per_hour == pytest.approx(1.0)
+    assert scheduler.stats()["timeouts"] == 1
@@ -0,0 +1,125 @@
+import multiprocessing as mp
+import queue
+
+import numpy as np
+import pytest
+
+from automation.capture import ReplayBackend
+from automation.shared_frames import SharedFramePublisher, SharedFrameRing
+
+SHAPE = (4, 6)
+
+
+def _fill_with(value):
+    def fill(color, grayscale):
+        color[...] = value
+        grayscale[...] = value
+
+    return fill
+
+
+def _read_frames(handle, count, results):
+    ring = handle.attach()
+    try:
+        sequence = 0
+        for _ in range(count):
+            frame = ring.wait_for(sequence, timeout=5)
+            if frame is None:
+                break
+            with frame:
+                sequence = frame.sequence
+                results.put((frame.sequence, int(frame.grayscale[0, 0]), int(frame.color.max())))
+    finally:
+        ring.close()
+    results.put(None)
+
+
+def test_frames_are_read_only_views_and_pinned_slots_are_kept():
+    with SharedFrameRing.create(SHAPE, capacity=2) as ring:
+        assert ring.latest() is None
+        assert ring.publish_with(_fill_with(7)) == 1
+
+        frame = ring.latest()
+        assert frame.sequence == 1 and frame.grayscale.shape == SHAPE
+        with pytest.raises(ValueError):
+            frame.grayscale[0, 0] = 1
+
+        # Slot 0 is pinned and slot 1 becomes the latest, so the next frame is dropped.
+        assert ring.publish_with(_fill_with(8)) == 2
+        assert ring.publish_with(_fill_with(9)) is None
+        assert ring.frames_dropped == 1
+        assert int(frame.grayscale[0, 0]) == 7
+        frame.release()
+
+        assert ring.publish_with(_fill_with(9)) == 3
+        with ring.latest(after=2) as newest:
+            assert int(newest.color[0, 0, 0]) == 9
+        assert ring.latest(after=3) is None
+
+
+def test_worker_process_reads_frames_without_copies():
+    with SharedFrameRing.create(SHAPE, capacity=3) as ring:
+        results = mp.Queue()
+        worker = mp.Process(target=_read_frames, args=(ring.handle(), 5, results))
+        worker.start()
+        seen = []
+        try:
+            while True:
+                # Single writer: the next frame's sequence number is known in
+                # advance, so each frame carries its own number in its pixels.
+                ring.publish_with(_fill_with((ring.latest_sequence + 1) % 256))
+                try:
+                    item = results.get(timeout=0.01)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    break
+                seen.append(item)
+        finally:
+            worker.join(timeout=10)
+
+        assert worker.exitcode == 0
+        assert len(seen) == 5
+        sequences = [sequence for sequence, _, _ in seen]
+        assert sequences == sorted(set(sequences))
+        assert all(gray == sequence % 256 == color for sequence, gray, color in seen)
+
+
+def test_publisher_captures_straight_into_the_ring():
+    source = np.dstack([np.full(SHAPE, value, dtype=np.uint8) for value in (10, 20, 30)])
+    backend = ReplayBackend([source])
+
+    def capture(out=None):
+        return backend.grab((0, 0, SHAPE[1], SHAPE[0]), out)
+
+    with SharedFrameRing.create(SHAPE) as ring:
+        publisher = SharedFramePublisher(capture, ring)
+        publisher.start()
+        try:
+            frame = ring.wait_for(0, timeout=5)
+        finally:
+            publisher.stop()
+        assert frame is not None
+        with frame:
+            assert frame.color[0, 0].tolist() == [10, 20, 30]
+            assert frame.grayscale.dtype == np.uint8
+        assert backend.buffers.color is None  # nothing went through the private buffers
+
+
+def test_publisher_survives_capture_errors():
+    calls = []
+
+    def capture(out=None):
+        calls.append(1)
+        raise OSError("screen grab failed")
+
+    with SharedFrameRing.create(SHAPE) as ring:
+        publisher = SharedFramePublisher(capture, ring, error_backoff=0.01)
+        publisher.start()
+        try:
+            assert ring.wait_for(0, timeout=0.2) is None
+            assert publisher.is_running
+        finally:
+            publisher.stop()
+    assert len(calls) > 1
+    assert isinstance(publisher.last_error, OSError)
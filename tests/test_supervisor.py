@@ -0,0 +1,113 @@
+import threading
+from concurrent.futures import CancelledError
+
+import numpy as np
+
+from automation.cursor import CursorAction, ThreadCursorExecutor
+from automation.skills.base import SkillTask
+from automation.supervisor import MultiClientSupervisor, assign_accounts, tile_positions
+
+
+class FakeWindow:
+    def __init__(self, handle, title="RuneLite"):
+        self._hWnd = handle
+        self.title = title
+
+
+class FakeWindowService:
+    def __init__(self, handle, position):
+        self.handle = handle
+        self.position = position
+        self.activations = 0
+
+    def activate(self):
+        self.activations += 1
+
+    def capture(self):
+        frame = np.zeros((4, 4, 3), dtype=np.uint8)
+        return frame, frame[:, :, 0]
+
+    def to_screen(self, point):
+        return (point[0] + self.position[0], point[1] + self.position[1])
+
+
+class ClickingSkill(SkillTask):
+    def __init__(self, context):
+        self.context = context
+        self.clicks = []
+        self.started = threading.Event()
+        self.stopped = False
+
+    def start(self):
+        self.started.set()
+
+    def stop(self):
+        self.stopped = True
+
+    def update(self):
+        self.context.window_service.capture()
+        position = self.context.window_service.to_screen((10, 10))
+        action = CursorAction(position=position, move_offset=0, move_delay_range=(0, 0), click_delay_range=(0, 0))
+        try:
+            self.clicks.append(self.context.cursor.queue_click(action).result(timeout=10).position)
+        except CancelledError:
+            pass  # the supervisor cancels queued clicks while stopping
+
+
+ACCOUNTS = {
+    "User1": {"username": "alice@example.com", "password": "x", "login": "Alice"},
+    "User2": {"username": "bob@example.com", "password": "y", "login": "Bob"},
+}
+
+
+def test_accounts_follow_window_titles_then_order():
+    windows = [FakeWindow(1, "RuneLite - Bob"), FakeWindow(2, "RuneLite"), FakeWindow(3, "RuneLite")]
+
+    pairs = assign_accounts(windows, ACCOUNTS)
+
+    assert [(window._hWnd, label) for window, label in pairs] == [(1, "User2"), (2, "User1")]
+
+
+def test_tile_positions_wrap_grid():
+    assert tile_positions(5, 0.5, (1920, 1080)) == [(0, 0), (960, 0), (0, 540), (960, 540), (0, 0)]
+
+
+def test_supervisor_runs_one_pipeline_per_client_with_shared_mouse():
+    skills = []
+
+    def factory(context):
+        skill = ClickingSkill(context)
+        skills.append(skill)
+        return skill
+
+    supervisor = MultiClientSupervisor(
+        factory,
+        accounts=ACCOUNTS,
+        cursor_executor=ThreadCursorExecutor(dry_run=True),
+        screen_size=(1920, 1080),
+        find_windows=lambda title: [FakeWindow(11), FakeWindow(12, "RuneLite - Alice")],
+        window_factory=FakeWindowService,
+    )
+    clients = supervisor.discover()
+    assert [(client.handle, client.account) for client in clients] == [(11, "User2"), (12, "User1")]
+    assert clients[1].credentials["login"] == "Alice"
+
+    supervisor.start()
+    try:
+        for skill in skills:
+            assert skill.started.wait(5)
+        deadline = threading.Event()
+        for _ in range(500):
+            if all(len(skill.clicks) >= 3 for skill in skills):
+                break
+            deadline.wait(0.01)
+    finally:
+        supervisor.close()
+
+    assert skills[0].clicks[0] == (10, 10)
+    assert skills[1].clicks[0] == (970, 10)
+    assert all(skill.stopped for skill in skills)
+    statuses = supervisor.status()
+    assert [status.state for status in statuses] == ["stopped", "stopped"]
+    assert all(status.updates >= 3 and status.errors == 0 for status in statuses)
+    assert all(client.window_service.activations >= 3 for client in clients)
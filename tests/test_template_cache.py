@@ -0,0 +1,80 @@
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+from automation.templates import TemplateLibrary
+from navigation.minimap import MinimapTemplateReader
+from perception.template_cache import TemplateCache
+
+requires_cv2 = pytest.mark.skipif(not hasattr(cv2, "imwrite"), reason="OpenCV not installed")
+
+
+def _write(path, value, shape=(12, 16, 3)):
+    cv2.imwrite(str(path), np.full(shape, value, dtype=np.uint8))
+
+
+@requires_cv2
+def test_cache_decodes_each_variant_once(tmp_path):
+    _write(tmp_path / "Map1.png", 90)
+    cache = TemplateCache()
+
+    gray = cache.load(tmp_path / "Map1.png")
+    again = cache.load(str(tmp_path / "Map1.png"))
+    color = cache.load(tmp_path / "Map1.png", cv2.IMREAD_COLOR)
+
+    assert again is gray
+    assert gray.shape == (12, 16)
+    assert color.shape == (12, 16, 3)
+    assert cache.decodes == 2
+    assert not gray.flags.writeable
+
+
+@requires_cv2
+def test_cache_invalidates_on_file_change(tmp_path):
+    path = tmp_path / "Map1.png"
+    _write(path, 90)
+    cache = TemplateCache()
+    first = cache.load(path)
+
+    _write(path, 200, shape=(20, 16, 3))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    second = cache.load(path)
+
+    assert first.shape == (12, 16)
+    assert second.shape == (20, 16)
+    assert cache.decodes == 2
+
+
+@requires_cv2
+def test_persisted_arrays_are_memory_mapped_across_processes(tmp_path):
+    source = tmp_path / "templates"
+    source.mkdir()
+    _write(source / "Map1.png", 90)
+    cache_dir = tmp_path / "cache"
+
+    TemplateCache(cache_dir).load(source / "Map1.png", scale=0.5)
+    fresh = TemplateCache(cache_dir)
+    image = fresh.load(source / "Map1.png", scale=0.5)
+
+    assert fresh.decodes == 0
+    assert image.shape == (6, 8)
+    assert isinstance(image.base, np.memmap)
+    assert len(list(cache_dir.glob("*.npy"))) == 1
+
+
+@requires_cv2
+def test_loaders_share_decoded_templates(tmp_path):
+    _write(tmp_path / "Map1.png", 90)
+    cache = TemplateCache()
+
+    library = TemplateLibrary(str(tmp_path), cache=cache)
+    reader = MinimapTemplateReader(tmp_path, cache=cache)
+    reader.available_templates()
+    reader.available_templates()
+    TemplateLibrary(str(tmp_path), cache=cache)
+
+    assert list(library.templates) == ["Map1.png"]
+    assert cache.decodes == 2  # one grayscale, one colour variant
@@ -0,0 +1,260 @@
+import cv2
+import numpy as np
+import pytest
+
+from automation.templates import FrameScores, TemplateLibrary
+from perception.matching import (
+    AdaptiveMatcher,
+    DirectMatcher,
+    FFTMatcher,
+    ImagePyramid,
+    PyramidMatcher,
+    prepare_template,
+)
+
+requires_cv2 = pytest.mark.skipif(not hasattr(cv2, "minMaxLoc"), reason="OpenCV not installed")
+
+
+def _textured(shape, seed, blur=9):
+    rng = np.random.default_rng(seed)
+    noise = rng.integers(0, 255, shape, dtype=np.uint8)
+    return cv2.GaussianBlur(noise, (blur, blur), 0)
+
+
+def _composite(template, position, shape=(540, 960)):
+    frame = _textured(shape, seed=1)
+    x, y = position
+    h, w = template.shape
+    frame[y : y + h, x : x + w] = template
+    return frame
+
+
+@requires_cv2
+def test_pyramid_matches_direct_result():
+    template = _textured((96, 120), seed=7, blur=5)
+    frame = _composite(template, (613, 271))
+
+    direct = DirectMatcher().locate(frame, template, 0.9)
+    pyramid = PyramidMatcher().locate(ImagePyramid(frame), template, 0.9)
+
+    assert direct is not None and pyramid is not None
+    assert pyramid.top_left == direct.top_left == (613, 271)
+    assert pyramid.score == pytest.approx(direct.score, abs=1e-3)
+
+
+@requires_cv2
+def test_pyramid_rejects_absent_template():
+    template = _textured((96, 120), seed=7, blur=5)
+    frame = _textured((540, 960), seed=1)
+
+    assert PyramidMatcher().locate(frame, template, 0.9) is None
+
+
+def test_pyramid_scale_selection_falls_back_for_small_templates():
+    matcher = PyramidMatcher(scale=0.25, min_template_size=20)
+
+    assert matcher.coarse_scale((160, 160)) == 0.25
+    assert matcher.coarse_scale((60, 44)) == 0.5
+    assert matcher.coarse_scale((28, 28)) is None
+
+
+@requires_cv2
+def test_pyramid_keeps_only_recent_coarse_templates():
+    matcher = PyramidMatcher(max_cached_templates=2)
+    frame = _textured((540, 960), seed=1)
+    templates = [_textured((96, 120), seed=seed, blur=5) for seed in range(3)]
+
+    for template in templates:
+        matcher.locate(frame, template, 0.9)
+    matcher.locate(frame, templates[1], 0.9)
+
+    cached = [entry[0] for entry in matcher._coarse_templates.values()]
+    assert len(cached) == 2
+    assert cached[-1] is templates[1]
+    assert not any(image is templates[0] for image in cached)
+
+
+@requires_cv2
+def test_template_library_uses_configured_matcher(tmp_path):
+    template = _textured((80, 80), seed=11, blur=5)
+    cv2.imwrite(str(tmp_path / "Map1.png"), template)
+    frame = _composite(template, (700, 20))
+
+    library = TemplateLibrary(str(tmp_path), matcher=PyramidMatcher())
+    match = library.match_first(frame, prefixes=("Map",))
+
+    assert match is not None
+    assert match.name == "Map1.png"
+    assert match.center == (740, 60)
+
+
+@requires_cv2
+def test_parallel_match_first_keeps_sorted_priority(tmp_path):
+    templates = {
+        name: _textured((40, 40), seed=index, blur=5)
+        for index, name in enumerate(["Cla", "Clb", "Clc"])
+    }
+    frame = _textured((300, 400), seed=1)
+    frame[20:60, 30:70] = templates["Clc"]
+    frame[200:240, 300:340] = templates["Clb"]
+    for name, template in templates.items():
+        cv2.imwrite(str(tmp_path / f"{name}.png"), template)
+
+    sequential = TemplateLibrary(str(tmp_path)).match_first(frame, prefixes=("Cl",))
+    library = TemplateLibrary(str(tmp_path), workers=3)
+    try:
+        parallel = library.match_first(frame, prefixes=("Cl",))
+    finally:
+        library.close()
+
+    assert sequential is not None and parallel is not None
+    assert parallel.name == sequential.name == "Clb.png"
+    assert parallel.center == sequential.center == (320, 220)
+
+
+@requires_cv2
+def test_frame_scores_match_each_template_once_per_frame(tmp_path):
+    for index, name in enumerate(["Map1", "Mog1", "Cla", "Clk1"]):
+        cv2.imwrite(str(tmp_path / f"{name}.png"), _textured((40, 40), seed=20 + index, blur=5))
+    frame = _textured((300, 400), seed=1)
+    library = TemplateLibrary(str(tmp_path))
+
+    assert library.candidates(("Clk", "Cl")) == ("Cla.png", "Clk1.png")
+
+    scores = FrameScores().for_frame(1)
+    assert library.match_first(frame, prefixes=("Cl",), scores=scores) is None
+    assert library.match_first(frame, prefixes=("Clk", "Cl"), scores=scores) is None
+    assert (scores.match_calls, scores.cache_hits) == (2, 2)
+
+    assert scores.for_frame(1).match_calls == 2
+    assert scores.for_frame(2).match_calls == 0
+    assert scores.results == {}
+
+
+def _faded(template, seed=9):
+    noise = _textured(template.shape, seed=seed, blur=3).astype(np.int16) // 12 - 10
+    return np.clip(template.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+@requires_cv2
+def test_direct_matcher_reports_strongest_peak_not_first_hit():
+    template = _textured((40, 40), seed=5, blur=5)
+    frame = _textured((300, 400), seed=1)
+    frame[200:240, 300:340] = template
+    frame[20:60, 30:70] = _faded(template)
+
+    hits = DirectMatcher().locate_all(frame, template, 0.8)
+    best = DirectMatcher().locate(frame, template, 0.8)
+
+    assert [hit.top_left for hit in hits] == [(300, 200), (30, 20)]
+    assert hits[0].score > hits[1].score
+    assert best == hits[0]
+
+
+@requires_cv2
+def test_match_all_and_match_best_rank_by_score(tmp_path):
+    templates = {name: _textured((40, 40), seed=index, blur=5) for index, name in enumerate(["Cla", "Clb"])}
+    frame = _textured((300, 400), seed=1)
+    frame[20:60, 30:70] = _faded(templates["Cla"])
+    frame[200:240, 300:340] = templates["Clb"]
+    frame[100:140, 150:190] = templates["Clb"]
+    for name, template in templates.items():
+        cv2.imwrite(str(tmp_path / f"{name}.png"), template)
+    library = TemplateLibrary(str(tmp_path))
+
+    matches = library.match_all(frame, prefixes=("Cl",))
+    best = library.match_best(frame, prefixes=("Cl",))
+
+    assert sorted((match.name, match.center) for match in matches) == [
+        ("Cla.png", (50, 40)),
+        ("Clb.png", (170, 120)),
+        ("Clb.png", (320, 220)),
+    ]
+    assert [match.score for match in matches] == sorted((match.score for match in matches), reverse=True)
+    assert best is not None and best.name == "Clb.png"
+    assert library.match_first(frame, prefixes=("Cl",)).name == "Cla.png"
+
+
+def test_prepare_template_keeps_mask_only_when_useful():
+    bgra = np.zeros((20, 20, 4), dtype=np.uint8)
+    bgra[..., 3] = 255
+    assert prepare_template(bgra).mask is None
+
+    bgra[:5, :, 3] = 0
+    prepared = prepare_template(bgra)
+    assert prepared.image.shape == (20, 20)
+    assert prepared.mask is not None and np.count_nonzero(prepared.mask) == 300
+
+    gray = np.zeros((20, 20), dtype=np.uint8)
+    assert prepare_template(gray).image is gray
+
+
+@requires_cv2
+@pytest.mark.parametrize("matcher", [DirectMatcher(), PyramidMatcher(scale=0.5)])
+def test_masked_template_ignores_transparent_background(tmp_path, matcher):
+    icon = _textured((60, 60), seed=4, blur=5)
+    alpha = np.zeros((60, 60), dtype=np.uint8)
+    alpha[10:50, 10:50] = 255
+    cv2.imwrite(str(tmp_path / "Mog1.png"), np.dstack([icon, icon, icon, alpha]))
+    frame = _textured((300, 400), seed=2)
+    frame[130:170, 210:250] = icon[10:50, 10:50]
+
+    library = TemplateLibrary(str(tmp_path), matcher=matcher)
+    match = library.match_first(frame, prefixes=("Mog",))
+
+    assert library.prepared["Mog1.png"].mask is not None
+    assert match is not None and match.center == (230, 150)
+
+
+@requires_cv2
+def test_fft_matcher_agrees_with_direct_scores():
+    frame = _textured((300, 400), seed=1)
+    frame[:60, :80] = 90
+    template = frame[120:160, 200:250].copy()
+    pyramid = ImagePyramid(frame)
+
+    response = FFTMatcher().response(pyramid, template)
+    direct = cv2.matchTemplate(frame, template, cv2.TM_CCOEFF_NORMED)
+
+    assert response.shape == direct.shape
+    assert np.abs(response - direct).max() < 1e-3
+    assert FFTMatcher().locate(pyramid, template, 0.9).top_left == (200, 120)
+
+
+@requires_cv2
+def test_fft_matcher_keeps_only_recent_spectra():
+    matcher = FFTMatcher(max_cached_spectra=2)
+    frames = [_textured((120, 160), seed=1), _textured((140, 180), seed=2)]
+    templates = [_textured((20, 20), seed=seed) for seed in range(2)]
+
+    for frame in frames:
+        for template in templates:
+            matcher.locate(frame, template, 0.9)
+    matcher.locate(frames[1], templates[0], 0.9)
+
+    cached = list(matcher._spectra.values())
+    assert len(cached) == 2
+    assert cached[-1][0] is templates[0]
+    assert all(spectrum.shape == cached[0][1].shape for _, spectrum, _ in cached)
+
+
+@requires_cv2
+def test_adaptive_matcher_uses_fft_only_for_large_batches(tmp_path):
+    frame = _textured((300, 400), seed=1)
+    for index in range(3):
+        cv2.imwrite(str(tmp_path / f"Cl{index}.png"), frame[40 * index : 40 * index + 30, 50:90])
+    cv2.imwrite(str(tmp_path / "Mog1.png"), _textured((8, 8), seed=3))
+
+    matcher = AdaptiveMatcher(min_templates=3)
+    library = TemplateLibrary(str(tmp_path), matcher=matcher)
+
+    assert [matcher.uses_fft(library.prepared[name]) for name in sorted(library.prepared)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    assert library.match_first(frame, prefixes=("Cl2",)).center == (70, 95)
+
+    matcher.prepare(list(library.prepared.values())[:2])
+    assert not any(matcher.uses_fft(template) for template in library.prepared.values())
@@ -0,0 +1,95 @@
+import threading
+
+import numpy as np
+import pytest
+
+from automation.cursor import CursorAction, HumanLikeCursor, ThreadCursorExecutor
+from automation.trajectory import (
+    FittsTiming,
+    Trajectory,
+    TrajectoryPlanner,
+    bezier,
+    minimum_jerk,
+    minimum_jerk_profile,
+    stream,
+)
+
+
+def test_minimum_jerk_profile_is_monotonic_and_eases_in_and_out():
+    profile = minimum_jerk_profile(61)
+
+    assert profile[0] == 0.0 and profile[-1] == pytest.approx(1.0)
+    steps = np.diff(profile)
+    assert np.all(steps >= 0)
+    assert steps[0] < steps[30] > steps[-1]
+
+
+@pytest.mark.parametrize("kind", ["minimum_jerk", "bezier"])
+def test_planned_trajectory_starts_and_ends_on_the_endpoints(kind):
+    planner = TrajectoryPlanner(kind=kind, seed=3)
+    trajectory = planner.plan((10, 20), (310, 140))
+
+    assert tuple(trajectory.points[0]) == (10, 20)
+    assert trajectory.end == (310, 140)
+    assert trajectory.points.dtype == np.int32
+    assert trajectory.interval == pytest.approx(1 / 120)
+
+
+def test_move_time_grows_with_distance():
+    timing = FittsTiming(jitter=0.0)
+    short = minimum_jerk((0, 0), (40, 0), timing(40))
+    long = minimum_jerk((0, 0), (400, 0), timing(400))
+
+    assert short.duration < long.duration
+    assert timing(40) < 0.2 < timing(400) <= timing.maximum
+
+
+def test_bezier_bends_away_from_the_straight_line():
+    curve = bezier((0, 0), (300, 0), 0.3, curvature=0.2, rng=np.random.default_rng(1))
+
+    assert np.abs(curve.points[:, 1]).max() > 0
+
+
+def test_stream_sends_every_distinct_point_and_finishes_on_time():
+    trajectory = minimum_jerk((0, 0), (50, 0), 0.05, rate=200)
+    moves = []
+
+    assert stream(trajectory, lambda x, y: moves.append((x, y)), abort=threading.Event())
+    assert moves[-1] == (50, 0)
+    assert len(moves) == len(set(moves))
+
+
+def test_stream_skips_overdue_points_and_stops_on_abort():
+    now = [0.0]
+    trajectory = Trajectory(np.array([[i, 0] for i in range(10)], dtype=np.int32), 0.01)
+    moves = []
+
+    def slow_move(x, y):
+        moves.append(x)
+        now[0] += 0.035
+
+    assert stream(trajectory, slow_move, abort=threading.Event(), clock=lambda: now[0])
+    assert moves[0] == 0 and moves[-1] == 9 and len(moves) < 10
+
+    aborted = threading.Event()
+    aborted.set()
+    assert not stream(trajectory, lambda x, y: None, abort=aborted)
+
+
+def test_cursor_with_planner_follows_the_trajectory_duration():
+    planner = TrajectoryPlanner(kind="minimum_jerk", timing=lambda distance, rng: 0.1, settle_range=(0.0, 0.0))
+    cursor = HumanLikeCursor(executor=ThreadCursorExecutor(dry_run=True, planner=planner))
+    cursor.start()
+    try:
+        cursor.queue_click(CursorAction(position=(0, 0), move_offset=0)).result(timeout=10)
+        result = cursor.queue_click(CursorAction(position=(200, 0), move_offset=0)).result(timeout=10)
+    finally:
+        cursor.stop()
+
+    assert result.position == (200, 0)
+    assert 0.09 <= result.clicked_at - result.started_at < 0.5
+
+
+def test_unknown_trajectory_kind_is_rejected():
+    with pytest.raises(ValueError):
+        TrajectoryPlanner(kind="zigzag")